@@ -0,0 +1,126 @@
+"""인코더 백엔드 벤치마크: 코퍼스 PDF를 저장 시와 같은 DPI로 렌더링해 백엔드별 속도/용량 비교
+
+사용 예:
+    python benchmark_encoders.py 스캔폴더/ --quality 80 --pages 20 --csv bench.csv
+"""
+import argparse
+import csv
+import glob
+import os
+import statistics
+import time
+
+import fitz  # PyMuPDF
+
+import pdf_encoders
+import pdf_imaging
+
+# 저장 시 압축 렌더링 DPI와 동일
+BENCH_DPI = 200
+
+# (이름, 백엔드 설정) - 같은 백엔드의 주요 옵션 조합도 별도 행으로 비교
+VARIANTS = [
+    ('mupdf-jpeg', {'backend': 'mupdf-jpeg'}),
+    ('pillow-jpeg 4:2:0', {'backend': 'pillow-jpeg', 'subsampling': '4:2:0'}),
+    ('pillow-jpeg 4:4:4', {'backend': 'pillow-jpeg', 'subsampling': '4:4:4'}),
+    ('pillow-jpeg progressive', {'backend': 'pillow-jpeg', 'progressive': True}),
+    ('jpx', {'backend': 'jpx'}),
+    ('flate 1', {'backend': 'flate', 'flate_level': 1}),
+    ('flate 6', {'backend': 'flate', 'flate_level': 6}),
+    ('flate 9', {'backend': 'flate', 'flate_level': 9}),
+]
+
+
+def collect_pdfs(paths):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(glob.glob(os.path.join(p, '**', '*.pdf'), recursive=True)))
+        else:
+            files.append(p)
+    return files
+
+
+def iter_pages(files, max_pages):
+    """코퍼스 전체에서 문서마다 최대 max_pages개 페이지를 고르게 뽑아 렌더"""
+    zoom = BENCH_DPI / 72.0
+    for path in files:
+        with fitz.open(path) as doc:
+            for i in pdf_imaging.sample_page_indices(len(doc), max_pages):
+                pix = doc[i].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                yield f"{os.path.basename(path)}#{i + 1}", pix
+
+
+def run(files, quality, max_pages, measure):
+    available = set(pdf_encoders.available_encoders())
+    variants = [(label, opts) for label, opts in VARIANTS if opts['backend'] in available]
+    stats = {label: {'times': [], 'bytes': [], 'ssim': []} for label, _ in variants}
+    raw_bytes = 0
+    pages = 0
+
+    for key, pix in iter_pages(files, max_pages):
+        arr = pdf_imaging.pixmap_to_array(pix)
+        ref = pdf_imaging.prepare_reference(arr) if measure else None
+        raw_bytes += arr.nbytes
+        pages += 1
+        for label, opts in variants:
+            t0 = time.perf_counter()
+            encoded = pdf_encoders.encode(arr, quality, opts)
+            stats[label]['times'].append(time.perf_counter() - t0)
+            stats[label]['bytes'].append(len(encoded['data']))
+            if measure:
+                score = pdf_imaging.compare_to_reference(ref, pdf_encoders.decode(encoded))
+                stats[label]['ssim'].append(score['ssim'])
+        print(f"  {key} ({pix.width}x{pix.height})")
+
+    rows = []
+    for label, _ in variants:
+        st = stats[label]
+        if not st['times']:
+            continue
+        rows.append({
+            'backend': label,
+            'pages': len(st['times']),
+            'ms_per_page': round(1000 * statistics.mean(st['times']), 1),
+            'kb_per_page': round(statistics.mean(st['bytes']) / 1024, 1),
+            'ratio': round(raw_bytes / max(1, sum(st['bytes'])), 1),
+            'ssim_mean': round(statistics.mean(st['ssim']), 4) if st['ssim'] else '',
+        })
+    return pages, rows
+
+
+def print_table(rows):
+    header = ['backend', 'pages', 'ms_per_page', 'kb_per_page', 'ratio', 'ssim_mean']
+    widths = {h: max(len(h), *(len(str(r[h])) for r in rows)) for h in header}
+    print("  ".join(h.ljust(widths[h]) for h in header))
+    for r in rows:
+        print("  ".join(str(r[h]).ljust(widths[h]) for h in header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 이미지 인코더 벤치마크")
+    parser.add_argument('paths', nargs='+', help="PDF 파일 또는 폴더")
+    parser.add_argument('--quality', type=int, default=80, help="손실 인코더 품질 (기본 80)")
+    parser.add_argument('--pages', type=int, default=10, help="문서당 최대 샘플 페이지 수")
+    parser.add_argument('--no-ssim', action='store_true', help="SSIM 측정 생략 (속도만 비교)")
+    parser.add_argument('--csv', help="결과를 CSV로 저장할 경로")
+    args = parser.parse_args()
+
+    files = collect_pdfs(args.paths)
+    if not files:
+        parser.error("PDF 파일을 찾지 못했습니다.")
+    print(f"BENCH: {len(files)} files, quality {args.quality}, {BENCH_DPI} DPI")
+    pages, rows = run(files, args.quality, args.pages, not args.no_ssim)
+    print(f"\nBENCH: {pages} pages")
+    print_table(rows)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"BENCH: CSV → {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,14 +3,31 @@ import sys
 import fitz  # PyMuPDF
 import os
 import json
+import multiprocessing
+import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QFileDialog, 
                              QDoubleSpinBox, QGroupBox, QTabWidget, 
                              QScrollArea, QMessageBox, QSplitter, QProgressBar,
-                             QInputDialog, QCheckBox)
-from PyQt6.QtCore import Qt, QSettings
+                             QInputDialog, QCheckBox, QComboBox, QSpinBox,
+                             QDialog, QDialogButtonBox, QTableWidget, QTableWidgetItem)
+from PyQt6.QtCore import Qt, QSettings, QTimer
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QAction, QPen
 
+import pdf_analysis
+import pdf_batch
+import pdf_cache
+import pdf_encoders
+import pdf_engine
+import pdf_geometry
+import pdf_imaging
+import pdf_rules
+import pdf_split
+import pdf_workers
+
+from pdf_engine import COMPRESS_DPI, compression_to_quality
+
+
 class AutoScrollArea(QScrollArea):
     """Ctrl + 휠 줌 기능을 위한 커스텀 스크롤 영역"""
     def __init__(self, parent=None):
@@ -27,6 +44,103 @@ class AutoScrollArea(QScrollArea):
         else:
             super().wheelEvent(event)
 
+    def mouseDoubleClickEvent(self, event):
+        # 미리보기를 더블클릭하면 현재 페이지의 개별 여백 편집
+        self.editor.edit_page_override()
+
+class PageMarginDialog(QDialog):
+    """현재 페이지 하나에만 적용할 개별 여백 (mm)"""
+    def __init__(self, page_no, margins_mm, has_override, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"{page_no}쪽 개별 여백")
+        self.cleared = False
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("이 페이지에만 적용 (쪽 범위 규칙/홀짝 여백보다 우선)"))
+        self.spins = {}
+        for key, label in (('top', "상단"), ('bottom', "하단"), ('left', "좌측"), ('right', "우측")):
+            h = QHBoxLayout()
+            spin = QDoubleSpinBox()
+            spin.setRange(-500.0, 500.0)
+            spin.setSuffix(" mm")
+            spin.setValue(margins_mm[key])
+            h.addWidget(QLabel(label))
+            h.addWidget(spin)
+            layout.addLayout(h)
+            self.spins[key] = spin
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok |
+                                   QDialogButtonBox.StandardButton.Cancel)
+        if has_override:
+            btn_clear = buttons.addButton("개별 여백 해제", QDialogButtonBox.ButtonRole.ResetRole)
+            btn_clear.clicked.connect(self.clear)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def clear(self):
+        self.cleared = True
+        self.accept()
+
+    def margins(self):
+        return {key: round(spin.value(), 2) for key, spin in self.spins.items()}
+
+class RulesDialog(QDialog):
+    """쪽 범위 여백 규칙 편집 (한 줄에 규칙 하나)"""
+    COLUMNS = [('name', "이름"), ('pages', "쪽 범위"), ('parity', "홀/짝"), ('priority', "우선순위"),
+               ('left', "좌"), ('right', "우"), ('top', "상"), ('bottom', "하")]
+
+    def __init__(self, rules, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("쪽 범위 여백 규칙")
+        self.resize(720, 360)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("쪽 범위 예: 1-4, 7, 300- (끝까지) / 홀/짝: all, odd, even / "
+                                "여백 mm. 겹치면 우선순위가 높은(같으면 아래) 규칙 적용"))
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([label for _, label in self.COLUMNS])
+        layout.addWidget(self.table)
+        for rule in rules:
+            self.add_row(rule)
+
+        h = QHBoxLayout()
+        btn_add = QPushButton("규칙 추가")
+        btn_add.clicked.connect(lambda: self.add_row({'pages': "1", 'parity': 'all'}))
+        btn_remove = QPushButton("선택 규칙 삭제")
+        btn_remove.clicked.connect(lambda: self.table.removeRow(self.table.currentRow()))
+        h.addWidget(btn_add)
+        h.addWidget(btn_remove)
+        layout.addLayout(h)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok |
+                                   QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.rules = list(rules)
+
+    def add_row(self, rule):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for col, (key, _) in enumerate(self.COLUMNS):
+            self.table.setItem(row, col, QTableWidgetItem(str(rule.get(key, 0 if col > 2 else ''))))
+
+    def accept(self):
+        rules = []
+        for row in range(self.table.rowCount()):
+            values = {key: (self.table.item(row, col).text().strip()
+                            if self.table.item(row, col) else '')
+                      for col, (key, _) in enumerate(self.COLUMNS)}
+            try:
+                for key in ('priority', 'left', 'right', 'top', 'bottom'):
+                    values[key] = float(values[key] or 0)
+                rules.append(pdf_rules.normalize_rule(values))
+            except ValueError as e:
+                QMessageBox.warning(self, "규칙 오류", f"{row + 1}번째 규칙: {e}")
+                return
+        self.rules = rules
+        super().accept()
+
+
 class PDFEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -39,25 +153,40 @@ class PDFEditor(QMainWindow):
         self.scale_factor = 1.0
         self.compression_level = 0
         self.last_dir = ""  # 최근 열린 파일 폴더 기억
+        self.doc_fingerprint = None  # 인코딩 캐시 키용 원본 파일 지문
+        self.page_analysis = None  # 페이지 분석 표 (bbox/잉크 비율/색 분류/이미지 DPI/회전)
+        self.margin_rules = None  # 컴파일한 여백 조회표 (여백/규칙이 바뀌면 None으로 비움)
+        self.margin_table = None  # 모든 쪽의 최종 여백 pt 목록 (margin_rules와 함께 다시 계산)
+        self.page_geometry = None  # 열 때 만든 페이지 기하 표 (가시 rect/MediaBox/회전/크기 분류)
+        self.measure_pool = None  # 현재 페이지 화질 측정용 단일 워커 프로세스 (문서마다 새로 염)
+        self.measure_future = None  # 진행 중인 측정 (key, Future)
+        self.measure_scores = {}  # (페이지, 품질, 인코더) → SSIM/PSNR 측정 결과
 
         # 설정 파일 위치: EXE 또는 .py 스크립트와 같은 폴더에 고정 저장
-        if getattr(sys, 'frozen', False):
-            base_dir = os.path.dirname(sys.executable)
-        else:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.settings_file = os.path.join(base_dir, "pdf_editor_settings.json")
+        self.settings_file = pdf_engine.settings_file_path()
         print(f"DEBUG: Settings file → {self.settings_file}")
+
+        # 압축 저장 인코딩 캐시: 여백만 바꿔 다시 저장하면 렌더링/인코딩 생략
+        self.cache_dir = pdf_engine.cache_dir_path()
+        self.encode_cache = pdf_cache.EncodeCache()
         
         # 기본 설정값
-        self.settings = {
-            'odd': {'left': 0.0, 'right': 0.0, 'top': 0.0, 'bottom': 0.0},
-            'even': {'left': 0.0, 'right': 0.0, 'top': 0.0, 'bottom': 0.0}
-        }
+        self.settings = pdf_engine.default_settings()
         
         # 프리셋 데이터 (이름: 설정값)
         self.presets = {}
 
         self.init_ui()
+
+        # 압축 수준/인코더/페이지를 바꾸는 동안은 측정하지 않고, 멈춘 뒤 한 번만 측정
+        self.measure_timer = QTimer(self)
+        self.measure_timer.setSingleShot(True)
+        self.measure_timer.setInterval(400)
+        self.measure_timer.timeout.connect(self.start_measure)
+        # 워커 결과 확인 (UI 스레드는 기다리지 않음)
+        self.measure_poll = QTimer(self)
+        self.measure_poll.setInterval(100)
+        self.measure_poll.timeout.connect(self.poll_measure)
         self.load_settings() # 자동 불러오기
         print("SYSTEM: PDF Editor Initialized. 1.7 Active.")
 
@@ -83,6 +212,9 @@ class PDFEditor(QMainWindow):
         self.lbl_page.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.btn_next = QPushButton("다음 ▶")
         self.btn_next.clicked.connect(self.next_page)
+        self.btn_page_margin = QPushButton("✏️ 이 쪽 여백")
+        self.btn_page_margin.setToolTip("현재 페이지에만 개별 여백 지정 (미리보기 더블클릭)")
+        self.btn_page_margin.clicked.connect(self.edit_page_override)
         
         self.btn_zoom_out = QPushButton("축소 (-)")
         self.btn_zoom_out.clicked.connect(self.zoom_out)
@@ -93,6 +225,7 @@ class PDFEditor(QMainWindow):
         toolbar_layout.addWidget(self.btn_prev)
         toolbar_layout.addWidget(self.lbl_page)
         toolbar_layout.addWidget(self.btn_next)
+        toolbar_layout.addWidget(self.btn_page_margin)
         toolbar_layout.addStretch()
         toolbar_layout.addWidget(self.btn_zoom_out)
         toolbar_layout.addWidget(self.lbl_zoom)
@@ -130,8 +263,11 @@ class PDFEditor(QMainWindow):
         btn_save = QPushButton("💾 저장 하기")
         btn_save.clicked.connect(self.save_pdf)
         btn_save.setStyleSheet("background-color: #e1f5fe; font-weight: bold;")
+        btn_batch = QPushButton("📁 일괄 처리")
+        btn_batch.clicked.connect(self.batch_process)
         btn_layout.addWidget(btn_open)
         btn_layout.addWidget(btn_save)
+        btn_layout.addWidget(btn_batch)
         settings_layout.addLayout(btn_layout)
 
         # 프리셋 관리
@@ -167,7 +303,110 @@ class PDFEditor(QMainWindow):
         
         self.lbl_comp_status = QLabel("설명: 원본 품질 유지 (빠름)")
         self.lbl_comp_status.setStyleSheet("color: gray; font-size: 11px;")
+        self.lbl_comp_status.setWordWrap(True)
         comp_layout.addWidget(self.lbl_comp_status)
+
+        # 자동 화질: 샘플 페이지 SSIM이 기준 이상인 가장 낮은 JPEG 품질 선택
+        h_auto = QHBoxLayout()
+        self.check_auto_quality = QCheckBox("자동 화질 (SSIM 기준)")
+        self.check_auto_quality.stateChanged.connect(
+            lambda _: self.update_comp_label(self.spin_comp.value()))
+        self.spin_ssim = QDoubleSpinBox()
+        self.spin_ssim.setRange(0.800, 0.999)
+        self.spin_ssim.setDecimals(3)
+        self.spin_ssim.setSingleStep(0.005)
+        self.spin_ssim.setValue(0.950)
+        self.spin_ssim.valueChanged.connect(
+            lambda _: self.update_comp_label(self.spin_comp.value()))
+        h_auto.addWidget(self.check_auto_quality)
+        h_auto.addWidget(self.spin_ssim)
+        comp_layout.addLayout(h_auto)
+
+        # 이미지 인코더 (프리셋마다 저장)
+        h_enc = QHBoxLayout()
+        h_enc.addWidget(QLabel("인코더:"))
+        self.combo_encoder = QComboBox()
+        for name in pdf_encoders.available_encoders():
+            self.combo_encoder.addItem(pdf_encoders.ENCODERS[name][0], name)
+        h_enc.addWidget(self.combo_encoder)
+        comp_layout.addLayout(h_enc)
+
+        h_enc_opt = QHBoxLayout()
+        self.combo_subsampling = QComboBox()
+        self.combo_subsampling.addItems(list(pdf_encoders.SUBSAMPLING))
+        self.check_progressive = QCheckBox("Progressive")
+        self.spin_flate = QSpinBox()
+        self.spin_flate.setRange(1, 9)
+        self.spin_flate.setPrefix("레벨 ")
+        h_enc_opt.addWidget(self.combo_subsampling)
+        h_enc_opt.addWidget(self.check_progressive)
+        h_enc_opt.addWidget(self.spin_flate)
+        comp_layout.addLayout(h_enc_opt)
+
+        self.apply_encoder_options(self.settings['encoder'])
+        self.combo_encoder.currentIndexChanged.connect(self.update_encoder_options)
+        self.combo_subsampling.currentIndexChanged.connect(self.update_encoder_options)
+        self.check_progressive.stateChanged.connect(self.update_encoder_options)
+        self.spin_flate.valueChanged.connect(self.update_encoder_options)
+
+        # MRC: 글자(고해상도 1비트 마스크)와 배경/전경 색(저해상도 JPEG)을 분리 저장
+        self.check_mrc = QCheckBox("MRC 모드 (글자/배경 분리 압축)")
+        comp_layout.addWidget(self.check_mrc)
+
+        # 텍스트/벡터 유지: 페이지를 이미지로 바꾸지 않고 페이지 안의 이미지만 재압축
+        self.check_preserve = QCheckBox("텍스트/벡터 유지 (페이지 안 이미지만 재압축)")
+        comp_layout.addWidget(self.check_preserve)
+
+        # 무손실(0%) 저장에서 음수 여백으로 잘린 스캔 이미지 픽셀을 실제로 제거
+        self.check_hard_crop = QCheckBox("하드 크롭 (무손실, 이미지 전용 페이지의 잘린 픽셀 제거)")
+        comp_layout.addWidget(self.check_hard_crop)
+
+        # 기울기 보정: 페이지별 기울기를 분석해 렌더링 없이 페이지 변환으로 바로잡음
+        self.check_deskew = QCheckBox("기울기 보정 (무손실/텍스트 유지 저장, 페이지 변환)")
+        comp_layout.addWidget(self.check_deskew)
+
+        # 빈 페이지: 저장 전에 저해상도 분석으로 찾아 표시/흰 페이지로 저장/제외
+        h_blank = QHBoxLayout()
+        h_blank.addWidget(QLabel("빈 페이지:"))
+        self.combo_blank = QComboBox()
+        for label, mode in (("그대로 저장", 'keep'), ("찾아서 보고만", 'flag'),
+                            ("흰 페이지로 저장 (인코딩 안 함)", 'minimal'), ("제외", 'drop')):
+            self.combo_blank.addItem(label, mode)
+        h_blank.addWidget(self.combo_blank)
+        comp_layout.addLayout(h_blank)
+
+        # 중복 페이지: 재스캔/겹쳐 들어간 거의 같은 쪽을 지각 해시로 찾아 보고/제외
+        h_dup = QHBoxLayout()
+        h_dup.addWidget(QLabel("중복 페이지:"))
+        self.combo_duplicate = QComboBox()
+        for label, mode in (("그대로 저장", 'keep'), ("찾아서 보고만", 'flag'),
+                            ("처음 나온 쪽만 남기고 제외", 'drop')):
+            self.combo_duplicate.addItem(label, mode)
+        h_dup.addWidget(self.combo_duplicate)
+        comp_layout.addLayout(h_dup)
+
+        # 분할 저장: 쪽수/목표 용량 단위로 나눠 조각별 프로세스에서 동시에 저장 (0 = 사용 안 함)
+        h_split = QHBoxLayout()
+        h_split.addWidget(QLabel("분할 저장:"))
+        self.spin_split_pages = QSpinBox()
+        self.spin_split_pages.setRange(0, 100000)
+        self.spin_split_pages.setSuffix(" 쪽")
+        self.spin_split_pages.setSpecialValueText("쪽수 제한 없음")
+        self.spin_split_mb = QDoubleSpinBox()
+        self.spin_split_mb.setRange(0, 10000)
+        self.spin_split_mb.setSingleStep(5)
+        self.spin_split_mb.setSuffix(" MB")
+        self.spin_split_mb.setSpecialValueText("용량 제한 없음")
+        h_split.addWidget(self.spin_split_pages)
+        h_split.addWidget(self.spin_split_mb)
+        comp_layout.addLayout(h_split)
+
+        self.check_disk_cache = QCheckBox("인코딩 캐시를 디스크에도 보관")
+        self.check_disk_cache.stateChanged.connect(self.update_cache_options)
+        comp_layout.addWidget(self.check_disk_cache)
+
+        self.check_report = QCheckBox("저장 보고서(JSON) 함께 저장")
+        comp_layout.addWidget(self.check_report)
         
         # 파일 정보 표시
         self.lbl_file_info = QLabel("원본파일 크기: -")
@@ -193,6 +432,52 @@ class PDFEditor(QMainWindow):
         
         self.tabs.currentChanged.connect(self.update_preview)
 
+        # 모든 페이지의 내용 영역을 분석해 홀/짝 여백 제안
+        btn_auto_margin = QPushButton("🔍 여백 자동 감지")
+        btn_auto_margin.clicked.connect(self.auto_detect_margins)
+        settings_layout.addWidget(btn_auto_margin)
+
+        # 표지/앞부분/화보/부록 등 쪽 범위별 여백 규칙 (홀/짝 여백보다 우선)
+        self.btn_rules = QPushButton("📑 쪽 범위 규칙")
+        self.btn_rules.clicked.connect(self.edit_rules)
+        settings_layout.addWidget(self.btn_rules)
+
+        # 목표 크기 맞춤: 쪽마다 크기가 조금씩 다른 스캔을 같은 크기로 (덧붙이기/자르기)
+        h_size = QHBoxLayout()
+        h_size.addWidget(QLabel("출력 크기:"))
+        self.combo_page_size = QComboBox()
+        self.combo_page_size.addItem("원본 유지", 'none')
+        for name, (w, h) in pdf_geometry.PAGE_SIZES.items():
+            self.combo_page_size.addItem(f"{name} ({w:g}x{h:g})", name)
+        self.combo_page_size.addItem("사용자 지정", 'custom')
+        self.spin_page_w = QDoubleSpinBox()
+        self.spin_page_h = QDoubleSpinBox()
+        for spin, value in ((self.spin_page_w, 210.0), (self.spin_page_h, 297.0)):
+            spin.setRange(10.0, 2000.0)
+            spin.setSuffix(" mm")
+            spin.setValue(value)
+        self.combo_anchor = QComboBox()
+        self.combo_anchor.addItem("가운데 기준", 'center')
+        self.combo_anchor.addItem("제본 쪽 기준", 'gutter')
+        for widget in (self.combo_page_size, self.spin_page_w, self.spin_page_h, self.combo_anchor):
+            h_size.addWidget(widget)
+        settings_layout.addLayout(h_size)
+        self.combo_page_size.currentIndexChanged.connect(self.update_page_size)
+        self.spin_page_w.valueChanged.connect(self.update_page_size)
+        self.spin_page_h.valueChanged.connect(self.update_page_size)
+        self.combo_anchor.currentIndexChanged.connect(self.update_page_size)
+        self.update_page_size()
+
+        # 배경 정리 (압축 저장): 인코딩 전에 종이 바탕을 흰색으로, 외딴 티끌 제거 - 프리셋에 저장
+        h_clean = QHBoxLayout()
+        h_clean.addWidget(QLabel("배경 정리:"))
+        self.check_whiten = QCheckBox("종이 바탕 흰색으로")
+        self.check_despeckle = QCheckBox("티끌 제거")
+        for check in (self.check_whiten, self.check_despeckle):
+            check.toggled.connect(self.update_cleanup)
+            h_clean.addWidget(check)
+        settings_layout.addLayout(h_clean)
+
         # 안내
         info_box = QGroupBox("도움말")
         info_layout = QVBoxLayout()
@@ -247,6 +532,7 @@ class PDFEditor(QMainWindow):
 
     def update_setting(self, page_type, key, value):
         self.settings[page_type][key] = value
+        self.margin_rules = None
         
         # 동일 적용 체크되어 있으면 반대편도 업데이트
         if self.check_sync.isChecked():
@@ -270,6 +556,7 @@ class PDFEditor(QMainWindow):
             for key in ['left', 'right', 'top', 'bottom']:
                 val = self.settings[src_type][key]
                 self.settings[target_type][key] = val
+                self.margin_rules = None
                 self.inputs[f'{target_type}_{key}'].blockSignals(True)
                 self.inputs[f'{target_type}_{key}'].setValue(val)
                 self.inputs[f'{target_type}_{key}'].blockSignals(False)
@@ -280,23 +567,279 @@ class PDFEditor(QMainWindow):
         # 모든 입력값을 0으로 초기화
         for key, spin in self.inputs.items():
             spin.setValue(0.0)
+        self.set_rules([])
+        self.set_overrides({})
+        self.apply_page_size(None)
+        self.apply_cleanup(None)
+        self.update_ui_state()
         self.update_preview()
         QMessageBox.information(self, "알림", "모든 설정이 초기화되었습니다.")
 
+    def ensure_page_analysis(self):
+        """페이지 분석 표 준비: 이미 있으면(열 때 색인에서 불러옴) 그대로, 없으면 분석 후 색인 저장"""
+        if self.page_analysis is not None:
+            return True
+
+        def on_progress(done, total):
+            self.progress_bar.setValue(int(done / total * 100))
+            QApplication.processEvents()
+
+        self.progress_bar.setFormat("페이지 분석 중 %p%")
+        t0 = time.perf_counter()
+        try:
+            self.page_analysis = pdf_analysis.get_analysis(
+                self.doc.name, self.cache_dir, self.doc_fingerprint, progress=on_progress,
+                geometry=self.page_geometry)
+        except Exception as e:
+            print(f"ERROR: Analysis Failed: {e}")
+            QMessageBox.critical(self, "실패", f"분석 중 오류가 발생했습니다.\n{e}")
+            return False
+        finally:
+            self.progress_bar.setFormat("%p%")
+        print(f"DEBUG: Analyzed {len(self.doc)} pages in {time.perf_counter() - t0:.2f}s")
+        return True
+
+    def edit_rules(self):
+        dialog = RulesDialog(self.settings['rules'], self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.set_rules(dialog.rules)
+        self.update_ui_state()
+        self.update_preview()
+
+    def set_rules(self, rules):
+        """쪽 범위 규칙 교체 (잘못된 규칙은 버림) 후 버튼에 개수 표시"""
+        valid = []
+        for rule in rules or []:
+            try:
+                valid.append(pdf_rules.normalize_rule(rule))
+            except ValueError as e:
+                print(f"ERROR: Invalid Rule Skipped: {e}")
+        self.settings['rules'] = valid
+        self.margin_rules = None
+        self.btn_rules.setText(f"📑 쪽 범위 규칙 ({len(valid)})" if valid else "📑 쪽 범위 규칙")
+
+    def update_page_size(self, *_):
+        """출력 크기 UI → settings['page_size']"""
+        preset = self.combo_page_size.currentData()
+        self.spin_page_w.setEnabled(preset == 'custom')
+        self.spin_page_h.setEnabled(preset == 'custom')
+        self.combo_anchor.setEnabled(preset != 'none')
+        self.settings['page_size'] = {
+            'preset': preset, 'width': self.spin_page_w.value(),
+            'height': self.spin_page_h.value(), 'anchor': self.combo_anchor.currentData(),
+        }
+        self.margin_rules = None
+        self.update_preview()
+
+    def update_cleanup(self, *_):
+        """배경 정리 UI → settings['cleanup']"""
+        self.settings['cleanup'] = {'whiten': self.check_whiten.isChecked(),
+                                    'despeckle': self.check_despeckle.isChecked()}
+
+    def apply_cleanup(self, cleanup):
+        """저장된 배경 정리 설정을 UI에 반영"""
+        cleanup = pdf_imaging.normalize_cleanup(cleanup)
+        for check, key in ((self.check_whiten, 'whiten'), (self.check_despeckle, 'despeckle')):
+            check.blockSignals(True)
+            check.setChecked(cleanup[key])
+            check.blockSignals(False)
+        self.update_cleanup()
+
+    def apply_page_size(self, page_size):
+        """저장된 목표 크기 설정을 UI에 반영 (잘못된 값이면 원본 유지)"""
+        try:
+            page_size = pdf_geometry.normalize_page_size(page_size)
+        except ValueError as e:
+            print(f"ERROR: Invalid Page Size Skipped: {e}")
+            page_size = pdf_geometry.default_page_size()
+        widgets = (self.combo_page_size, self.spin_page_w, self.spin_page_h, self.combo_anchor)
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.combo_page_size.setCurrentIndex(self.combo_page_size.findData(page_size['preset']))
+        self.spin_page_w.setValue(page_size['width'])
+        self.spin_page_h.setValue(page_size['height'])
+        self.combo_anchor.setCurrentIndex(self.combo_anchor.findData(page_size['anchor']))
+        for widget in widgets:
+            widget.blockSignals(False)
+        self.update_page_size()
+
+    def set_overrides(self, overrides):
+        """쪽별 개별 여백 교체 (잘못된 값이면 비움)"""
+        try:
+            self.settings['overrides'] = pdf_rules.normalize_overrides(overrides)
+        except ValueError as e:
+            print(f"ERROR: Invalid Overrides Skipped: {e}")
+            self.settings['overrides'] = {}
+        self.margin_rules = None
+
+    def edit_page_override(self):
+        """현재 페이지의 개별 여백 지정/해제 (지정한 쪽만 settings['overrides']에 저장)"""
+        if not self.doc:
+            return
+        key = str(self.current_page_num + 1)
+        margins = self.page_margins_pt(self.current_page_num)
+        margins_mm = {side: round(v / pdf_engine.MM_TO_PT, 2)
+                      for side, v in zip(pdf_engine.SIDES, margins)}
+        dialog = PageMarginDialog(key, margins_mm, key in self.settings['overrides'], self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        overrides = dict(self.settings['overrides'])
+        if dialog.cleared:
+            overrides.pop(key, None)
+        else:
+            overrides[key] = dialog.margins()
+        self.set_overrides(overrides)
+        self.update_ui_state()
+        self.update_preview()
+
+    def auto_detect_margins(self):
+        """전체 페이지를 저해상도로 분석해 내용 위치가 일정해지는 홀/짝 여백을 제안하고 적용"""
+        if not self.doc:
+            return
+        target, ok = QInputDialog.getDouble(self, "여백 자동 감지", "내용 둘레에 남길 여백 (mm):",
+                                            10.0, 0.0, 100.0, 1)
+        if not ok:
+            return
+        if not self.ensure_page_analysis():
+            return
+
+        proposal = pdf_analysis.propose_margins(self.page_analysis, target)
+        if proposal is None:
+            QMessageBox.information(self, "알림", "내용이 있는 페이지를 찾지 못했습니다.")
+            return
+        summary = pdf_analysis.content_summary(self.page_analysis)
+        names = {'left': "좌", 'right': "우", 'top': "상", 'bottom': "하"}
+        lines = [f"{summary['pages']} 페이지 분석 (빈 페이지 {summary['empty_pages']}개, "
+                 f"크기 {summary['distinct_sizes']}종, 회전 {summary['rotated_pages']}쪽)", ""]
+        for p_type, label in (('odd', "홀수"), ('even', "짝수")):
+            lines.append(f"{label}: " + ", ".join(f"{names[k]} {proposal[p_type][k]:+.1f}"
+                                                  for k in pdf_engine.SIDES) + " mm")
+        lines += ["", "이 값으로 여백을 설정할까요?"]
+        reply = QMessageBox.question(self, "여백 자동 감지", "\n".join(lines))
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        # 홀/짝 값이 다를 수 있으므로 동일 적용은 해제하고 입력칸에 직접 반영
+        if proposal['odd'] != proposal['even']:
+            self.check_sync.setChecked(False)
+        for p_type in ('odd', 'even'):
+            for key, value in proposal[p_type].items():
+                self.settings[p_type][key] = value
+                self.margin_rules = None
+                spin = self.inputs[f'{p_type}_{key}']
+                spin.blockSignals(True)
+                spin.setValue(value)
+                spin.blockSignals(False)
+        self.update_preview()
+
+    def apply_encoder_options(self, options):
+        """인코더 설정(dict)을 저장 옵션 UI에 반영"""
+        options = pdf_encoders.normalize_options(options)
+        for w in (self.combo_encoder, self.combo_subsampling, self.check_progressive, self.spin_flate):
+            w.blockSignals(True)
+        self.combo_encoder.setCurrentIndex(self.combo_encoder.findData(options['backend']))
+        self.combo_subsampling.setCurrentText(options['subsampling'])
+        self.check_progressive.setChecked(bool(options['progressive']))
+        self.spin_flate.setValue(int(options['flate_level']))
+        for w in (self.combo_encoder, self.combo_subsampling, self.check_progressive, self.spin_flate):
+            w.blockSignals(False)
+        self.update_encoder_options()
+
+    def update_encoder_options(self, *_):
+        backend = self.combo_encoder.currentData()
+        self.settings['encoder'] = {
+            'backend': backend,
+            'subsampling': self.combo_subsampling.currentText(),
+            'progressive': self.check_progressive.isChecked(),
+            'flate_level': self.spin_flate.value(),
+        }
+        # 백엔드에 해당하는 세부 옵션만 활성화
+        self.combo_subsampling.setEnabled(backend == 'pillow-jpeg')
+        self.check_progressive.setEnabled(backend == 'pillow-jpeg')
+        self.spin_flate.setEnabled(backend == 'flate')
+        if hasattr(self, 'lbl_comp_status'):
+            self.update_comp_label(self.spin_comp.value())
+
+    def update_cache_options(self, *_):
+        self.encode_cache.spill_dir = self.cache_dir if self.check_disk_cache.isChecked() else None
+
     def update_comp_label(self, value):
         if value == 0:
             msg = "설명: 완전 무손실 저장 (MediaBox 조정) - 100% 원본 화질"
-        elif value <= 30:
-            quality = int(100 - value * 0.33)  # 30% => 품질 90%
-            msg = f"설명: 고품질 압축 (품질 {quality}%) - 화질 차이 거의 없음"
-        elif value <= 70:
-            quality = int(90 - (value - 30) * 0.50)  # 70% => 품질 70%
-            msg = f"설명: 중간 압축 (품질 {quality}%) - 약간의 화질 감소"
+        elif pdf_encoders.is_lossless(self.settings['encoder']):
+            msg = "설명: 무손실 이미지 압축 (Flate) - 렌더링 해상도 외 화질 손실 없음"
+        elif self.check_auto_quality.isChecked():
+            msg = (f"설명: 자동 화질 - 샘플 페이지 SSIM {self.spin_ssim.value():.3f} 이상을 "
+                   f"유지하는 가장 낮은 품질로 저장")
         else:
-            quality = int(70 - (value - 70) * 0.67)  # 100% => 품질 50%
-            msg = f"설명: 강한 압축 (품질 {quality}%) - 눈에 띄는 화질 감소"
+            quality = compression_to_quality(value)
+            if value <= 30:
+                msg = f"설명: 고품질 압축 (품질 {quality}%)"
+            elif value <= 70:
+                msg = f"설명: 중간 압축 (품질 {quality}%)"
+            else:
+                msg = f"설명: 강한 압축 (품질 {quality}%)"
+
+            # 추정 문구 대신 현재 페이지를 실제로 인코딩해 측정한 점수 표시 (워커에서 비동기 측정)
+            if self.doc:
+                key = self.measure_key(quality)
+                if key not in self.measure_scores:
+                    msg += " - 현재 페이지 측정 중..."
+                    self.measure_timer.start()
+                elif self.measure_scores[key]:
+                    score = self.measure_scores[key]
+                    msg += f" - 현재 페이지 SSIM {score['ssim']:.3f} / PSNR {score['psnr']:.1f} dB"
         self.lbl_comp_status.setText(msg)
 
+    def measure_key(self, quality):
+        return (self.current_page_num, quality, json.dumps(self.settings['encoder'], sort_keys=True))
+
+    def start_measure(self):
+        """현재 페이지를 저장 시와 같은 조건으로 인코딩해 SSIM/PSNR 측정 (측정 워커에 맡김)"""
+        if not self.doc:
+            return
+        if self.measure_future is not None:
+            # 이전 측정이 끝나면 poll_measure에서 최신 값으로 다시 요청
+            return
+        quality = compression_to_quality(self.spin_comp.value())
+        key = self.measure_key(quality)
+        if key in self.measure_scores:
+            return
+        try:
+            if self.measure_pool is None:
+                self.measure_pool = pdf_workers.open_measure_pool(self.doc.name)
+            options = {'dpi': COMPRESS_DPI, 'quality': quality, 'encoder': self.settings['encoder']}
+            self.measure_future = (key, self.measure_pool.submit(
+                pdf_workers.measure_page, self.current_page_num, options))
+            self.measure_poll.start()
+        except Exception as e:
+            print(f"ERROR: Quality Measure Failed: {e}")
+
+    def poll_measure(self):
+        key, future = self.measure_future
+        if not future.done():
+            return
+        self.measure_poll.stop()
+        self.measure_future = None
+        try:
+            self.measure_scores[key] = future.result()
+        except Exception as e:
+            print(f"ERROR: Quality Measure Failed: {e}")
+            self.measure_scores[key] = None
+        # 측정하는 동안 페이지/품질이 바뀌었으면 새 조건으로 다시 측정
+        self.update_comp_label(self.spin_comp.value())
+
+    def close_measure_pool(self):
+        """문서를 바꾸거나 닫을 때 측정 워커와 결과를 정리"""
+        self.measure_timer.stop()
+        self.measure_poll.stop()
+        self.measure_future = None
+        self.measure_scores = {}
+        if self.measure_pool is not None:
+            self.measure_pool.shutdown(wait=False, cancel_futures=True)
+            self.measure_pool = None
+
     def zoom_in(self):
         self.scale_factor *= 1.1
         self.update_zoom_label()
@@ -314,14 +857,24 @@ class PDFEditor(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, "PDF 열기", self.last_dir, "PDF Files (*.pdf)")
         if path:
             try:
+                self.close_measure_pool()
                 self.doc = fitz.open(path)
+                self.doc_fingerprint = pdf_cache.file_fingerprint(path)
+                # 페이지 기하(크기/회전)는 열 때 한 번만 읽어 미리보기/저장/분석이 같이 씀
+                self.page_geometry = pdf_geometry.build_geometry(self.doc)
+                self.margin_rules = None
+                # 예전에 분석한 문서면 분석 색인을 바로 불러옴 (없으면 필요할 때 분석)
+                self.page_analysis = pdf_analysis.load_index(self.cache_dir, self.doc_fingerprint)
                 self.current_page_num = 0
                 self.last_dir = os.path.dirname(path)  # 최근 폴더 갱신
 
                 size_mb = os.path.getsize(path) / (1024 * 1024)
-                self.lbl_file_info.setText(f"원본파일 크기: {size_mb:.2f} MB")
+                self.lbl_file_info.setText(f"원본파일 크기: {size_mb:.2f} MB\n"
+                                           f"{self.page_geometry.summary()}")
 
-                print(f"DEBUG: File Opened: {path}, Pages: {len(self.doc)}")
+                print(f"DEBUG: File Opened: {path}, Pages: {len(self.doc)}, "
+                      f"Sizes: {self.page_geometry.distinct_sizes}, "
+                      f"Rotated: {self.page_geometry.rotated_pages}")
                 self.update_ui_state()
                 self.update_preview()
             except Exception as e:
@@ -333,12 +886,21 @@ class PDFEditor(QMainWindow):
             total = len(self.doc)
             cur = self.current_page_num + 1
             is_even = (cur % 2 == 0)
-            self.lbl_page.setText(f"{cur} / {total} ({'짝수' if is_even else '홀수'})")
+            label = f"{cur} / {total} ({'짝수' if is_even else '홀수'}"
+            rules = self.current_margin_rules()
+            rule = rules.rule_name(self.current_page_num)
+            if self.current_page_num in rules.overrides:
+                label += ", 개별 여백"
+            elif rule:
+                label += f", 규칙: {rule}"
+            self.lbl_page.setText(label + ")")
             
             self.btn_prev.setEnabled(self.current_page_num > 0)
             self.btn_next.setEnabled(self.current_page_num < total - 1)
             
             self.tabs.setCurrentIndex(1 if is_even else 0)
+            # 페이지가 바뀌면 측정 점수도 그 페이지 기준으로 다시
+            self.update_comp_label(self.spin_comp.value())
 
     def prev_page(self):
         if self.current_page_num > 0:
@@ -352,6 +914,22 @@ class PDFEditor(QMainWindow):
             self.update_ui_state()
             self.update_preview()
 
+    def current_margin_rules(self):
+        """현재 설정을 컴파일한 여백 조회표 (설정이 바뀐 뒤 처음 부를 때만 다시 컴파일)"""
+        if self.margin_rules is None:
+            self.margin_rules = pdf_rules.MarginRules(self.settings)
+            self.margin_table = None
+        return self.margin_rules
+
+    def page_margins_pt(self, page_index):
+        """페이지(0부터)의 최종 여백(규칙/홀짝 → 목표 크기 맞춤 → 개별 여백)을 pt 단위
+        (left, right, top, bottom)로 반환. 설정이 바뀐 뒤 처음 부를 때 모든 쪽을 한 번에 계산"""
+        rules = self.current_margin_rules()
+        if self.margin_table is None:
+            self.margin_table = pdf_geometry.page_margins(self.page_geometry.bounds, self.settings,
+                                                          rules=rules).tolist()
+        return tuple(self.margin_table[page_index])
+
     def update_preview(self):
         if not self.doc:
             return
@@ -367,16 +945,12 @@ class PDFEditor(QMainWindow):
             orig_qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
             orig_pixmap = QPixmap.fromImage(orig_qimg)
             
-            cur = self.current_page_num + 1
-            is_even = (cur % 2 == 0)
-            setting = self.settings['even'] if is_even else self.settings['odd']
-
-            mm_to_px = (72 / 25.4) * 2.0
-
-            left_px = int(setting['left'] * mm_to_px)
-            right_px = int(setting['right'] * mm_to_px)
-            top_px = int(setting['top'] * mm_to_px)
-            bottom_px = int(setting['bottom'] * mm_to_px)
+            # 쪽 범위 규칙 → 홀/짝 순서로 정해진 여백 (pt → 2배 렌더 px)
+            left, right, top, bottom = self.page_margins_pt(self.current_page_num)
+            left_px = int(left * 2.0)
+            right_px = int(right * 2.0)
+            top_px = int(top * 2.0)
+            bottom_px = int(bottom * 2.0)
 
             orig_w = orig_pixmap.width()
             orig_h = orig_pixmap.height()
@@ -414,6 +988,20 @@ class PDFEditor(QMainWindow):
         except Exception as e:
             print(f"ERROR: Preview Failed: {e}")
 
+    def current_save_options(self):
+        """저장 옵션 UI 값을 pdf_engine.save_document 옵션 dict로"""
+        return {
+            'compression': int(self.spin_comp.value()),
+            'auto_quality': self.check_auto_quality.isChecked(),
+            'ssim_threshold': self.spin_ssim.value(),
+            'mrc': self.check_mrc.isChecked(),
+            'preserve': self.check_preserve.isChecked(),
+            'hard_crop': self.check_hard_crop.isChecked(),
+            'deskew': self.check_deskew.isChecked(),
+            'blank_pages': self.combo_blank.currentData(),
+            'duplicate_pages': self.combo_duplicate.currentData(),
+        }
+
     def save_pdf(self):
         if not self.doc:
             return
@@ -427,114 +1015,134 @@ class PDFEditor(QMainWindow):
             # UI 초기화
             self.progress_bar.setValue(0)
             self.btn_next.setEnabled(False) # 저장 중 조작 방지
-            
-            new_doc = fitz.open()
-            
-            compression = int(self.spin_comp.value())
-            do_compress = compression > 0
-            
-            # JPEG 품질 계산: 구간별 완만한 감소
-            # 10% => 97, 30% => 90, 70% => 70, 100% => 50
-            if compression <= 30:
-                jpg_quality = int(100 - compression * 0.33)
-            elif compression <= 70:
-                jpg_quality = int(90 - (compression - 30) * 0.50)
-            else:
-                jpg_quality = int(70 - (compression - 70) * 0.67)
-            jpg_quality = max(50, jpg_quality)
-            
-            # 압축 모드 (1~100%): 200 DPI - 속도와 품질의 균형
-            COMPRESS_DPI = 200
-            compress_matrix = fitz.Matrix(COMPRESS_DPI / 72.0, COMPRESS_DPI / 72.0)
-            
-            # 비압축 모드 (0%): 300 DPI - 원본 스캔 해상도에 근접한 품질 보장
-            LOSSLESS_DPI = 300
-            lossless_matrix = fitz.Matrix(LOSSLESS_DPI / 72.0, LOSSLESS_DPI / 72.0)
 
-            total_pages = len(self.doc)
-            
-            for i, page in enumerate(self.doc):
-                # 진행률 업데이트
-                progress = int((i + 1) / total_pages * 100)
-                self.progress_bar.setValue(progress)
+            options = self.current_save_options()
+
+            def on_progress(done, total):
+                self.progress_bar.setValue(int(done / total * 100))
                 QApplication.processEvents()
 
-                cur = i + 1
-                is_even = (cur % 2 == 0)
-                setting = self.settings['even'] if is_even else self.settings['odd']
-                
-                mm_to_pt = 72 / 25.4
-                left = setting['left'] * mm_to_pt
-                right = setting['right'] * mm_to_pt
-                top = setting['top'] * mm_to_pt
-                bottom = setting['bottom'] * mm_to_pt
-                
-                # [핵심 수정] page.bound()는 회전이 자동 반영된 실제 가시 크기를 반환
-                # page.rect는 내부 저장 규격이지만, page.bound()는 화면에 보이는 크기와 동일
-                if do_compress:
-                    # 압축 모드: get_pixmap 렌더링 후 JPEG 저장
-                    src_rect = page.bound()
-                    new_width = max(10, src_rect.width + left + right)
-                    new_height = max(10, src_rect.height + top + bottom)
-                    new_page = new_doc.new_page(width=new_width, height=new_height)
-                    target_rect = fitz.Rect(left, top, left + src_rect.width, top + src_rect.height)
-                    pix = page.get_pixmap(matrix=compress_matrix)
-                    img_data = pix.tobytes("jpg", jpg_quality=jpg_quality)
-                    new_page.insert_image(target_rect, stream=img_data)
-                else:
-                    # [완전 무손실] insert_pdf + set_mediabox 방식
-                    # 렌더링 없이 원본 콘텐츠 그대로 복사 후 MediaBox만 조정
-                    new_doc.insert_pdf(self.doc, from_page=i, to_page=i)
-                    cp = new_doc[-1]  # 방금 삽입된 페이지
-                    mb = cp.mediabox  # 현재 가시적 영역의 기준 박스
-                    rot = cp.rotation
-
-                    # 회전각에 따른 PDF 좌표계(x, y)와 시각적 방향(Left, Right, Top, Bottom) 매핑
-                    # PDF는 좌하단이 원점이며, rot=90(시계방향 회전) 시 좌표축이 뒤바뀜
-                    if rot == 0:
-                        new_mb = fitz.Rect(mb.x0 - left,   mb.y0 - bottom,
-                                           mb.x1 + right,  mb.y1 + top)
-                    elif rot == 90:
-                        new_mb = fitz.Rect(mb.x0 - bottom, mb.y0 - left,
-                                           mb.x1 + top,    mb.y1 + right)
-                    elif rot == 180:
-                        new_mb = fitz.Rect(mb.x0 - right,  mb.y0 - top,
-                                           mb.x1 + left,   mb.y1 + bottom)
-                    else:  # 270
-                        new_mb = fitz.Rect(mb.x0 - top,    mb.y0 - right,
-                                           mb.x1 + bottom, mb.y1 + left)
-
-                    # 최소 크기 제한 (PDF 규격 준수)
-                    if new_mb.width < 10: new_mb.x1 = new_mb.x0 + 10
-                    if new_mb.height < 10: new_mb.y1 = new_mb.y0 + 10
-
-                    # [핵심] CropBox/ArtBox/BleedBox/TrimBox를 페이지 딕셔너리에서
-                    # 완전히 삭제한 뒤 MediaBox만 새로 설정.
-                    # set_* 방식은 상위 페이지 트리에서 상속된 값을 제거하지 못해
-                    # clean=True 저장 시 'CropBox not in MediaBox' 오류가 발생하므로
-                    # xref_set_key로 null(삭제) 처리하는 것이 가장 안전함.
-                    for box_key in ("CropBox", "ArtBox", "BleedBox", "TrimBox"):
-                        new_doc.xref_set_key(cp.xref, box_key, "null")
-                    cp.set_mediabox(new_mb)
-            
-            # 저장: 압축 여부와 상관없이 항상 PDF 구조 최적화(garbage=4, deflate) 적용
-            new_doc.save(path, garbage=4, deflate=True, clean=False)
-            
-            new_doc.close()
-            
+            def on_status(text):
+                self.progress_bar.setFormat(f"{text} %p%" if text else "%p%")
+                QApplication.processEvents()
+
+            split_pages = self.spin_split_pages.value()
+            split_mb = self.spin_split_mb.value()
+            if split_pages or split_mb:
+                report = pdf_split.split_document(
+                    self.doc.name, path, self.settings, options, max_pages=split_pages or None,
+                    max_mb=split_mb or None, progress=on_progress, status=on_status,
+                    geometry=self.page_geometry)
+            else:
+                analysis = None
+                if pdf_engine.needs_analysis(options) and self.ensure_page_analysis():
+                    analysis = self.page_analysis
+                report = pdf_engine.save_document(
+                    self.doc, path, self.settings, options, cache=self.encode_cache,
+                    fingerprint=self.doc_fingerprint, progress=on_progress, status=on_status,
+                    analysis=analysis, geometry=self.page_geometry)
+
             # 후처리
             self.progress_bar.setValue(100)
             self.btn_next.setEnabled(True)
             self.update_ui_state() # 버튼 상태 복구
 
-            saved_size = os.path.getsize(path) / (1024 * 1024)
-            QMessageBox.information(self, "성공", f"저장이 완료되었습니다.\n저장된 크기: {saved_size:.2f} MB")
+            if 'chunks' in report:
+                msg = "저장이 완료되었습니다.\n" + pdf_split.summarize_split(report)
+            else:
+                msg = "저장이 완료되었습니다.\n" + pdf_engine.summarize_report(report)
+            if self.check_report.isChecked():
+                report_path = pdf_engine.write_report(path, report)
+                if report_path:
+                    msg += f"\n\n보고서: {os.path.basename(report_path)}"
+            QMessageBox.information(self, "성공", msg)
 
         except Exception as e:
+            self.progress_bar.setFormat("%p%")
             self.btn_next.setEnabled(True)
             print(f"\nERROR: Save Failed: {e}")
             QMessageBox.critical(self, "실패", f"저장 중 오류가 발생했습니다.\n{e}")
 
+    def batch_process(self):
+        """폴더 안의 PDF를 프리셋(또는 현재 설정)과 현재 저장 옵션으로 병렬 일괄 처리"""
+        src_dir = QFileDialog.getExistingDirectory(self, "일괄 처리할 폴더", self.last_dir)
+        if not src_dir:
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "결과 저장 폴더", src_dir)
+        if not out_dir:
+            return
+
+        items = ["(현재 설정)"] + list(self.presets.keys())
+        name, ok = QInputDialog.getItem(self, "일괄 처리", "적용할 프리셋:", items, 0, False)
+        if not ok:
+            return
+        settings = self.settings if name == items[0] else self.presets[name]
+        timeout, ok = QInputDialog.getInt(self, "일괄 처리", "파일당 제한 시간 (초, 0 = 제한 없음):",
+                                          600, 0, 86400)
+        if not ok:
+            return
+
+        jobs = pdf_batch.plan_jobs([src_dir], out_dir)
+        if not jobs:
+            QMessageBox.information(self, "알림", "처리할 PDF 파일이 없습니다.")
+            return
+
+        settings = pdf_engine.normalize_settings(settings)
+        options = self.current_save_options()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("기존 결과 확인 중...")
+        try:
+            # 이전 실행 기록과 같은 결과가 이미 있는 파일은 건너뜀 (중단된 일괄 처리 이어서 하기)
+            ledger, jobs, skipped = pdf_batch.plan_resume(
+                jobs, out_dir, settings, options,
+                on_hash=lambda done, total: QApplication.processEvents())
+        except Exception as e:
+            self.progress_bar.setFormat("%p%")
+            print(f"ERROR: Batch Failed: {e}")
+            QMessageBox.critical(self, "실패", f"일괄 처리 중 오류가 발생했습니다.\n{e}")
+            return
+
+        print(f"DEBUG: Batch {len(jobs)} files ({len(skipped)} up to date): {src_dir} → {out_dir}")
+        self.progress_bar.setFormat(f"일괄 처리 0 / {len(jobs)}")
+        finished = []
+
+        def on_event(kind, job, data):
+            if kind == 'finish':
+                finished.append(data)
+                self.progress_bar.setValue(int(len(finished) / len(jobs) * 100))
+                self.progress_bar.setFormat(f"일괄 처리 {len(finished)} / {len(jobs)}")
+            QApplication.processEvents()
+
+        t0 = time.perf_counter()
+        try:
+            results = skipped + pdf_batch.run_batch(jobs, settings, options,
+                                                    timeout=timeout or None, on_event=on_event,
+                                                    ledger=ledger)
+        except Exception as e:
+            print(f"ERROR: Batch Failed: {e}")
+            QMessageBox.critical(self, "실패", f"일괄 처리 중 오류가 발생했습니다.\n{e}")
+            return
+        finally:
+            self.progress_bar.setFormat("%p%")
+        totals = pdf_batch.summarize(results, time.perf_counter() - t0)
+
+        csv_path = os.path.join(out_dir, "batch_summary.csv")
+        try:
+            pdf_batch.write_csv(csv_path, results)
+        except Exception as e:
+            print(f"요약 CSV 저장 실패: {e}")
+
+        box = QMessageBox(self)
+        box.setWindowTitle("일괄 처리 완료")
+        box.setText(f"파일 {totals['files']}개 중 성공 {totals['ok']}개, 실패 {totals['failed']}개, "
+                    f"건너뜀 {totals['skipped']}개\n"
+                    f"{totals['pages']} 페이지, {totals['wall_seconds']}초 "
+                    f"({totals['pages_per_sec']} 페이지/초)\n"
+                    f"{totals['in_mb']} MB → {totals['out_mb']} MB\n\n"
+                    f"요약: {os.path.basename(csv_path)}")
+        box.setDetailedText(pdf_batch.format_table(results))
+        box.exec()
+
     # --- 설정 관리 (JSON) ---
     def load_settings(self):
         if os.path.exists(self.settings_file):
@@ -549,6 +1157,11 @@ class PDFEditor(QMainWindow):
                             for key in ['left', 'right', 'top', 'bottom']:
                                 val = last.get(p_type, {}).get(key, 0.0)
                                 self.inputs[f'{p_type}_{key}'].setValue(val)
+                        self.apply_encoder_options(last.get('encoder'))
+                        self.set_rules(last.get('rules'))
+                        self.set_overrides(last.get('overrides'))
+                        self.apply_page_size(last.get('page_size'))
+                        self.apply_cleanup(last.get('cleanup'))
 
                     # 프리셋 로드
                     if 'presets' in data:
@@ -576,6 +1189,8 @@ class PDFEditor(QMainWindow):
     def closeEvent(self, event):
         # 프로그램 종료 시 자동 저장
         self.save_settings_to_file()
+        self.encode_cache.flush()
+        self.close_measure_pool()
         event.accept()
 
     def save_preset_dialog(self):
@@ -601,9 +1216,18 @@ class PDFEditor(QMainWindow):
                 for key in ['left', 'right', 'top', 'bottom']:
                     val = data.get(p_type, {}).get(key, 0.0)
                     self.inputs[f'{p_type}_{key}'].setValue(val)
+            self.apply_encoder_options(data.get('encoder'))
+            self.set_rules(data.get('rules'))
+            self.set_overrides(data.get('overrides'))
+            self.apply_page_size(data.get('page_size'))
+            self.apply_cleanup(data.get('cleanup'))
+            self.update_ui_state()
+            self.update_preview()
             QMessageBox.information(self, "완료", f"'{name}' 설정이 적용되었습니다.")
 
 if __name__ == '__main__':
+    # 압축 저장 워커 풀(spawn)이 EXE에서 자기 자신을 다시 실행하지 않도록
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     editor = PDFEditor()
     editor.show()
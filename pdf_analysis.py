@@ -0,0 +1,489 @@
+"""페이지 내용 영역 분석: 저해상도 렌더 + NumPy 잉크 투영으로 페이지별 내용 bbox를 구하고
+홀/짝 페이지 통계로 내용 위치가 일정해지는 여백을 제안한다.
+
+렌더링은 pdf_workers 풀(프로세스마다 원본을 한 번 열어 둠)에서 병렬로 처리한다.
+분석 결과(페이지별 bbox, 잉크 비율, 색 분류, 이미지 DPI, 회전, 기울기, 지각 해시)는 배열 표 하나로 캐시 폴더에
+원본 파일 지문 이름으로 저장해, 같은 문서를 다시 열면 렌더링 없이 바로 불러온다.
+"""
+import functools
+import os
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import pdf_cache
+import pdf_engine
+import pdf_geometry
+import pdf_workers
+
+# 분석용 렌더링 해상도 (A4 약 200 x 280 px - 글자 줄은 보이고 렌더링은 빠름)
+ANALYSIS_DPI = 24
+# 종이 밝기(밝은 쪽 백분위)보다 이만큼 어두운 픽셀을 잉크로 봄 (0~255 회색조).
+# 저해상도에서 작은 글자는 옅은 회색으로 뭉개지므로 고정 임계값 대신 종이 기준 대비 사용
+INK_CONTRAST = 48
+PAPER_PERCENTILE = 90
+# 행/열의 잉크 픽셀이 이 비율 미만이면 티끌로 보고 무시
+MIN_LINE_INK = 0.004
+# 스캔 가장자리의 그림자/테두리는 내용에서 제외 (페이지 크기 대비 비율)
+EDGE_IGNORE = 0.015
+# 홀/짝 통계 백분위: 대부분의 페이지 내용이 들어가도록 바깥쪽 5%만 예외로 봄
+OUTLIER_PERCENTILE = 5
+# 한 번에 워커에 보내는 페이지 수
+CHUNK_PAGES = 16
+# 채도(RGB 최대 - 최소)가 이보다 큰 픽셀이 COLOR_MIN_FRACTION 이상이면 컬러 페이지
+COLOR_CHROMA = 40
+COLOR_MIN_FRACTION = 0.002
+# 기울기 추정: 글자 줄이 구분되는 해상도로 따로 렌더링해 ±MAX_SKEW도 안에서 투영 분산이 가장
+# 큰 각도를 찾음 (거친 간격으로 훑은 뒤 최적 각도 주변을 세밀하게)
+SKEW_DPI = 72
+MAX_SKEW = 5.0
+SKEW_STEP = 0.5
+SKEW_FINE_STEP = 0.05
+# 잉크 픽셀이 이보다 적으면 추정하지 않고, 많으면 이 수만큼만 골라 계산
+SKEW_MIN_INK = 300
+SKEW_MAX_POINTS = 6000
+# 최적 각도의 투영 분산이 전체 후보 중앙값의 이 배수 미만이면 줄 구조가 없는 페이지로 보고 0
+SKEW_MIN_GAIN = 1.2
+
+# 빈 페이지: 잉크 비율과 회색조 표준편차가 모두 이 값 이하 (쪽 번호 하나 정도의 잉크,
+# 종이 결/비침 정도의 밝기 변화는 빈 페이지로 봄)
+BLANK_MAX_INK = 0.0005
+BLANK_MAX_STD = 6.0
+
+# 중복 페이지: 내용 영역(bbox)만 잘라 HASH_GRID x HASH_GRID 블록 평균의 DCT 저주파 HASH_LOW x HASH_LOW
+# (DC 제외)를 중앙값과 비교한 64비트 지각 해시(pHash). 잘라서 비교하므로 다시 스캔할 때의 위치
+# 차이는 거의 영향이 없고, 글자 배치가 다른 쪽은 해시가 크게 달라진다
+HASH_GRID = 32
+HASH_LOW = 8
+# 해시 전 대비 정규화: HASH_PAPER_BLOCK px 블록마다 종이 밝기(PAPER_PERCENTILE 백분위)를 구해 블록
+# 사이를 선형 보간한 배경으로 나눔 (노출/감마/조명 그림자/비침이 다른 재스캔도 같은 내용 bbox와
+# 밝기 분포가 되게). 그다음 3x3로 살짝 흐려 1px 위치 차이가 블록 평균을 흔들지 않게 한다
+HASH_PAPER_BLOCK = 24
+# 앞뒤 DUPLICATE_WINDOW 쪽 안에서(재스캔/겹쳐 들어간 쪽) 해시가 이 비트 수 이하로 다르면 중복
+# (정규화 후 재스캔 쌍은 10비트 이내, 배치가 같은 다른 본문 쪽은 16비트 이상 차이)
+DUPLICATE_MAX_DISTANCE = 10
+DUPLICATE_WINDOW = 2
+
+# 색 분류 값
+COLOR_BLANK = 0
+COLOR_GRAY = 1
+COLOR_COLOR = 2
+COLOR_NAMES = {COLOR_BLANK: 'blank', COLOR_GRAY: 'gray', COLOR_COLOR: 'color'}
+
+# 분석 색인 파일 (캐시 폴더 아래). 분석 방식이 바뀌면 버전을 올려 예전 색인은 다시 계산
+INDEX_DIR_NAME = "analysis"
+INDEX_VERSION = 5
+INDEX_FIELDS = ('bbox', 'page_size', 'ink', 'color', 'image_dpi', 'rotation', 'skew', 'gray_std',
+                'phash')
+
+
+def ink_mask(gray, contrast=INK_CONTRAST):
+    """회색조 배열 → 잉크 여부 bool 배열 (종이 밝기 대비)"""
+    # 256단계 히스토그램 누적으로 백분위 계산 (정렬 없이)
+    cdf = np.cumsum(np.bincount(gray.ravel(), minlength=256))
+    paper = int(np.searchsorted(cdf, cdf[-1] * PAPER_PERCENTILE / 100))
+    return gray < paper - contrast
+
+
+def _clear_edges(ink, edge_ignore=EDGE_IGNORE):
+    """잉크 배열 가장자리(스캔 그림자/테두리)를 제외 (제자리 수정)"""
+    h, w = ink.shape
+    ex, ey = int(w * edge_ignore), int(h * edge_ignore)
+    if ex or ey:
+        ink[:ey, :] = False
+        ink[h - ey:, :] = False
+        ink[:, :ex] = False
+        ink[:, w - ex:] = False
+    return ink
+
+
+def gray_spread(gray, edge_ignore=EDGE_IGNORE):
+    """가장자리를 뺀 회색조 표준편차: 비침/얼룩은 잉크 기준을 넘지 않아도 값이 커짐"""
+    h, w = gray.shape
+    ex, ey = int(w * edge_ignore), int(h * edge_ignore)
+    return float(gray[ey:h - ey or None, ex:w - ex or None].std())
+
+
+def ink_bounds(gray, min_line_ink=MIN_LINE_INK, edge_ignore=EDGE_IGNORE):
+    """회색조 배열(h, w)의 내용 bbox (x0, y0, x1, y1, px)와 잉크 비율. 내용이 없으면 bbox None"""
+    h, w = gray.shape
+    ink = _clear_edges(ink_mask(gray), edge_ignore)
+    ratio = float(ink.mean())
+    rows = np.flatnonzero(ink.sum(axis=1) > max(0, w * min_line_ink))
+    cols = np.flatnonzero(ink.sum(axis=0) > max(0, h * min_line_ink))
+    if rows.size == 0 or cols.size == 0:
+        return None, ratio
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1), ratio
+
+
+def _projection_scores(ys, xs, angles):
+    """각도별로 잉크 좌표를 기울여 행 히스토그램을 만들고 제곱합(투영 분산) 반환: (A,)
+
+    좌표를 정수 행으로 반올림하면 작은 각도 차이가 구분되지 않으므로 이웃한 두 행에
+    거리 비율로 나눠 넣는다 (선형 보간 히스토그램)."""
+    tans = np.tan(np.radians(angles)).astype(np.float32)
+    rows = ys[None, :] + xs[None, :] * tans[:, None]
+    base = np.floor(rows)
+    frac = (rows - base).ravel()
+    base = base.astype(np.int32)
+    base -= base.min()
+    span = int(base.max()) + 2
+    # 각도마다 다른 구간으로 옮겨 bincount 한 번으로 모든 각도의 히스토그램 계산
+    base = (base + np.arange(len(angles), dtype=np.int32)[:, None] * span).ravel()
+    size = len(angles) * span
+    counts = (np.bincount(base, weights=1 - frac, minlength=size)
+              + np.bincount(base + 1, weights=frac, minlength=size))
+    counts = counts.reshape(len(angles), span)
+    return (counts * counts).sum(axis=1)
+
+
+def skew_angle(ink, max_angle=MAX_SKEW):
+    """잉크 배열(h, w)의 기울기(도). 양수 = 내용이 반시계 방향으로 돌아가 있음.
+    글자 줄처럼 수평 구조가 없거나 잉크가 적으면 0"""
+    ys, xs = np.nonzero(ink)
+    if ys.size < SKEW_MIN_INK:
+        return 0.0
+    if ys.size > SKEW_MAX_POINTS:
+        step = -(-ys.size // SKEW_MAX_POINTS)
+        ys, xs = ys[::step], xs[::step]
+    ys = ys.astype(np.float32)
+    xs = xs.astype(np.float32) - ink.shape[1] / 2  # 가운데 기준으로 기울임
+    coarse = np.arange(-max_angle, max_angle + SKEW_STEP / 2, SKEW_STEP)
+    scores = _projection_scores(ys, xs, coarse)
+    best = int(np.argmax(scores))
+    if scores[best] < np.median(scores) * SKEW_MIN_GAIN:
+        return 0.0
+    fine = np.arange(coarse[best] - SKEW_STEP, coarse[best] + SKEW_STEP + SKEW_FINE_STEP / 2,
+                     SKEW_FINE_STEP)
+    return round(float(fine[np.argmax(_projection_scores(ys, xs, fine))]), 2) + 0.0  # -0.0 → 0.0
+
+
+def page_skew(page, dpi=SKEW_DPI):
+    """페이지를 회색조로 렌더링해 기울기(도) 추정"""
+    zoom = dpi / 72.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    return skew_angle(_clear_edges(ink_mask(gray)))
+
+
+def image_dpi(page):
+    """페이지에 놓인 이미지의 실제 해상도 중 최댓값 (이미지가 없으면 0)"""
+    best = 0.0
+    if not page.get_images():
+        return best  # 리소스만 보는 빠른 확인 (get_image_info는 페이지 내용을 해석함)
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info['bbox'])
+        if bbox.is_empty or not info['width'] or not info['height']:
+            continue
+        dpi = min(info['width'] / (bbox.width / 72.0), info['height'] / (bbox.height / 72.0))
+        best = max(best, dpi)
+    return best
+
+
+@functools.lru_cache(maxsize=4)
+def _dct_matrix(n):
+    """n점 DCT-II 정규 직교 행렬 (2차원 DCT = D @ X @ D.T)"""
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+def block_means(gray, rows, cols):
+    """회색조 배열을 rows x cols 블록 평균으로 줄임 (블록보다 작은 변은 픽셀을 반복해 늘림)"""
+    h, w = gray.shape
+    if h < rows:
+        gray = gray[np.linspace(0, h - 1, rows).round().astype(np.intp)]
+    if w < cols:
+        gray = gray[:, np.linspace(0, w - 1, cols).round().astype(np.intp)]
+    h, w = gray.shape
+    ys = np.linspace(0, h, rows + 1).astype(np.intp)
+    xs = np.linspace(0, w, cols + 1).astype(np.intp)
+    sums = np.add.reduceat(np.add.reduceat(gray.astype(np.float32), ys[:-1], axis=0),
+                           xs[:-1], axis=1)
+    return sums / np.outer(np.diff(ys), np.diff(xs))
+
+
+@functools.lru_cache(maxsize=8)
+def _interp_matrix(n, blocks):
+    """블록 중심 값 → 픽셀 n개 선형 보간 행렬 (n, blocks). 바깥쪽은 가장자리 블록 값"""
+    size = n // blocks
+    centers = (np.arange(blocks) + 0.5) * size
+    return np.stack([np.interp(np.arange(n), centers, e) for e in np.eye(blocks)], axis=1)
+
+
+def paper_level(gray, block=HASH_PAPER_BLOCK):
+    """블록별 종이 밝기(PAPER_PERCENTILE 백분위)를 선형 보간한 배경 밝기 배열 (float32)"""
+    h, w = gray.shape
+    rows, cols = max(1, h // block), max(1, w // block)
+    bh, bw = h // rows, w // cols
+    blocks = gray[:rows * bh, :cols * bw].reshape(rows, bh, cols, bw)
+    levels = np.percentile(blocks, PAPER_PERCENTILE, axis=(1, 3))
+    return (_interp_matrix(h, rows) @ levels @ _interp_matrix(w, cols).T).astype(np.float32)
+
+
+def normalize_contrast(gray):
+    """종이 배경으로 나눠 0~1로 맞춘 밝기 배열 (종이 1, 잉크 0 쪽)"""
+    return np.clip(gray.astype(np.float32) / np.maximum(paper_level(gray), 1.0), 0.0, 1.0)
+
+
+def _blur3(x):
+    """1-2-1 분리형 3x3 흐림 (가장자리는 반복)"""
+    p = np.pad(x, 1, mode='edge')
+    p = p[:-2] + 2 * p[1:-1] + p[2:]
+    return (p[:, :-2] + 2 * p[:, 1:-1] + p[:, 2:]) / 16
+
+
+def page_hash(gray):
+    """회색조 렌더의 64비트 지각 해시: 대비 정규화 → 내용 bbox 자르기 → 흐림 → DCT (내용이 없으면 0)"""
+    norm = normalize_contrast(gray)
+    box, _ = ink_bounds((norm * 255).astype(np.uint8))
+    if box is None:
+        return 0
+    x0, y0, x1, y1 = box
+    means = block_means(_blur3(norm[y0:y1, x0:x1]), HASH_GRID, HASH_GRID)
+    dct = _dct_matrix(HASH_GRID)
+    low = (dct @ means @ dct.T)[:HASH_LOW, :HASH_LOW].ravel()[1:]
+    bits = np.append(low > np.median(low), False)  # 63비트 + 0
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_distance(a, b):
+    """uint64 해시 배열 사이의 다른 비트 수 (원소별)"""
+    x = np.bitwise_xor(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64))
+    return np.unpackbits(x.reshape(-1, 1).view(np.uint8), axis=1).sum(axis=1)
+
+
+def color_class(rgb):
+    """내용이 있는 페이지의 RGB 배열(h, w, 3) → COLOR_GRAY / COLOR_COLOR"""
+    r, g, b = (rgb[..., k].astype(np.int16) for k in range(3))
+    colored = (np.abs(r - g) > COLOR_CHROMA) | (np.abs(g - b) > COLOR_CHROMA)
+    if np.count_nonzero(colored) >= colored.size * COLOR_MIN_FRACTION:
+        return COLOR_COLOR
+    return COLOR_GRAY
+
+
+def analyze_page(index, dpi=ANALYSIS_DPI):
+    """워커에서 한 페이지 분석 → dict (bbox: 가시 좌표 pt 또는 None, ink, color, image_dpi, skew,
+    gray_std, phash). 크기/회전은 페이지 기하 표에서 채운다"""
+    page = pdf_workers._worker_doc[index]
+    zoom = dpi / 72.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+    rgb = np.frombuffer(pix.samples, dtype=np.uint8)
+    rgb = rgb.reshape(pix.height, pix.stride)[:, :pix.width * 3].reshape(pix.height, pix.width, 3)
+    # 정수 가중합으로 회색조 변환 (ITU-R BT.601)
+    gray = (rgb @ np.array([77, 150, 29], dtype=np.uint16) >> 8).astype(np.uint8)
+    box, ratio = ink_bounds(gray)
+    result = {'index': index, 'bbox': None, 'ink': ratio,
+              'color': color_class(rgb) if box else COLOR_BLANK,
+              'image_dpi': image_dpi(page),
+              'skew': page_skew(page) if box else 0.0, 'gray_std': gray_spread(gray),
+              'phash': page_hash(gray) if box else 0}
+    if box is not None:
+        bound = page.bound()
+        # 픽셀 → 가시 좌표(pt). 렌더 크기는 정수로 반올림되므로 실제 비율로 환산
+        sx, sy = bound.width / pix.width, bound.height / pix.height
+        result['bbox'] = (bound.x0 + box[0] * sx, bound.y0 + box[1] * sy,
+                          bound.x0 + box[2] * sx, bound.y0 + box[3] * sy)
+    return result
+
+
+def _analyze_chunk(indices, dpi):
+    return [analyze_page(i, dpi) for i in indices]
+
+
+def analyze_document(path, workers=None, dpi=ANALYSIS_DPI, progress=None, geometry=None):
+    """문서 전체 페이지 분석 → 배열 표 (dict, 키는 INDEX_FIELDS)
+
+    bbox: (n, 4) float32 가시 좌표 pt (내용 없는 페이지는 NaN), page_size: (n, 2) 가시 크기 pt,
+    ink: (n,) 잉크 비율, color: (n,) uint8 색 분류, image_dpi: (n,) 이미지 최대 DPI,
+    rotation: (n,) 회전각, skew: (n,) 기울기(도, 양수 = 반시계), gray_std: (n,) 회색조 표준편차,
+    phash: (n,) uint64 내용 영역 지각 해시 (내용 없는 페이지는 0)
+    geometry: 이미 만든 페이지 기하 표 (pdf_geometry.PageGeometry). 크기/회전은 여기서 가져옴
+    """
+    progress = progress or (lambda done, total: None)
+    if geometry is None:
+        with fitz.open(path) as doc:
+            geometry = pdf_geometry.build_geometry(doc)
+    total = len(geometry)
+    table = {
+        'bbox': np.full((total, 4), np.nan, dtype=np.float32),
+        'page_size': geometry.page_sizes.astype(np.float32),
+        'ink': np.zeros(total, dtype=np.float32),
+        'color': np.zeros(total, dtype=np.uint8),
+        'image_dpi': np.zeros(total, dtype=np.float32),
+        'rotation': geometry.rotation.copy(),
+        'skew': np.zeros(total, dtype=np.float32),
+        'gray_std': np.zeros(total, dtype=np.float32),
+        'phash': np.zeros(total, dtype=np.uint64),
+    }
+    chunks = [list(range(s, min(s + CHUNK_PAGES, total))) for s in range(0, total, CHUNK_PAGES)]
+    pool = pdf_workers.open_pool(path, workers)
+    try:
+        if pool is None:
+            results = (_analyze_chunk(c, dpi) for c in chunks)
+        else:
+            results = pool.map(_analyze_chunk, chunks, [dpi] * len(chunks))
+        done = 0
+        for chunk in results:
+            for r in chunk:
+                i = r['index']
+                if r['bbox'] is not None:
+                    table['bbox'][i] = r['bbox']
+                for key in ('ink', 'color', 'image_dpi', 'skew', 'gray_std', 'phash'):
+                    table[key][i] = r[key]
+            done += len(chunk)
+            progress(done, total)
+    finally:
+        if pool:
+            pool.shutdown()
+    return table
+
+
+def index_path(cache_dir, fingerprint):
+    return os.path.join(cache_dir, INDEX_DIR_NAME, f"{fingerprint}.npz")
+
+
+def load_index(cache_dir, fingerprint):
+    """저장된 분석 색인 불러오기. 없거나 버전이 다르거나 읽을 수 없으면 None"""
+    path = index_path(cache_dir, fingerprint)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            if int(data['version']) != INDEX_VERSION:
+                return None
+            return {key: data[key] for key in INDEX_FIELDS}
+    except Exception as e:
+        print(f"분석 색인 읽기 실패: {e}")
+        return None
+
+
+def save_index(cache_dir, fingerprint, table):
+    """분석 색인 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = index_path(cache_dir, fingerprint)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".part"
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, version=INDEX_VERSION, **{k: table[k] for k in INDEX_FIELDS})
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"분석 색인 저장 실패: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def get_analysis(path, cache_dir=None, fingerprint=None, workers=None, progress=None,
+                 geometry=None):
+    """색인이 있으면 불러오고, 없으면 분석해 저장한 뒤 반환 (cache_dir가 없으면 저장 안 함)"""
+    if cache_dir:
+        fingerprint = fingerprint or pdf_cache.file_fingerprint(path)
+        table = load_index(cache_dir, fingerprint)
+        if table is not None:
+            return table
+    table = analyze_document(path, workers=workers, progress=progress, geometry=geometry)
+    if cache_dir:
+        save_index(cache_dir, fingerprint, table)
+    return table
+
+
+def blank_pages(analysis, max_ink=BLANK_MAX_INK, max_std=BLANK_MAX_STD):
+    """빈(거의 빈) 페이지 번호 목록 (0부터)"""
+    blank = (analysis['ink'] <= max_ink) & (analysis['gray_std'] <= max_std)
+    return np.flatnonzero(blank).tolist()
+
+
+def duplicate_pages(analysis, max_distance=DUPLICATE_MAX_DISTANCE, window=DUPLICATE_WINDOW):
+    """거의 같은 페이지 쌍 [(앞 쪽, 뒤 쪽, 다른 비트 수), ...] (0부터, 앞 쪽 순).
+    앞뒤 window 쪽 안에서만 비교하며, 내용이 없거나 빈 페이지는 제외 (빈 페이지 처리가 따로 있음)"""
+    hashes = analysis['phash']
+    valid = ~np.isnan(analysis['bbox'][:, 0])
+    valid[blank_pages(analysis)] = False
+    pairs = []
+    for k in range(1, window + 1):
+        if len(hashes) <= k:
+            break
+        dist = hash_distance(hashes[:-k], hashes[k:])
+        hit = np.flatnonzero((dist <= max_distance) & valid[:-k] & valid[k:])
+        pairs += [(int(i), int(i) + k, int(dist[i])) for i in hit]
+    return sorted(pairs)
+
+
+def duplicate_drops(pairs):
+    """중복 쌍에서 뺄 페이지 → 남기는 쪽 {뒤 쪽: 처음 나온 쪽} (4=5=6이면 5, 6 모두 4로)"""
+    drops = {}
+    for i, j, _ in pairs:  # 앞 쪽 순이므로 i가 이미 빠진 쪽이면 그 원본이 정해져 있음
+        drops.setdefault(j, drops.get(i, i))
+    return drops
+
+
+def propose_margins(analysis, target_mm=10.0, percentile=OUTLIER_PERCENTILE):
+    """홀/짝 페이지별 여백 제안 (settings['odd'/'even'] 형식, mm).
+
+    각 쪽의 내용 바깥 여백(좌/우/상/하)을 홀/짝으로 나눠 백분위로 모아(대부분의 페이지 내용이
+    잘리지 않게) 내용 영역을 정하고, 홀/짝 결과 페이지 크기가 같아지도록 큰 쪽 내용 크기에 맞춰
+    target_mm 여백을 둔다. 내용이 있는 페이지가 없으면 None
+    """
+    bbox, sizes = analysis['bbox'], analysis['page_size']
+    has_content = ~np.isnan(bbox[:, 0])
+    # page.bound() 가시 좌표는 원점이 (0, 0)이므로 bbox가 곧 왼쪽/위 여백
+    gaps = np.column_stack([bbox[:, 0], sizes[:, 0] - bbox[:, 2],
+                            bbox[:, 1], sizes[:, 1] - bbox[:, 3]])
+    parity = np.arange(len(bbox)) % 2  # 0 = 홀수 쪽(1, 3, ...), 1 = 짝수 쪽
+
+    stats = {}
+    for p_type, p in (('odd', 0), ('even', 1)):
+        sel = has_content & (parity == p)
+        if not sel.any():
+            continue
+        g = gaps[sel]
+        # 가장 바깥까지 나온 내용 기준 (여백이 작은 쪽 백분위)
+        low = np.percentile(g, percentile, axis=0)
+        content_w = np.percentile(sizes[sel, 0], 50) - low[0] - low[1]
+        content_h = np.percentile(sizes[sel, 1], 50) - low[2] - low[3]
+        stats[p_type] = {'gaps': low, 'content': (content_w, content_h), 'pages': int(sel.sum())}
+    if not stats:
+        return None
+    if len(stats) == 1:
+        # 한쪽 면만 내용이 있으면 같은 값 사용
+        only = next(iter(stats.values()))
+        stats = {'odd': only, 'even': only}
+
+    target = target_mm * pdf_engine.MM_TO_PT
+    common_w = max(s['content'][0] for s in stats.values())
+    common_h = max(s['content'][1] for s in stats.values())
+    proposal = {}
+    for p_type, s in stats.items():
+        left, right, top, bottom = s['gaps']
+        extra_w = (common_w - s['content'][0]) / 2
+        extra_h = (common_h - s['content'][1]) / 2
+        margins_pt = {
+            'left': target + extra_w - left,
+            'right': target + extra_w - right,
+            'top': target + extra_h - top,
+            'bottom': target + extra_h - bottom,
+        }
+        proposal[p_type] = {side: round(float(v) / pdf_engine.MM_TO_PT, 1)
+                            for side, v in margins_pt.items()}
+    return proposal
+
+
+def content_summary(analysis):
+    """분석 결과 요약 (페이지 수, 내용 없는 페이지 수, 평균 잉크 비율, 색 분류별 수,
+    서로 다른 페이지 크기 수, 회전된 페이지 수, 기울기 보정 대상 페이지 수, 중복 의심 쌍 수,
+    이미지 DPI 중앙값)"""
+    has_content = ~np.isnan(analysis['bbox'][:, 0])
+    dpi = analysis['image_dpi'][analysis['image_dpi'] > 0]
+    counts = np.bincount(analysis['color'], minlength=len(COLOR_NAMES))
+    return {
+        'pages': int(len(has_content)),
+        'empty_pages': int((~has_content).sum()),
+        'mean_ink': round(float(analysis['ink'].mean()) if len(has_content) else 0.0, 4),
+        'colors': {name: int(counts[c]) for c, name in COLOR_NAMES.items()},
+        'distinct_sizes': len(pdf_geometry.size_classes(analysis['page_size'])[1]),
+        'rotated_pages': int((analysis['rotation'] % 360 != 0).sum()),
+        'skewed_pages': int((np.abs(analysis['skew']) >= pdf_engine.MIN_DESKEW).sum()),
+        'duplicate_pairs': len(duplicate_pages(analysis)),
+        'median_image_dpi': round(float(np.median(dpi))) if dpi.size else 0,
+    }
@@ -0,0 +1,360 @@
+"""여러 PDF 일괄 처리: 파일마다 별도 프로세스로 저장 엔진을 실행 (동시 실행 수 제한, 파일별 시간 제한)
+
+큰 파일부터 시작해 마지막에 큰 파일 하나만 남아 전체 시간이 늘어나는 것을 막는다.
+시간 제한을 넘긴 파일은 해당 프로세스만 종료하고 나머지는 계속 처리한다.
+처리 기록(ledger)을 출력 폴더에 남겨, 다시 실행하면 내용/설정/엔진 버전이 같고 출력이 그대로인
+파일은 건너뛰고 중단된 지점부터 이어서 처리한다.
+"""
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+import pdf_workers
+
+# 상태 값
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_TIMEOUT = 'timeout'
+STATUS_CANCELLED = 'cancelled'
+STATUS_SKIPPED = 'skipped'
+
+# 일괄 처리 기록 파일 (출력 폴더)
+BATCH_LEDGER_NAME = ".pdf_batch_ledger.jsonl"
+# 내용 해시 계산 시 한 번에 읽는 양
+HASH_CHUNK = 4 * 1024 * 1024
+
+# 결과 메시지를 기다리는 최대 간격 (초) - 시간 제한 확인 주기
+POLL_INTERVAL = 0.2
+
+SUMMARY_COLUMNS = ['file', 'status', 'pages', 'seconds', 'pages_per_sec', 'in_mb', 'out_mb', 'error']
+
+
+def collect_pdfs(paths, recursive=True):
+    """파일/폴더 목록을 (입력 경로, 출력용 상대 경로) 목록으로 펼침"""
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            pattern = os.path.join(p, '**', '*.pdf') if recursive else os.path.join(p, '*.pdf')
+            for path in sorted(glob.glob(pattern, recursive=recursive)):
+                files.append((path, os.path.relpath(path, p)))
+        elif os.path.isfile(p):
+            files.append((p, os.path.basename(p)))
+    return files
+
+
+def plan_jobs(paths, output_dir, recursive=True):
+    """일괄 처리 작업 목록: 큰 파일부터 (출력 폴더 안의 파일은 다시 처리하지 않음)"""
+    out_root = os.path.abspath(output_dir)
+    jobs = []
+    for path, rel in collect_pdfs(paths, recursive):
+        if os.path.abspath(path).startswith(out_root + os.sep):
+            continue
+        jobs.append({'input': path, 'output': os.path.join(output_dir, rel),
+                     'size': os.path.getsize(path)})
+    jobs.sort(key=lambda job: job['size'], reverse=True)
+    return jobs
+
+
+def content_hash(path):
+    """파일 전체 내용의 SHA-256 (pdf_cache.file_fingerprint와 같은 값)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Ledger:
+    """처리 기록 (JSON Lines, 한 줄 = 한 파일 결과). 기록 즉시 디스크에 반영 (일괄 처리/감시 폴더 공용)"""
+    def __init__(self, path, retry_failed=False):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 강제 종료로 잘린 마지막 줄
+                    if retry_failed and entry.get('status') != STATUS_OK:
+                        self.entries.pop(entry['key'], None)
+                        continue
+                    self.entries[entry['key']] = entry
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def record(self, key, result):
+        entry = {'key': key, 'time': time.strftime('%Y-%m-%d %H:%M:%S'), **result}
+        self.entries[key] = entry
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _stat_key(path, st):
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def plan_resume(jobs, output_dir, settings, options=None, force=False, on_hash=None):
+    """처리 기록과 비교해 (기록, 처리할 작업 목록, 건너뛴 결과 목록) 반환.
+
+    기록 키는 (입력 내용 해시, 설정 해시, 엔진 버전, 출력 상대 경로). 이전에 성공했고 출력 파일의
+    크기/수정 시각이 기록과 같으면 건너뛴다. 입력 크기/수정 시각이 그대로인 파일은 기록된
+    내용 해시를 재사용해 다시 읽지 않는다. force=True면 모두 다시 처리(기록은 갱신).
+    on_hash(done, total): 해시 계산 진행률 콜백
+    """
+    import pdf_engine
+
+    ledger = Ledger(os.path.join(output_dir, BATCH_LEDGER_NAME))
+    known_hashes = {e['input_stat']: e['content_hash'] for e in ledger.entries.values()
+                    if 'input_stat' in e}
+    signature = pdf_engine.settings_signature(settings, options)
+    todo, skipped = [], []
+    for n, job in enumerate(jobs):
+        st = os.stat(job['input'])
+        input_stat = _stat_key(job['input'], st)
+        digest = known_hashes.get(input_stat) or content_hash(job['input'])
+        rel_output = os.path.relpath(job['output'], output_dir).replace(os.sep, '/')
+        key = f"{digest}|{signature}|{pdf_engine.ENGINE_VERSION}|{rel_output}"
+        job = dict(job, key=key, input_stat=input_stat, content_hash=digest)
+        entry = ledger.entries.get(key)
+        if not force and entry and entry['status'] == STATUS_OK \
+                and _output_matches(job['output'], entry):
+            result = _result(job, STATUS_SKIPPED, time.perf_counter(), entry['pages'])
+            result.update(seconds=0, pages_per_sec=0, out_mb=entry['out_mb'])
+            skipped.append(result)
+        else:
+            todo.append(job)
+        if on_hash:
+            on_hash(n + 1, len(jobs))
+    return ledger, todo, skipped
+
+
+def _output_matches(path, entry):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return [st.st_size, st.st_mtime_ns] == entry.get('output_stat')
+
+
+def record_result(ledger, job, result):
+    """성공한 작업을 처리 기록에 남김 (실패/시간 초과는 다음 실행 때 다시 처리)"""
+    if result['status'] != STATUS_OK:
+        return
+    st = os.stat(job['output'])
+    ledger.record(job['key'], dict(result, input_stat=job['input_stat'],
+                                   content_hash=job['content_hash'],
+                                   output_stat=[st.st_size, st.st_mtime_ns]))
+
+
+def default_concurrency():
+    return pdf_workers.default_worker_count()
+
+
+def _run_job(conn, job, settings, options):
+    """작업 프로세스: 한 파일을 저장하고 진행/결과를 파이프로 보고"""
+    import fitz  # PyMuPDF
+    import pdf_engine
+
+    def on_progress(done, total):
+        conn.send(('progress', done, total))
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(job['output'])), exist_ok=True)
+        if 'pages' in job:
+            # 분할 저장의 한 조각 (원본의 일부 쪽만)
+            import pdf_split
+            report = pdf_split.save_chunk(job, settings, options, progress=on_progress)
+        else:
+            with fitz.open(job['input']) as doc:
+                # 기록(ledger)용으로 구한 내용 해시가 곧 캐시 지문 (파일을 다시 읽지 않음)
+                report = pdf_engine.save_document(doc, job['output'], settings, options,
+                                                  fingerprint=job.get('content_hash'),
+                                                  progress=on_progress)
+        conn.send(('done', {'pages': report['total_pages'], 'saved_mb': report['saved_mb']}))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _result(job, status, started, pages=0, error=''):
+    seconds = time.perf_counter() - started
+    out_bytes = os.path.getsize(job['output']) if status == STATUS_OK else 0
+    return {
+        'file': job['input'],
+        'output': job['output'],
+        'status': status,
+        'pages': pages,
+        'seconds': round(seconds, 2),
+        'pages_per_sec': round(pages / seconds, 2) if pages and seconds > 0 else 0,
+        'in_mb': round(job['size'] / (1024 * 1024), 2),
+        'out_mb': round(out_bytes / (1024 * 1024), 2),
+        'error': error,
+    }
+
+
+class JobRunner:
+    """파일별 작업 프로세스를 최대 concurrency개까지 돌리는 실행기 (일괄 처리/감시 폴더 공용).
+
+    submit()으로 작업을 넣고 poll()을 반복 호출하면 끝난 작업의 결과 목록을 돌려준다.
+    settings/options: pdf_engine.save_document 인자 (모든 파일 공통)
+    timeout: 파일당 제한 시간(초), None이면 제한 없음
+    on_event(kind, job, data): 'start' / 'progress'(done, total) / 'finish'(결과) 알림
+    파일마다 이미 별도 프로세스이므로 파일 안의 페이지 인코딩은 그 프로세스에서 직접 한다.
+    """
+    def __init__(self, settings, options=None, concurrency=None, timeout=None, on_event=None):
+        self.settings = settings
+        self.options = dict(options or {})
+        self.options['workers'] = 1
+        self.concurrency = max(1, concurrency or default_concurrency())
+        self.timeout = timeout
+        self.on_event = on_event or (lambda kind, job, data: None)
+        self.ctx = multiprocessing.get_context('spawn')
+        self.running = {}  # 수신 파이프 → (작업, 프로세스, 시작 시각, 처리한 쪽수)
+
+    def has_capacity(self):
+        return len(self.running) < self.concurrency
+
+    def submit(self, job):
+        recv, send = self.ctx.Pipe(duplex=False)
+        proc = self.ctx.Process(target=_run_job, args=(send, job, self.settings, self.options))
+        proc.start()
+        send.close()  # 자식만 송신 끝을 갖게 해야 비정상 종료 시 EOF를 받는다
+        self.running[recv] = (job, proc, time.perf_counter(), 0)
+        self.on_event('start', job, None)
+
+    def _finish(self, conn, status, pages=0, error=''):
+        job, proc, started, _ = self.running.pop(conn)
+        proc.join(1)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+        conn.close()
+        result = _result(job, status, started, pages, error)
+        self.on_event('finish', job, result)
+        return result
+
+    def poll(self, wait_seconds=POLL_INTERVAL):
+        """진행 메시지를 처리하고 시간 제한을 확인한 뒤 이번에 끝난 작업 결과 목록 반환"""
+        finished = []
+        if not self.running:
+            time.sleep(wait_seconds)
+            return finished
+        for conn in wait(list(self.running), timeout=wait_seconds):
+            try:
+                msg = conn.recv()
+            except EOFError:
+                finished.append(self._finish(conn, STATUS_FAILED, error="작업 프로세스가 비정상 종료됨"))
+                continue
+            job, proc, started, pages = self.running[conn]
+            if msg[0] == 'progress':
+                self.running[conn] = (job, proc, started, msg[1])
+                self.on_event('progress', job, (msg[1], msg[2]))
+            elif msg[0] == 'done':
+                finished.append(self._finish(conn, STATUS_OK, msg[1]['pages']))
+            else:
+                finished.append(self._finish(conn, STATUS_FAILED, pages, msg[1]))
+
+        if self.timeout:
+            now = time.perf_counter()
+            for conn, (job, proc, started, pages) in list(self.running.items()):
+                if now - started > self.timeout:
+                    proc.kill()
+                    finished.append(self._finish(conn, STATUS_TIMEOUT, pages,
+                                                 f"{self.timeout}초 제한 초과"))
+        return finished
+
+    def cancel(self, predicate):
+        """predicate(job)가 참인 실행 중 작업을 종료하고 결과 목록 반환"""
+        finished = []
+        for conn, (job, proc, started, pages) in list(self.running.items()):
+            if predicate(job):
+                proc.kill()
+                finished.append(self._finish(conn, STATUS_CANCELLED, pages, "취소됨"))
+        return finished
+
+    def shutdown(self):
+        """남은 작업 프로세스 강제 종료 (중단 시)"""
+        for conn, (job, proc, started, pages) in list(self.running.items()):
+            proc.kill()
+            proc.join()
+            conn.close()
+        self.running.clear()
+
+
+def run_batch(jobs, settings, options=None, concurrency=None, timeout=None, on_event=None,
+              ledger=None):
+    """작업 목록을 동시에 최대 concurrency개씩 처리하고 파일별 결과 목록 반환 (인자는 JobRunner와 같음)
+
+    ledger: plan_resume()의 처리 기록. 주면 파일이 끝날 때마다 바로 기록해 중단돼도 이어서 처리할 수 있다.
+    """
+    runner = JobRunner(settings, options, concurrency, timeout, on_event)
+    queue = list(jobs)
+    by_input = {job['input']: job for job in jobs}
+    results = []
+    try:
+        while queue or runner.running:
+            while queue and runner.has_capacity():
+                runner.submit(queue.pop(0))
+            for result in runner.poll():
+                if ledger is not None:
+                    record_result(ledger, by_input[result['file']], result)
+                results.append(result)
+    finally:
+        # 중단(Ctrl+C 등) 시 남은 작업 프로세스 정리
+        runner.shutdown()
+    return results
+
+
+def summarize(results, wall_seconds):
+    """전체 합계: 파일 수/실패 수/건너뛴 수/총 쪽수/처리 속도/용량 (건너뛴 파일은 쪽수/속도에서 제외)"""
+    ok = [r for r in results if r['status'] == STATUS_OK]
+    skipped = [r for r in results if r['status'] == STATUS_SKIPPED]
+    pages = sum(r['pages'] for r in ok)
+    return {
+        'files': len(results),
+        'ok': len(ok),
+        'failed': len(results) - len(ok) - len(skipped),
+        'skipped': len(skipped),
+        'pages': pages,
+        'wall_seconds': round(wall_seconds, 2),
+        'pages_per_sec': round(pages / wall_seconds, 2) if wall_seconds > 0 else 0,
+        'in_mb': round(sum(r['in_mb'] for r in ok), 2),
+        'out_mb': round(sum(r['out_mb'] for r in ok), 2),
+    }
+
+
+def format_table(results, totals=None):
+    """결과 목록을 고정폭 표 문자열로 (CLI 출력 / GUI 상세 보기 공용)"""
+    rows = [{k: (os.path.basename(r[k]) if k == 'file' else r[k]) for k in SUMMARY_COLUMNS}
+            for r in results]
+    widths = {h: max([len(h)] + [len(str(r[h])) for r in rows]) for h in SUMMARY_COLUMNS}
+    lines = ["  ".join(h.ljust(widths[h]) for h in SUMMARY_COLUMNS).rstrip()]
+    for r in rows:
+        lines.append("  ".join(str(r[h]).ljust(widths[h]) for h in SUMMARY_COLUMNS).rstrip())
+    if totals:
+        lines.append("")
+        lines.append(f"파일 {totals['files']}개 (성공 {totals['ok']}, 실패 {totals['failed']}, "
+                     f"건너뜀 {totals['skipped']}), "
+                     f"{totals['pages']} 페이지, {totals['wall_seconds']}초, "
+                     f"{totals['pages_per_sec']} 페이지/초, "
+                     f"{totals['in_mb']} MB → {totals['out_mb']} MB")
+    return "\n".join(lines)
+
+
+def write_csv(path, results):
+    import csv
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS + ['output'])
+        writer.writeheader()
+        for r in results:
+            writer.writerow({k: r[k] for k in SUMMARY_COLUMNS + ['output']})
@@ -0,0 +1,119 @@
+"""압축 저장용 인코딩 결과 캐시: 여백만 바꿔 다시 저장할 때 페이지 렌더링/인코딩을 건너뜀"""
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+from pdf_imaging import encoded_size
+
+# 파일 지문 계산 시 한 번에 읽는 양
+FINGERPRINT_CHUNK = 4 * 1024 * 1024
+
+# 메모리 캐시 기본 한도 (약 200 DPI JPEG 3000페이지 분량)
+DEFAULT_MEMORY_BYTES = 512 * 1024 * 1024
+
+# 이 프로세스에서 구한 지문 {(절대 경로, 크기, mtime_ns): 지문}
+_fingerprints = {}
+
+
+def file_fingerprint(path):
+    """파일 전체 내용의 SHA-256 (pdf_batch.content_hash와 같은 값). 경로/이름이 바뀌어도 같은 파일이면
+    같은 값. 전체를 읽으므로 같은 경로·크기·수정 시각이면 프로세스 안에서 다시 계산하지 않음"""
+    st = os.stat(path)
+    stat_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    fingerprint = _fingerprints.get(stat_key)
+    if fingerprint is None:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK), b''):
+                h.update(chunk)
+        fingerprint = _fingerprints[stat_key] = h.hexdigest()
+    return fingerprint
+
+
+def encode_key(fingerprint, page_index, dpi, quality, mode, encoder, clip=None, cleanup=None):
+    """캐시 키: (원본 지문, 페이지, DPI, 품질, 모드, 인코더 설정, 렌더링 clip, 배경 정리 설정).
+
+    여백은 포함하지 않는다. 음수 여백(자르기)은 clip으로만 반영되므로
+    양수 여백만 바꾸면 그대로 재사용된다.
+    """
+    clip = tuple(round(v, 2) for v in clip) if clip else None
+    return (fingerprint, page_index, dpi, quality, mode, json.dumps(encoder, sort_keys=True), clip,
+            json.dumps(cleanup, sort_keys=True) if cleanup else None)
+
+
+class EncodeCache:
+    """인코딩 결과 LRU 캐시 (메모리), 한도를 넘으면 가장 오래된 항목을 디스크로 내보냄.
+
+    spill_dir가 없으면 밀려난 항목은 버린다. 디스크 항목은 키 해시 파일명이라
+    프로그램을 다시 시작해도 같은 원본/설정이면 그대로 재사용된다.
+    """
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _spill_path(self, key):
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.spill_dir, name[:2], name + ".pkl")
+
+    def get(self, key, need_score=False):
+        encoded = self.entries.get(key)
+        if encoded is not None:
+            self.entries.move_to_end(key)
+        elif self.spill_dir and os.path.exists(self._spill_path(key)):
+            try:
+                with open(self._spill_path(key), 'rb') as f:
+                    encoded = pickle.load(f)
+                self._store(key, encoded)
+            except Exception as e:
+                print(f"캐시 읽기 실패: {e}")
+                encoded = None
+        if encoded is None or (need_score and 'score' not in encoded):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return encoded
+
+    def put(self, key, encoded):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= encoded_size(old)
+        self._store(key, encoded)
+
+    def _store(self, key, encoded):
+        self.entries[key] = encoded
+        self.bytes += encoded_size(encoded)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            old_key, old = self.entries.popitem(last=False)
+            self.bytes -= encoded_size(old)
+            self._spill(old_key, old)
+
+    def _spill(self, key, encoded):
+        if not self.spill_dir:
+            return
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump(encoded, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"캐시 쓰기 실패: {e}")
+
+    def flush(self):
+        """메모리 항목을 모두 디스크에도 기록 (프로그램 종료 시)"""
+        if self.spill_dir:
+            for key, encoded in self.entries.items():
+                self._spill(key, encoded)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries),
+                'memory_mb': round(self.bytes / (1024 * 1024), 2)}
@@ -0,0 +1,470 @@
+"""PDF 여백 편집기 명령줄 도구 (PyQt6 없이 동작 - 서버/스크립트용)
+
+사용 예:
+    python pdf_cli.py process 입력.pdf -o 출력.pdf --margins 10 10 5 5
+    python pdf_cli.py process 입력.pdf --preset 제본용 --compression 30 --mrc
+    python pdf_cli.py process 입력.pdf --compression 30 --split-mb 20
+    python pdf_cli.py batch 스캔폴더/ -o 결과폴더/ --preset 제본용 --timeout 600 --csv 요약.csv
+    python pdf_cli.py watch 스캔수신/ -o 처리완료/ --preset 제본용 --compression 30
+    python pdf_cli.py merge 1장.pdf 2장.pdf 3장.pdf -o 책.pdf --preset 제본용
+    python pdf_cli.py merge --manifest 목록.json -o 책.pdf --compression 30
+    python pdf_cli.py serve --port 8765 -j 2
+    python pdf_cli.py analyze 입력.pdf --target 10 --save-settings 제안.json
+    python pdf_cli.py presets
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+# 종료 코드
+EXIT_OK = 0
+EXIT_FAILED = 1
+
+
+def add_settings_arguments(parser):
+    """여백/프리셋 인자 (이후 일괄 처리 명령에서도 공용)"""
+    group = parser.add_argument_group("여백 (mm, 음수 = 자르기)")
+    group.add_argument('--settings', help="설정 파일 경로 (기본: 프로그램 폴더의 pdf_editor_settings.json)")
+    group.add_argument('--preset', help="설정 파일의 프리셋 이름 ('last' = 마지막 사용 설정)")
+    group.add_argument('--margins', nargs=4, type=float, metavar=('L', 'R', 'T', 'B'),
+                       help="홀수/짝수 페이지 공통 여백")
+    group.add_argument('--odd', nargs=4, type=float, metavar=('L', 'R', 'T', 'B'),
+                       help="홀수 페이지 여백")
+    group.add_argument('--even', nargs=4, type=float, metavar=('L', 'R', 'T', 'B'),
+                       help="짝수 페이지 여백")
+    group.add_argument('--rules', metavar='JSON',
+                       help="쪽 범위 여백 규칙 파일 (프리셋의 규칙 대신 사용) "
+                            '[{"pages": "1-2", "parity": "all", "priority": 1, "top": 20}, ...]')
+    group.add_argument('--whiten', action='store_true',
+                       help="압축 저장 전 누런 종이/배경 잡음을 흰색으로 (레벨 조정)")
+    group.add_argument('--despeckle', action='store_true',
+                       help="압축 저장 전 흰 바탕의 외딴 티끌 제거")
+    group.add_argument('--page-size', metavar='NAME',
+                       help="모든 쪽을 이 크기로 맞춤: none, A4, A5, B5, B5-JIS, 신국판, custom "
+                            "(custom은 --page-size-mm와 함께)")
+    group.add_argument('--page-size-mm', nargs=2, type=float, metavar=('W', 'H'),
+                       help="사용자 지정 목표 크기 (mm, 세로 방향)")
+    group.add_argument('--anchor', choices=('center', 'gutter'),
+                       help="목표 크기 맞춤 기준: center(가운데), gutter(제본 쪽 여백 유지)")
+
+
+def add_save_arguments(parser):
+    """압축/저장 옵션 인자 (GUI '저장 옵션'과 동일). --help가 빠르도록 fitz를 쓰는 엔진은 가져오지 않음
+    (인코더 이름은 명령 실행 시 settings_from_args에서 확인)"""
+    import pdf_options
+
+    group = parser.add_argument_group("저장 옵션")
+    group.add_argument('--compression', type=int, default=0, metavar='0-100',
+                       help="압축 수준 %% (0 = 완전 무손실, 기본 0)")
+    group.add_argument('--auto-quality', action='store_true',
+                       help="샘플 페이지 SSIM 기준으로 품질 자동 선택")
+    group.add_argument('--ssim', type=float, default=0.95, help="자동 화질 기준 SSIM (기본 0.95)")
+    group.add_argument('--mrc', action='store_true', help="MRC 모드 (글자/배경 분리 압축)")
+    group.add_argument('--preserve', action='store_true',
+                       help="텍스트/벡터 유지 (페이지 안 이미지만 재압축)")
+    group.add_argument('--hard-crop', action='store_true',
+                       help="무손실 저장에서 이미지 전용 페이지의 잘린 픽셀 제거")
+    group.add_argument('--deskew', action='store_true',
+                       help="기울어진 페이지를 페이지 변환으로 바로잡기 (무손실/텍스트 유지 저장)")
+    group.add_argument('--blank-pages', choices=pdf_options.BLANK_MODES, default='keep',
+                       help="빈 페이지 처리: keep(그대로), flag(보고만), minimal(흰 페이지로), "
+                            "drop(제외) (기본 keep)")
+    group.add_argument('--duplicate-pages', choices=pdf_options.DUPLICATE_MODES, default='keep',
+                       help="거의 같은(재스캔/겹쳐 들어간) 페이지 처리: keep(그대로), flag(보고만), "
+                            "drop(처음 나온 쪽만 남김) (기본 keep)")
+    group.add_argument('--encoder', metavar='NAME',
+                       help="이미지 인코더: mupdf-jpeg, pillow-jpeg, jpx, flate "
+                            "(pillow-jpeg/jpx는 Pillow 필요, 기본: 프리셋 설정)")
+    group.add_argument('--workers', type=int, help="병렬 워커 수 (기본: CPU 수 - 1, 최대 8)")
+    group.add_argument('--disk-cache', action='store_true', help="인코딩 캐시를 디스크에도 보관")
+    group.add_argument('--report', action='store_true', help="저장 보고서(JSON) 함께 저장")
+
+
+def settings_from_args(args):
+    """프리셋/여백 인자로 저장 설정(last_settings 형식) 구성. 잘못된 프리셋/규칙/인코더는 ValueError"""
+    import json
+    import pdf_encoders
+    import pdf_engine
+
+    if args.encoder and args.encoder not in pdf_encoders.available_encoders():
+        raise ValueError(f"쓸 수 없는 인코더: {args.encoder} "
+                         f"(사용 가능: {', '.join(pdf_encoders.available_encoders())})")
+    data = pdf_engine.load_settings_file(args.settings)
+    if args.preset:
+        settings = pdf_engine.preset_settings(data, args.preset)
+    else:
+        settings = pdf_engine.default_settings()
+    for p_type, values in (('odd', args.margins), ('even', args.margins),
+                           ('odd', args.odd), ('even', args.even)):
+        if values:
+            settings[p_type] = dict(zip(pdf_engine.SIDES, values))
+    if args.encoder:
+        settings['encoder']['backend'] = args.encoder
+    if args.rules:
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            settings['rules'] = json.load(f)
+    if args.whiten or args.despeckle:
+        cleanup = dict(settings.get('cleanup') or {})
+        cleanup['whiten'] = cleanup.get('whiten') or args.whiten
+        cleanup['despeckle'] = cleanup.get('despeckle') or args.despeckle
+        settings['cleanup'] = cleanup
+    if args.page_size or args.page_size_mm or args.anchor:
+        page_size = dict(settings.get('page_size') or {})
+        if args.page_size_mm:
+            page_size['preset'] = 'custom'
+            page_size['width'], page_size['height'] = args.page_size_mm
+        if args.page_size:
+            page_size['preset'] = args.page_size
+        if args.anchor:
+            page_size['anchor'] = args.anchor
+        settings['page_size'] = page_size
+    return pdf_engine.normalize_settings(settings)
+
+
+def save_options_from_args(args):
+    return {
+        'compression': max(0, min(100, args.compression)),
+        'auto_quality': args.auto_quality,
+        'ssim_threshold': args.ssim,
+        'mrc': args.mrc,
+        'preserve': args.preserve,
+        'hard_crop': args.hard_crop,
+        'deskew': args.deskew,
+        'blank_pages': args.blank_pages,
+        'duplicate_pages': args.duplicate_pages,
+        'workers': args.workers,
+    }
+
+
+def default_output_path(input_path):
+    base, ext = os.path.splitext(input_path)
+    return f"{base}_edited{ext or '.pdf'}"
+
+
+def cmd_process(args):
+    import fitz  # PyMuPDF
+    import pdf_cache
+    import pdf_engine
+
+    try:
+        settings = settings_from_args(args)
+    except (ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    output = args.output or default_output_path(args.input)
+    cache = pdf_cache.EncodeCache(
+        spill_dir=pdf_engine.cache_dir_path() if args.disk_cache else None)
+
+    def on_progress(done, total):
+        if not args.quiet:
+            print(f"\r  {done} / {total}", end='', file=sys.stderr, flush=True)
+
+    if args.split_pages or args.split_mb:
+        return _process_split(args, settings, output, on_progress)
+
+    t0 = time.perf_counter()
+    try:
+        with fitz.open(args.input) as doc:
+            report = pdf_engine.save_document(doc, output, settings, save_options_from_args(args),
+                                              cache=cache, progress=on_progress)
+    except Exception as e:
+        print(f"\nERROR: Save Failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        cache.flush()
+    elapsed = time.perf_counter() - t0
+
+    if not args.quiet:
+        print(file=sys.stderr)
+        print(f"{args.input} → {output} ({report['total_pages']} 페이지, {elapsed:.1f}초)")
+        print(pdf_engine.summarize_report(report))
+    if args.report:
+        report_path = pdf_engine.write_report(output, report)
+        if report_path and not args.quiet:
+            print(f"보고서: {report_path}")
+    return EXIT_OK
+
+
+def _process_split(args, settings, output, on_progress):
+    import pdf_split
+
+    t0 = time.perf_counter()
+    try:
+        report = pdf_split.split_document(args.input, output, settings, save_options_from_args(args),
+                                          max_pages=args.split_pages, max_mb=args.split_mb,
+                                          concurrency=args.jobs, progress=on_progress)
+    except Exception as e:
+        print(f"\nERROR: Save Failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if not args.quiet:
+        print(file=sys.stderr)
+        print(f"{args.input} → {output} ({report['total_pages']} 페이지, "
+              f"{time.perf_counter() - t0:.1f}초)")
+        print(pdf_split.summarize_split(report))
+    return EXIT_OK
+
+
+def cmd_batch(args):
+    import pdf_batch
+
+    try:
+        settings = settings_from_args(args)
+    except (ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    jobs = pdf_batch.plan_jobs(args.paths, args.output_dir, recursive=not args.no_recursive)
+    if not jobs:
+        print("ERROR: 처리할 PDF 파일이 없습니다.", file=sys.stderr)
+        return EXIT_FAILED
+    options = save_options_from_args(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    ledger, todo, skipped = pdf_batch.plan_resume(jobs, args.output_dir, settings, options,
+                                                  force=args.force)
+    concurrency = args.jobs or pdf_batch.default_concurrency()
+    print(f"BATCH: {len(todo)} files, {concurrency} concurrent"
+          + (f", {len(skipped)} up to date" if skipped else "")
+          + (f", timeout {args.timeout:g}s" if args.timeout else ""))
+
+    def on_event(kind, job, data):
+        if kind == 'finish' and not args.quiet:
+            print(f"  [{data['status']}] {job['input']} ({data['seconds']}초)"
+                  + (f" - {data['error']}" if data['error'] else ""))
+
+    t0 = time.perf_counter()
+    results = skipped + pdf_batch.run_batch(todo, settings, options, concurrency=concurrency,
+                                            timeout=args.timeout, on_event=on_event, ledger=ledger)
+    totals = pdf_batch.summarize(results, time.perf_counter() - t0)
+    print()
+    print(pdf_batch.format_table(results, totals))
+    if args.csv:
+        pdf_batch.write_csv(args.csv, results)
+        print(f"BATCH: CSV → {args.csv}")
+    return EXIT_OK if not totals['failed'] else EXIT_FAILED
+
+
+def cmd_watch(args):
+    import pdf_watch
+
+    try:
+        settings = settings_from_args(args)
+    except (ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if not os.path.isdir(args.input_dir):
+        print(f"ERROR: 감시할 폴더가 없습니다: {args.input_dir}", file=sys.stderr)
+        return EXIT_FAILED
+    watcher = pdf_watch.FolderWatcher(
+        args.input_dir, args.output_dir, settings, save_options_from_args(args),
+        concurrency=args.jobs, timeout=args.timeout, interval=args.interval,
+        settle=args.settle, metrics_interval=args.metrics_interval,
+        retry_failed=args.retry_failed, log=lambda msg: print(msg, flush=True))
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("WATCH: 중단됨")
+    return EXIT_OK
+
+
+def cmd_merge(args):
+    import pdf_cache
+    import pdf_engine
+    import pdf_merge
+
+    try:
+        settings = settings_from_args(args)
+        sources = [(path, settings) for path in args.inputs]
+        if args.manifest:
+            sources += pdf_merge.load_manifest(
+                args.manifest, pdf_engine.load_settings_file(args.settings), settings)
+    except (ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if not sources:
+        print("ERROR: 병합할 PDF가 없습니다.", file=sys.stderr)
+        return EXIT_FAILED
+    cache = pdf_cache.EncodeCache(
+        spill_dir=pdf_engine.cache_dir_path() if args.disk_cache else None)
+
+    def on_progress(done, total):
+        if not args.quiet:
+            print(f"\r  {done} / {total}", end='', file=sys.stderr, flush=True)
+
+    t0 = time.perf_counter()
+    try:
+        report = pdf_merge.merge_documents(sources, args.output, save_options_from_args(args),
+                                           cache=cache, progress=on_progress,
+                                           compact=args.compact)
+    except Exception as e:
+        print(f"\nERROR: Merge Failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        cache.flush()
+    if not args.quiet:
+        print(file=sys.stderr)
+        print(f"{args.output} ({time.perf_counter() - t0:.1f}초)")
+        print(pdf_merge.summarize_merge(report))
+    return EXIT_OK
+
+
+def cmd_serve(args):
+    import pdf_server
+
+    try:
+        pdf_server.serve(args.host, args.port, concurrency=args.jobs, timeout=args.timeout)
+    except (ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        print("SERVER: 중단됨")
+    return EXIT_OK
+
+
+def cmd_analyze(args):
+    import json
+    import pdf_analysis
+    import pdf_engine
+
+    def on_progress(done, total):
+        print(f"\r  {done} / {total}", end='', file=sys.stderr, flush=True)
+
+    t0 = time.perf_counter()
+    try:
+        analysis = pdf_analysis.get_analysis(
+            args.input, cache_dir=None if args.no_cache else pdf_engine.cache_dir_path(),
+            workers=args.workers, progress=on_progress)
+    except Exception as e:
+        print(f"\nERROR: Analysis Failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    print(file=sys.stderr)
+    summary = pdf_analysis.content_summary(analysis)
+    print(f"{args.input}: {summary['pages']} 페이지 ({summary['empty_pages']} 빈 페이지), "
+          f"{time.perf_counter() - t0:.1f}초")
+    print(f"색: {summary['colors']}, 크기 {summary['distinct_sizes']}종, "
+          f"회전 {summary['rotated_pages']}쪽, "
+          f"기울어짐 {summary['skewed_pages']}쪽, "
+          f"이미지 DPI 중앙값 {summary['median_image_dpi']}")
+    blank = pdf_analysis.blank_pages(analysis)
+    if blank:
+        print(f"빈 페이지 {len(blank)}쪽: {', '.join(str(i + 1) for i in blank)}")
+    duplicates = pdf_analysis.duplicate_pages(analysis)
+    if duplicates:
+        print(f"중복 의심 {len(duplicates)}쌍: "
+              + ', '.join(f"{i + 1}={j + 1} ({d}비트)" for i, j, d in duplicates))
+    proposal = pdf_analysis.propose_margins(analysis, args.target)
+    if proposal is None:
+        print("ERROR: 내용이 있는 페이지가 없습니다.", file=sys.stderr)
+        return EXIT_FAILED
+    for p_type in ('odd', 'even'):
+        print(f"{p_type}: {[proposal[p_type][k] for k in pdf_engine.SIDES]} (L, R, T, B mm)")
+    if args.save_settings:
+        # --settings 파일 --preset last로 그대로 쓸 수 있는 형식
+        settings = pdf_engine.default_settings()
+        settings.update(proposal)
+        with open(args.save_settings, 'w', encoding='utf-8') as f:
+            json.dump({'last_settings': settings}, f, indent=4, ensure_ascii=False)
+        print(f"설정: {args.save_settings}")
+    return EXIT_OK
+
+
+def cmd_presets(args):
+    import pdf_engine
+
+    data = pdf_engine.load_settings_file(args.settings)
+    names = ['last'] + list(data.get('presets', {}))
+    for name in names:
+        s = pdf_engine.preset_settings(data, name)
+        odd, even = s['odd'], s['even']
+        print(f"{name}: 홀수 {[odd[k] for k in pdf_engine.SIDES]} / "
+              f"짝수 {[even[k] for k in pdf_engine.SIDES]} / 인코더 {s['encoder']['backend']}")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pdf_cli", description="PDF 여백 편집기 명령줄 도구")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('process', help="PDF 한 개에 여백/압축 적용")
+    p.add_argument('input', help="입력 PDF")
+    p.add_argument('-o', '--output', help="출력 PDF (기본: <입력>_edited.pdf)")
+    p.add_argument('-q', '--quiet', action='store_true', help="진행/요약 출력 생략")
+    p.add_argument('--split-pages', type=int, help="분할 저장: 파일당 최대 쪽수")
+    p.add_argument('--split-mb', type=float, help="분할 저장: 파일당 목표 용량(MB, 예상치 기준)")
+    p.add_argument('-j', '--jobs', type=int, help="분할 조각을 동시에 저장할 프로세스 수")
+    add_settings_arguments(p)
+    add_save_arguments(p)
+    p.set_defaults(func=cmd_process)
+
+    p = sub.add_parser('batch', help="폴더/여러 PDF를 같은 설정으로 병렬 일괄 처리 (큰 파일부터)")
+    p.add_argument('paths', nargs='+', help="PDF 파일 또는 폴더")
+    p.add_argument('-o', '--output-dir', required=True, help="출력 폴더 (입력 폴더 구조 유지)")
+    p.add_argument('-j', '--jobs', type=int, help="동시에 처리할 파일 수 (기본: CPU 수 - 1, 최대 8)")
+    p.add_argument('--timeout', type=float, help="파일당 제한 시간(초)")
+    p.add_argument('--no-recursive', action='store_true', help="하위 폴더는 처리하지 않음")
+    p.add_argument('--csv', help="결과 요약을 CSV로 저장할 경로")
+    p.add_argument('--force', action='store_true',
+                   help="처리 기록과 같은 결과가 이미 있어도 모두 다시 처리")
+    p.add_argument('-q', '--quiet', action='store_true', help="파일별 진행 출력 생략")
+    add_settings_arguments(p)
+    add_save_arguments(p)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser('watch', help="감시 폴더: 새로 들어오는 PDF를 계속 자동 처리")
+    p.add_argument('input_dir', help="감시할 폴더 (하위 폴더 포함)")
+    p.add_argument('-o', '--output-dir', required=True, help="출력 폴더 (처리 기록/지표 파일도 여기에)")
+    p.add_argument('-j', '--jobs', type=int, help="동시에 처리할 파일 수 (기본: CPU 수 - 1, 최대 8)")
+    p.add_argument('--timeout', type=float, help="파일당 제한 시간(초)")
+    p.add_argument('--interval', type=float, default=2.0, help="폴더 검사 주기(초, 기본 2)")
+    p.add_argument('--settle', type=float, default=5.0,
+                   help="크기가 이 시간(초) 동안 그대로면 다 쓰인 파일로 처리 (기본 5)")
+    p.add_argument('--metrics-interval', type=float, default=60,
+                   help="지표 출력/기록 주기(초, 0 = 끔, 기본 60)")
+    p.add_argument('--retry-failed', action='store_true', help="이전에 실패한 파일도 다시 처리")
+    add_settings_arguments(p)
+    add_save_arguments(p)
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser('merge', help="여러 PDF를 원본별 여백 설정으로 처리해 한 권으로 병합")
+    p.add_argument('inputs', nargs='*', help="병합할 PDF (순서대로, 공통 여백/프리셋 적용)")
+    p.add_argument('--manifest',
+                   help='원본별 설정 목록 JSON: [{"input": 경로, "preset": 이름 | "settings": {...}}, ...]')
+    p.add_argument('-o', '--output', required=True, help="출력 PDF")
+    p.add_argument('--compact', action='store_true',
+                   help="끝에 전체 저장으로 증분 저장 이력 정리 (메모리가 병합본 전체 크기만큼 필요)")
+    p.add_argument('-q', '--quiet', action='store_true', help="진행/요약 출력 생략")
+    add_settings_arguments(p)
+    add_save_arguments(p)
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser('serve', help="로컬 HTTP 작업 서비스 (localhost 전용)")
+    p.add_argument('--host', default='127.0.0.1', help="바인드 주소 (루프백만 허용, 기본 127.0.0.1)")
+    p.add_argument('--port', type=int, default=8765, help="포트 (기본 8765)")
+    p.add_argument('-j', '--jobs', type=int, help="동시에 처리할 작업 수 (기본: CPU 수 - 1, 최대 8)")
+    p.add_argument('--timeout', type=float, help="작업당 제한 시간(초)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('analyze', help="내용 영역을 분석해 홀/짝 여백 제안")
+    p.add_argument('input', help="입력 PDF")
+    p.add_argument('--target', type=float, default=10.0, help="내용 둘레에 남길 여백(mm, 기본 10)")
+    p.add_argument('--workers', type=int, help="병렬 워커 수 (기본: CPU 수 - 1, 최대 8)")
+    p.add_argument('--no-cache', action='store_true', help="분석 색인을 쓰지 않고 다시 분석")
+    p.add_argument('--save-settings', metavar='JSON',
+                   help="제안 여백을 설정 파일로 저장 (--settings JSON --preset last로 사용)")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser('presets', help="설정 파일의 프리셋 목록")
+    p.add_argument('--settings', help="설정 파일 경로")
+    p.set_defaults(func=cmd_presets)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    # 워커 풀(spawn)이 EXE에서 자기 자신을 다시 실행하지 않도록
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""무손실 저장의 하드 크롭: 이미지 한 장으로 된 스캔 페이지에서 잘려 나간 픽셀을 실제로 제거"""
+import io
+import zlib
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import pdf_encoders
+import pdf_imaging
+
+try:
+    from PIL import Image, JpegImagePlugin
+except ImportError:  # Pillow 미설치 시 JPEG 원본은 고품질 재인코딩
+    Image = None
+
+# 원본이 이미 손실 압축(JPEG/JPEG 2000)이면 무손실로 풀어 저장할 경우 용량이 커지므로 JPEG로 재인코딩.
+# JPEG 원본은 Pillow로 원본 양자화 테이블/서브샘플링을 그대로 쓰고 MCU 격자에 맞춰 잘라
+# 블록 단위로 거의 같은 계수가 나오게 하고, 그 외에는 고품질로 인코딩한다.
+LOSSY_FILTERS = ('DCTDecode', 'JPXDecode')
+LOSSY_RECROP_QUALITY = 95
+
+# JpegImagePlugin.get_sampling 값 → MCU 크기 (가로, 세로)
+MCU_SIZE = {0: (8, 8), 1: (16, 8), 2: (16, 16)}
+
+COLORSPACES = {1: '/DeviceGray', 3: '/DeviceRGB', 4: '/DeviceCMYK'}
+
+
+def single_image_info(page):
+    """페이지가 '이미지 한 장만' 있는 스캔 페이지면 (이미지 정보, get_images 항목) 반환, 아니면 None.
+
+    텍스트(OCR 포함), 벡터 그림, 주석/링크, 투명 마스크가 있으면 콘텐츠 손실을 막기 위해 제외한다.
+    """
+    images = page.get_images(full=True)
+    if len(images) != 1 or images[0][1]:  # 이미지 1개, SMask 없음
+        return None
+    infos = page.get_image_info(xrefs=True)
+    if len(infos) != 1 or infos[0]['xref'] != images[0][0]:
+        return None
+    if page.first_annot or page.get_links() or page.get_text("text").strip():
+        return None
+    if page.get_drawings():
+        return None
+    return infos[0], images[0]
+
+
+def _orient(arr, m):
+    """이미지 픽셀 축을 가시 좌표의 x(오른쪽)/y(아래) 방향에 맞게 전치/뒤집기 (무손실)"""
+    if abs(m.a) < 1e-9 and abs(m.d) < 1e-9:
+        # 90/270도 배치: 이미지 가로축이 화면 세로축으로 감
+        arr = arr.transpose(1, 0, 2)
+        if m.b < 0:
+            arr = arr[::-1]
+        if m.c < 0:
+            arr = arr[:, ::-1]
+    else:
+        if m.a < 0:
+            arr = arr[:, ::-1]
+        if m.d < 0:
+            arr = arr[::-1]
+    return np.ascontiguousarray(arr)
+
+
+def jpeg_source_params(doc, xref):
+    """원본 JPEG 스트림의 (양자화 테이블, 서브샘플링) - 읽을 수 없으면 None"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(doc.xref_stream_raw(xref))) as im:
+            if im.mode not in ('L', 'RGB'):
+                return None
+            return im.quantization, JpegImagePlugin.get_sampling(im)
+    except Exception:
+        return None  # 읽을 수 없는 JPEG는 일반 재인코딩으로
+
+
+def _encode(arr, bpc, filter_name, jpeg_params=None):
+    """잘라낸 픽셀을 원본 특성에 맞게 재인코딩 (1비트/무손실 Flate/JPEG)"""
+    n = arr.shape[2]
+    if bpc == 1 and n == 1:
+        # 흑백 2값 스캔: 1비트(0=검정, 1=흰색)로 다시 패킹 후 Flate
+        data = zlib.compress(pdf_imaging.pack_mask(arr[:, :, 0] >= 128), 9)
+        return {'data': data, 'filter': '/FlateDecode', 'size': (arr.shape[1], arr.shape[0]),
+                'colorspace': '/DeviceGray', 'bpc': 1}
+    if filter_name in LOSSY_FILTERS and n in (1, 3):
+        if jpeg_params:
+            qtables, sampling = jpeg_params
+            buf = io.BytesIO()
+            Image.fromarray(arr[:, :, 0] if n == 1 else arr).save(
+                buf, "JPEG", qtables=qtables, subsampling=max(sampling, 0), optimize=True)
+            return {'data': buf.getvalue(), 'filter': '/DCTDecode', 'size': (arr.shape[1], arr.shape[0]),
+                    'colorspace': COLORSPACES[n]}
+        backend = 'pillow-jpeg' if 'pillow-jpeg' in pdf_encoders.available_encoders() else 'mupdf-jpeg'
+        return pdf_encoders.encode(arr, LOSSY_RECROP_QUALITY,
+                                   {'backend': backend, 'subsampling': '4:4:4'})
+    return {'data': zlib.compress(arr.tobytes(), 6), 'filter': '/FlateDecode',
+            'size': (arr.shape[1], arr.shape[0]), 'colorspace': COLORSPACES[n]}
+
+
+def crop_image_page(page, clip):
+    """이미지 전용 페이지를 clip(가시 좌표, 원본 페이지 기준)으로 잘라 재인코딩.
+
+    반환값: {'image': 인코딩 결과, 'rect': 잘린 이미지가 놓일 가시 좌표 rect,
+             'source_box': 원본 이미지에서 남긴 픽셀 범위, 'pixels_before': 원본 픽셀 수, 'pixels_after': 남은 픽셀 수}
+    적용할 수 없는 페이지(텍스트/벡터 포함, 기울어진 배치, 잘라도 작아지지 않는 경우)는 None.
+    """
+    found = single_image_info(page)
+    if not found:
+        return None
+    info, item = found
+    xref, bpc, filter_name = item[0], item[4], item[8]
+
+    # 이미지 단위 정사각형 → 가시 좌표 변환. 90도 단위 배치만 픽셀 격자와 맞아 무손실 크롭 가능
+    m = fitz.Matrix(info['transform']) * page.rotation_matrix
+    axis_aligned = (abs(m.b) < 1e-6 and abs(m.c) < 1e-6) or (abs(m.a) < 1e-6 and abs(m.d) < 1e-6)
+    if not axis_aligned:
+        return None
+
+    pix = fitz.Pixmap(page.parent, xref)
+    if pix.alpha or pix.n not in COLORSPACES:
+        return None
+    h, w = pix.height, pix.width
+
+    unit = (fitz.Rect(clip) * ~m) & fitz.Rect(0, 0, 1, 1)
+    if unit.is_empty:
+        return None
+    eps = 1e-6
+    x0, x1 = int(np.floor(unit.x0 * w + eps)), int(np.ceil(unit.x1 * w - eps))
+    y0, y1 = int(np.floor(unit.y0 * h + eps)), int(np.ceil(unit.y1 * h - eps))
+    if (x1 - x0) * (y1 - y0) >= w * h:
+        return None  # 잘려 나가는 픽셀이 없음
+
+    jpeg_params = jpeg_source_params(page.parent, xref) if filter_name == 'DCTDecode' else None
+    if jpeg_params and m.a > 0 and m.d > 0:
+        # 방향 변환이 없으면 시작점을 원본 MCU 격자에 맞춰 블록 경계를 그대로 유지
+        mcu_w, mcu_h = MCU_SIZE.get(jpeg_params[1], (8, 8))
+        x0, y0 = x0 - x0 % mcu_w, y0 - y0 % mcu_h
+
+    arr = pdf_imaging.pixmap_to_array(pix)[y0:y1, x0:x1]
+    image = _encode(_orient(arr, m), bpc, filter_name, jpeg_params)
+    if len(image['data']) >= len(page.parent.xref_stream_raw(xref)):
+        return None  # 재인코딩이 오히려 크면 원본 스트림을 유지 (MediaBox 자르기)
+    return {
+        'image': image,
+        'rect': fitz.Rect(x0 / w, y0 / h, x1 / w, y1 / h) * m,
+        'source_box': (x0, y0, x1, y1),
+        'pixels_before': w * h,
+        'pixels_after': (x1 - x0) * (y1 - y0),
+    }
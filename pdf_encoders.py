@@ -0,0 +1,117 @@
+"""이미지 인코더 레지스트리: 렌더 배열(높이, 너비, 채널) → PDF 이미지 스트림"""
+import io
+import zlib
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import pdf_imaging
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 미설치 시 MuPDF JPEG / Flate만 사용
+    Image = None
+
+DEFAULT_ENCODER = 'mupdf-jpeg'
+
+# 프리셋에 저장되는 인코더 설정 기본값
+DEFAULT_OPTIONS = {
+    'backend': DEFAULT_ENCODER,
+    'subsampling': '4:2:0',   # Pillow JPEG 색차 서브샘플링
+    'progressive': False,     # Pillow JPEG 점진적(progressive) 저장
+    'flate_level': 6,         # Flate 압축 레벨 (1~9)
+}
+
+SUBSAMPLING = {'4:4:4': 0, '4:2:2': 1, '4:2:0': 2}
+
+
+def _image(data, arr, filter_name):
+    """인코딩 결과 공통 형식 (pdf_imaging.insert_encoded가 그대로 XObject로 기록)"""
+    return {
+        'data': data,
+        'filter': filter_name,
+        'size': (arr.shape[1], arr.shape[0]),
+        'colorspace': '/DeviceGray' if arr.shape[2] == 1 else '/DeviceRGB',
+    }
+
+
+def _to_pil(arr):
+    return Image.fromarray(arr[:, :, 0] if arr.shape[2] == 1 else arr[:, :, :3])
+
+
+def encode_mupdf_jpeg(arr, quality, options):
+    """기존 저장 방식: MuPDF 내장 JPEG 인코더"""
+    cs = fitz.csGRAY if arr.shape[2] == 1 else fitz.csRGB
+    arr = np.ascontiguousarray(arr)
+    pix = fitz.Pixmap(cs, arr.shape[1], arr.shape[0], arr.tobytes(), 0)
+    return _image(pix.tobytes("jpg", jpg_quality=quality), arr, '/DCTDecode')
+
+
+def encode_pillow_jpeg(arr, quality, options):
+    """Pillow JPEG: 허프만 테이블 최적화 + 선택적 progressive / 색차 서브샘플링"""
+    buf = io.BytesIO()
+    _to_pil(arr).save(buf, "JPEG", quality=quality, optimize=True,
+                      progressive=bool(options.get('progressive')),
+                      subsampling=SUBSAMPLING.get(options.get('subsampling'), 2))
+    return _image(buf.getvalue(), arr, '/DCTDecode')
+
+
+def jpx_target_psnr(quality):
+    """JPEG 품질을 비슷한 화질의 JPEG 2000 목표 PSNR(dB)로 대응: 90 => 43.5, 70 => 40.5, 50 => 37.5"""
+    return 30.0 + quality * 0.15
+
+
+def encode_jpx(arr, quality, options):
+    """JPEG 2000 (JPXDecode, 9/7 비가역 웨이블릿, 목표 PSNR 기준 비트 배분)"""
+    buf = io.BytesIO()
+    _to_pil(arr).save(buf, "JPEG2000", irreversible=True, quality_mode='dB',
+                      quality_layers=[jpx_target_psnr(quality)])
+    return _image(buf.getvalue(), arr, '/JPXDecode')
+
+
+def encode_flate(arr, quality, options):
+    """무손실 Flate: 원시 샘플을 지정 레벨로 zlib 압축 (품질 값은 무시)"""
+    level = int(options.get('flate_level', 6))
+    return _image(zlib.compress(np.ascontiguousarray(arr).tobytes(), level), arr, '/FlateDecode')
+
+
+# 이름: (표시 이름, 인코더 함수, 무손실 여부, Pillow 필요 여부)
+ENCODERS = {
+    'mupdf-jpeg': ("JPEG (MuPDF 기본)", encode_mupdf_jpeg, False, False),
+    'pillow-jpeg': ("JPEG (Pillow 최적화)", encode_pillow_jpeg, False, True),
+    'jpx': ("JPEG 2000", encode_jpx, False, True),
+    'flate': ("Flate (무손실)", encode_flate, True, False),
+}
+
+
+def available_encoders():
+    """현재 환경에서 쓸 수 있는 인코더 이름 목록 (등록 순서 유지)"""
+    return [name for name, spec in ENCODERS.items() if not spec[3] or Image is not None]
+
+
+def normalize_options(options):
+    """저장된 설정을 기본값으로 보충하고, 쓸 수 없는 백엔드는 기본 인코더로 대체"""
+    merged = dict(DEFAULT_OPTIONS)
+    merged.update(options or {})
+    if merged['backend'] not in available_encoders():
+        merged['backend'] = DEFAULT_ENCODER
+    return merged
+
+
+def is_lossless(options):
+    return ENCODERS[normalize_options(options)['backend']][2]
+
+
+def encode(arr, quality, options=None):
+    """설정에 지정된 백엔드로 배열을 인코딩"""
+    options = normalize_options(options)
+    return ENCODERS[options['backend']][1](arr, quality, options)
+
+
+def decode(encoded):
+    """인코딩 결과를 다시 배열로 (화질 측정용)"""
+    if encoded['filter'] == '/FlateDecode':
+        w, h = encoded['size']
+        n = 1 if encoded['colorspace'] == '/DeviceGray' else 3
+        return np.frombuffer(zlib.decompress(encoded['data']), dtype=np.uint8).reshape(h, w, n)
+    return pdf_imaging.decode_image(encoded['data'])
@@ -0,0 +1,585 @@
+"""여백/압축 저장 엔진 (UI 없음): GUI(pdf editor 1.8.py)와 명령줄 도구(pdf_cli.py)가 함께 사용
+
+PyQt6를 가져오지 않으므로 디스플레이가 없는 서버에서도 그대로 쓸 수 있다.
+"""
+import hashlib
+import json
+import math
+import os
+import sys
+
+import fitz  # PyMuPDF
+
+import pdf_analysis
+import pdf_cache
+import pdf_crop
+import pdf_encoders
+import pdf_geometry
+import pdf_imaging
+import pdf_recompress
+import pdf_rules
+import pdf_workers
+# 저장 옵션 상수는 fitz 없이 쓰도록 pdf_options에 (pdf_engine.BLANK_MODES 등으로도 그대로 사용)
+from pdf_options import BLANK_MODES, DEFAULT_SAVE_OPTIONS, DUPLICATE_MODES  # noqa: F401
+
+# 압축 모드 (1~100%): 200 DPI - 속도와 품질의 균형
+COMPRESS_DPI = 200
+# 비압축 모드 (0%): 300 DPI - 원본 스캔 해상도에 근접한 품질 보장
+LOSSLESS_DPI = 300
+
+MM_TO_PT = 72 / 25.4
+SIDES = ('left', 'right', 'top', 'bottom')
+
+# 기울기 보정: 이보다 작은 각도(도)는 추정 오차로 보고 그대로 둠
+MIN_DESKEW = 0.1
+
+# 저장 엔진 버전: 같은 입력/설정에서 출력이 달라지는 변경을 하면 올린다
+# (일괄 처리 기록의 키에 들어가 이전 버전 출력은 다시 만들어진다)
+ENGINE_VERSION = 1
+
+SETTINGS_FILE_NAME = "pdf_editor_settings.json"
+CACHE_DIR_NAME = "pdf_editor_cache"
+
+
+def app_base_dir():
+    """설정/캐시 파일 위치: EXE 또는 .py 스크립트와 같은 폴더"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def settings_file_path():
+    return os.path.join(app_base_dir(), SETTINGS_FILE_NAME)
+
+
+def cache_dir_path():
+    return os.path.join(app_base_dir(), CACHE_DIR_NAME)
+
+
+def default_settings():
+    return {
+        'odd': {side: 0.0 for side in SIDES},
+        'even': {side: 0.0 for side in SIDES},
+        'encoder': dict(pdf_encoders.DEFAULT_OPTIONS),
+        'rules': [],  # 쪽 범위 여백 규칙 (pdf_rules)
+        'overrides': {},  # 쪽별 개별 여백 {"쪽 번호": {여백}} (지정한 쪽만)
+        'page_size': pdf_geometry.default_page_size(),  # 목표 크기 맞춤 (pdf_geometry)
+        'cleanup': pdf_imaging.default_cleanup(),  # 인코딩 전 배경 정리 (pdf_imaging)
+    }
+
+
+def normalize_settings(settings):
+    """저장된 설정(last_settings/프리셋 형식)을 기본값으로 보충한 새 dict"""
+    merged = default_settings()
+    settings = settings or {}
+    for p_type in ('odd', 'even'):
+        for side in SIDES:
+            merged[p_type][side] = float(settings.get(p_type, {}).get(side, 0.0))
+    merged['encoder'] = pdf_encoders.normalize_options(settings.get('encoder'))
+    merged['rules'] = [pdf_rules.normalize_rule(r) for r in settings.get('rules') or []]
+    merged['overrides'] = pdf_rules.normalize_overrides(settings.get('overrides'))
+    merged['page_size'] = pdf_geometry.normalize_page_size(settings.get('page_size'))
+    merged['cleanup'] = pdf_imaging.normalize_cleanup(settings.get('cleanup'))
+    return merged
+
+
+def normalize_save_options(options):
+    """저장 옵션(DEFAULT_SAVE_OPTIONS 형식)을 기본값으로 보충하고 값을 확인한 새 dict. 잘못되면 ValueError"""
+    opts = dict(DEFAULT_SAVE_OPTIONS)
+    opts.update(options or {})
+    try:
+        compression = float(opts['compression'])
+        float(opts['ssim_threshold'])
+        if opts['workers'] is not None:
+            int(opts['workers'])
+    except (TypeError, ValueError):
+        raise ValueError("압축 수준/SSIM 기준/워커 수는 숫자여야 합니다.") from None
+    if not 0 <= compression <= 100:
+        raise ValueError(f"압축 수준은 0~100이어야 합니다: {opts['compression']}")
+    if opts['blank_pages'] not in BLANK_MODES:
+        raise ValueError(f"알 수 없는 빈 페이지 처리: {opts['blank_pages']}")
+    if opts['duplicate_pages'] not in DUPLICATE_MODES:
+        raise ValueError(f"알 수 없는 중복 페이지 처리: {opts['duplicate_pages']}")
+    return opts
+
+
+def settings_signature(settings, options=None):
+    """정규화한 설정 + 출력에 영향을 주는 저장 옵션의 해시 (워커 수처럼 결과와 무관한 값 제외)"""
+    opts = dict(DEFAULT_SAVE_OPTIONS)
+    opts.update(options or {})
+    opts.pop('workers', None)
+    data = json.dumps({'settings': normalize_settings(settings), 'options': opts}, sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def load_settings_file(path=None):
+    """설정 파일(JSON) 전체를 읽어 반환. 파일이 없으면 빈 dict"""
+    path = path or settings_file_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def preset_settings(data, name):
+    """설정 파일 데이터에서 프리셋을 찾아 정규화. 'last'는 마지막 사용 설정"""
+    if name == 'last':
+        return normalize_settings(data.get('last_settings'))
+    presets = data.get('presets', {})
+    if name not in presets:
+        raise ValueError(f"프리셋 '{name}'이(가) 없습니다. (사용 가능: {', '.join(presets) or '없음'})")
+    return normalize_settings(presets[name])
+
+
+def deskew_enabled(options):
+    """기울기 보정이 적용되는 저장인지: 페이지를 복사하는 무손실/텍스트 유지 저장에서만 적용"""
+    opts = dict(DEFAULT_SAVE_OPTIONS)
+    opts.update(options or {})
+    return bool(opts['deskew']) and (int(opts['compression']) == 0 or bool(opts['preserve']))
+
+
+def needs_analysis(options):
+    """저장 전에 페이지 분석 표(pdf_analysis)가 필요한 옵션인지 (기울기 보정, 빈/중복 페이지 처리)"""
+    opts = dict(DEFAULT_SAVE_OPTIONS)
+    opts.update(options or {})
+    return (deskew_enabled(opts) or opts['blank_pages'] != 'keep'
+            or opts['duplicate_pages'] != 'keep')
+
+
+def compression_to_quality(compression):
+    """압축 수준(%)을 JPEG 품질로 변환: 구간별 완만한 감소
+    10% => 97, 30% => 90, 70% => 70, 100% => 50
+    """
+    if compression <= 30:
+        quality = int(100 - compression * 0.33)
+    elif compression <= 70:
+        quality = int(90 - (compression - 30) * 0.50)
+    else:
+        quality = int(70 - (compression - 70) * 0.67)
+    return max(50, quality)
+
+
+def compressed_page_layout(src_rect, left, right, top, bottom):
+    """압축 모드 페이지 배치 계산 (단위: pt, 여백 음수 = 자르기)
+
+    반환값: (새 페이지 너비, 높이, 이미지 배치 rect, 렌더링 clip)
+    음수 여백으로 새 페이지 밖에 놓이는 부분은 렌더링/인코딩하지 않도록
+    보이는 영역만 clip(원본 가시 좌표)으로 잘라 그 위치에 정확히 배치한다.
+    clip이 None이면 전체 페이지, 배치 rect가 None이면 보이는 영역이 없음.
+    """
+    new_width = max(10, src_rect.width + left + right)
+    new_height = max(10, src_rect.height + top + bottom)
+    target_rect = fitz.Rect(left, top, left + src_rect.width, top + src_rect.height)
+    visible = target_rect & fitz.Rect(0, 0, new_width, new_height)
+    if visible.is_empty:
+        return new_width, new_height, None, None
+    if visible == target_rect:
+        return new_width, new_height, target_rect, None
+    clip = (visible.x0 - left + src_rect.x0, visible.y0 - top + src_rect.y0,
+            visible.x1 - left + src_rect.x0, visible.y1 - top + src_rect.y0)
+    return new_width, new_height, visible, clip
+
+
+def lossless_mediabox(mb, rot, left, right, top, bottom):
+    """무손실 저장용 새 MediaBox: 가시 방향 여백을 회전각에 맞는 PDF 좌표축으로 매핑
+
+    PDF는 좌하단이 원점이며, rot=90(시계방향 회전) 시 좌표축이 뒤바뀜
+    """
+    if rot == 0:
+        new_mb = fitz.Rect(mb.x0 - left,   mb.y0 - bottom,
+                           mb.x1 + right,  mb.y1 + top)
+    elif rot == 90:
+        new_mb = fitz.Rect(mb.x0 - bottom, mb.y0 - left,
+                           mb.x1 + top,    mb.y1 + right)
+    elif rot == 180:
+        new_mb = fitz.Rect(mb.x0 - right,  mb.y0 - top,
+                           mb.x1 + left,   mb.y1 + bottom)
+    else:  # 270
+        new_mb = fitz.Rect(mb.x0 - top,    mb.y0 - right,
+                           mb.x1 + bottom, mb.y1 + left)
+
+    # 최소 크기 제한 (PDF 규격 준수)
+    if new_mb.width < 10: new_mb.x1 = new_mb.x0 + 10
+    if new_mb.height < 10: new_mb.y1 = new_mb.y0 + 10
+    return new_mb
+
+
+def copy_page_lossless(new_doc, doc, i, margins, mediabox=None, rotation=None):
+    """[완전 무손실] insert_pdf + set_mediabox 방식
+    렌더링 없이 원본 콘텐츠 그대로 복사 후 MediaBox만 조정
+    mediabox/rotation: 페이지 기하 표에서 읽은 원본 값 (없으면 복사한 페이지에서 읽음)
+    """
+    new_doc.insert_pdf(doc, from_page=i, to_page=i)
+    cp = new_doc[-1]  # 방금 삽입된 페이지
+    new_mb = lossless_mediabox(mediabox if mediabox is not None else cp.mediabox,
+                               cp.rotation if rotation is None else rotation, *margins)
+
+    # [핵심] CropBox/ArtBox/BleedBox/TrimBox를 페이지 딕셔너리에서
+    # 완전히 삭제한 뒤 MediaBox만 새로 설정.
+    # set_* 방식은 상위 페이지 트리에서 상속된 값을 제거하지 못해
+    # clean=True 저장 시 'CropBox not in MediaBox' 오류가 발생하므로
+    # xref_set_key로 null(삭제) 처리하는 것이 가장 안전함.
+    for box_key in ("CropBox", "ArtBox", "BleedBox", "TrimBox"):
+        new_doc.xref_set_key(cp.xref, box_key, "null")
+    cp.set_mediabox(new_mb)
+    return cp
+
+
+def deskew_page(doc, page, angle):
+    """[기울기 보정] 렌더링 없이 콘텐츠 스트림 앞뒤에 회전 행렬(q ... cm / Q)을 덧붙여
+    페이지 중심 기준으로 angle(도, 양수 = 내용이 반시계로 돌아가 있음)만큼 되돌린다.
+    글꼴/벡터/이미지 원본은 그대로이며 주석/링크 위치는 바뀌지 않는다."""
+    page.wrap_contents()  # 기존 콘텐츠의 q/Q 짝을 맞춰 덧붙인 행렬이 풀리지 않게 함
+    mb = page.mediabox
+    cx, cy = (mb.x0 + mb.x1) / 2, (mb.y0 + mb.y1) / 2
+    # PDF 좌표는 위쪽이 +y라 화면 기준 시계 방향 보정은 음의 각도 회전.
+    # /Rotate(90도 단위)도 회전이므로 방향은 페이지 회전과 무관
+    rad = math.radians(-angle)
+    c, s = math.cos(rad), math.sin(rad)
+    e, f = cx - c * cx + s * cy, cy - s * cx - c * cy
+    streams = []
+    for data in (f"q {c:.6f} {s:.6f} {-s:.6f} {c:.6f} {e:.4f} {f:.4f} cm\n", "\nQ"):
+        xref = doc.get_new_xref()
+        doc.update_object(xref, "<<>>")
+        doc.update_stream(xref, data.encode('ascii'))
+        streams.append(xref)
+    contents = [streams[0]] + page.get_contents() + [streams[1]]
+    doc.xref_set_key(page.xref, "Contents", "[" + " ".join(f"{x} 0 R" for x in contents) + "]")
+
+
+def hard_crop_page(new_doc, page, margins, dedup=None, bound=None):
+    """[하드 크롭] 이미지 전용 페이지는 보이는 영역의 픽셀만 남긴 이미지로 교체.
+    적용했으면 보고서용 페이지 정보, 적용할 수 없으면 None (bound: 가시 rect, 없으면 page.bound())
+    """
+    new_width, new_height, place_rect, clip = compressed_page_layout(
+        bound if bound is not None else page.bound(), *margins)
+    cropped = pdf_crop.crop_image_page(page, clip) if clip else None
+    if not cropped:
+        return None
+    new_page = new_doc.new_page(width=new_width, height=new_height)
+    # 원본 가시 좌표 → 새 페이지 좌표 (clip 원점이 place_rect 원점)
+    dx, dy = place_rect.x0 - clip[0], place_rect.y0 - clip[1]
+    rect = cropped['rect']
+    pdf_imaging.insert_image_encoded(
+        new_doc, new_page, fitz.Rect(rect.x0 + dx, rect.y0 + dy, rect.x1 + dx, rect.y1 + dy),
+        cropped['image'], dedup=dedup)
+    return {'hard_crop': True, 'bytes': len(cropped['image']['data']),
+            'pixels_before': cropped['pixels_before'], 'pixels_after': cropped['pixels_after']}
+
+
+def select_auto_quality(doc, threshold, encoder):
+    """샘플 페이지로 기준 SSIM을 만족하는 최저 품질 탐색 → (품질, 샘플 점수)"""
+    matrix = fitz.Matrix(COMPRESS_DPI / 72.0, COMPRESS_DPI / 72.0)
+    samples = {i: doc[i].get_pixmap(matrix=matrix)
+               for i in pdf_imaging.sample_page_indices(len(doc))}
+    return pdf_imaging.select_jpeg_quality(
+        samples, threshold, roundtrip=lambda arr, q: pdf_encoders.decode(
+            pdf_encoders.encode(arr, q, encoder)))
+
+
+def save_document(doc, path, settings, options=None, cache=None, fingerprint=None,
+                  progress=None, status=None, page_offset=0, analysis=None, geometry=None,
+                  duplicates=None, page_base=0):
+    """doc에 여백/압축 설정을 적용해 path로 저장하고 보고서(dict)를 반환.
+
+    settings: last_settings/프리셋 형식 (odd/even 여백 mm, encoder)
+    options: DEFAULT_SAVE_OPTIONS 형식의 저장 동작 옵션
+    cache: pdf_cache.EncodeCache (없으면 캐시 없이 인코딩)
+    progress(done, total): 진행률 콜백, status(text | None): 단계 표시 콜백
+    page_offset: 홀/짝 판단 시 더할 쪽수 (병합에서 앞 문서들의 쪽수)
+    analysis: doc의 페이지 분석 표 (pdf_analysis). 기울기 보정/빈·중복 페이지 처리에 필요한데 없으면
+              분석 색인에서 가져옴
+    geometry: doc의 페이지 기하 표 (pdf_geometry.PageGeometry, 열 때 만든 것). 없으면 여기서 만듦
+    duplicates: 미리 구한 중복 쌍 [(앞 쪽, 뒤 쪽, 비트 수)] (page_base 기준 번호, 0부터). 분할 저장처럼
+                원본 전체에서 구해 넘기면 앞 쪽이 이전 조각에 있는 쌍도 뒤 쪽을 뺄 수 있다. 없으면 analysis로 구함
+    page_base: doc 첫 쪽의 원본 쪽 번호 - 1 (분할 조각의 시작 쪽). 보고서의 쪽 번호와 duplicates는 이 기준
+    빈/중복 페이지를 빼도 홀/짝 여백은 원본 쪽 번호(스캔한 면) 기준으로 적용한다.
+    압축 저장은 워커 프로세스가 원본 파일을 다시 열어 쓰므로 doc은 파일에서 연 문서여야 한다.
+    """
+    settings = normalize_settings(settings)
+    opts = normalize_save_options(options)
+    progress = progress or (lambda done, total: None)
+    status = status or (lambda text: None)
+    cache = cache if cache is not None else pdf_cache.EncodeCache(max_bytes=0)
+    if fingerprint is None and doc.name and os.path.exists(doc.name):
+        fingerprint = pdf_cache.file_fingerprint(doc.name)
+
+    compression = int(opts['compression'])
+    do_compress = compression > 0
+    # 페이지 전체를 이미지로 렌더링하는 기존 압축 방식인지 (텍스트/벡터 유지 모드가 아니면)
+    preserve = do_compress and bool(opts['preserve'])
+    raster = do_compress and not preserve
+    jpg_quality = compression_to_quality(compression)
+
+    total_pages = len(doc)
+    report = {'source': doc.name, 'output': path, 'total_pages': total_pages, 'pages': []}
+    # 모든 쪽의 여백(규칙/홀짝 → 목표 크기 맞춤 → 개별 여백)을 페이지 크기 배열로 한 번에 계산
+    geometry = geometry if geometry is not None else pdf_geometry.build_geometry(doc)
+    page_margins = pdf_geometry.page_margins(geometry.bounds, settings, page_offset).tolist()
+    page_rects = geometry.rects()
+
+    # 자동 화질: 샘플 페이지로 기준 SSIM을 만족하는 최저 품질 탐색
+    encoder = settings['encoder']
+    report['encoder'] = encoder
+    # 배경 정리(종이 흰색화/티끌 제거)는 페이지를 렌더링해 인코딩하는 압축 저장에서만
+    cleanup = settings['cleanup'] if raster and any(settings['cleanup'].values()) else None
+    auto_quality = (raster and bool(opts['auto_quality'])
+                    and not pdf_encoders.is_lossless(encoder))
+    if auto_quality:
+        threshold = float(opts['ssim_threshold'])
+        status("자동 화질 탐색 중...")
+        jpg_quality, sample_scores = select_auto_quality(doc, threshold, encoder)
+        status(None)
+        report['auto_quality'] = {
+            'threshold_ssim': threshold, 'quality': jpg_quality,
+            'samples': {str(page_base + i + 1): sc for i, sc in sample_scores.items()}
+        }
+    report['jpg_quality'] = jpg_quality if do_compress else None
+
+    mrc_mode = raster and bool(opts['mrc'])
+    hard_crop = not raster and bool(opts['hard_crop'])
+    hard_cropped = 0
+    # 기울기 보정은 페이지를 복사하는 저장(무손실/텍스트 유지)에서 페이지 변환으로 적용
+    deskew = deskew_enabled(opts)
+    deskewed = 0
+    if needs_analysis(opts) and analysis is None:
+        status("페이지 분석 중...")
+        analysis = pdf_analysis.get_analysis(doc.name, cache_dir_path(), fingerprint,
+                                             workers=opts['workers'], progress=progress,
+                                             geometry=geometry)
+        status(None)
+    blank_mode = opts['blank_pages']
+    blank = set(pdf_analysis.blank_pages(analysis)) if blank_mode != 'keep' else set()
+    duplicate_mode = opts['duplicate_pages']
+    if duplicate_mode == 'keep':
+        duplicates = []
+    elif duplicates is None:
+        duplicates = [(page_base + i, page_base + j, d)
+                      for i, j, d in pdf_analysis.duplicate_pages(analysis)]
+    # {doc 기준 뺄 쪽: 남기는 쪽 (page_base 기준)}. 넘겨받은 쌍에 이전 조각끼리의 쌍이 있으면
+    # 연쇄 중복(3=4=6)의 처음 쪽을 찾는 데 쓰고, 보고서에는 뒤 쪽이 doc 안에 있는 쌍만 남김
+    dropped = ({j - page_base: i for j, i in pdf_analysis.duplicate_drops(duplicates).items()
+                if j >= page_base} if duplicate_mode == 'drop' else {})
+    duplicates = [(i, j, d) for i, j, d in duplicates if page_base <= j < page_base + total_pages]
+    # 흰 페이지로 바꾸거나 빼는 빈 페이지, 빼는 중복 페이지는 렌더링/인코딩하지 않음
+    skip_render = (blank if blank_mode in ('minimal', 'drop') else set()) | set(dropped)
+    dedup = pdf_imaging.ImageDeduplicator()
+    new_doc = fitz.open()
+    tmp_path = path + ".part"
+    pool = None
+    try:
+        # 압축 모드: 렌더링/인코딩(MRC 분할 포함)은 워커 풀에서 병렬 처리하고
+        # 메인 프로세스는 페이지 순서대로 결과를 받아 배치만 한다
+        if raster:
+            report['mode'] = 'mrc' if mrc_mode else 'image'
+            encode_options = {
+                'dpi': COMPRESS_DPI, 'quality': jpg_quality, 'encoder': encoder,
+                'mode': report['mode'], 'measure': auto_quality,
+                'cleanup': cleanup,
+            }
+            # 페이지 배치를 먼저 계산: 음수 여백은 렌더링 clip으로 워커에 전달
+            layouts = [compressed_page_layout(page_rects[i], *page_margins[i])
+                       for i in range(total_pages)]
+            clips = {i: lay[3] for i, lay in enumerate(layouts) if lay[3]}
+
+            # 인코딩 결과는 (clip 외) 여백과 무관: 캐시에 있는 페이지는 워커에 보내지 않음
+            cache_keys = [pdf_cache.encode_key(fingerprint, i, COMPRESS_DPI, jpg_quality,
+                                               report['mode'], encoder, clips.get(i), cleanup)
+                          for i in range(total_pages)]
+            cached = {}
+            for i, key in enumerate(cache_keys):
+                if layouts[i][2] is None or i in skip_render:
+                    continue  # 전부 잘려 보이는 영역이 없는 페이지 / 빈 페이지
+                hit = cache.get(key, need_score=auto_quality)
+                if hit is not None:
+                    cached[i] = hit
+            # 배치 루프에서 cached를 비워 가므로 재사용 쪽수는 여기서 기록
+            cache_hits = len(cached)
+            todo = [i for i in range(total_pages)
+                    if i not in cached and layouts[i][2] is not None and i not in skip_render]
+            if todo:
+                pool = pdf_workers.open_pool(doc.name, opts['workers'])
+                encoded_pages = pdf_workers.map_pages(pool, todo, encode_options, clips)
+
+        for i, page in enumerate(doc):
+            progress(i + 1, total_pages)
+            cur = page_base + i + 1
+            margins = page_margins[i]
+            if i in dropped:
+                report['pages'].append({'page': cur, 'bytes': 0, 'duplicate_of': dropped[i] + 1})
+                continue
+            if i in skip_render:
+                if blank_mode == 'minimal':
+                    # 내용 없는 같은 크기의 페이지 (이미지/콘텐츠 스트림 없음)
+                    new_width, new_height = compressed_page_layout(page_rects[i], *margins)[:2]
+                    new_doc.new_page(width=new_width, height=new_height)
+                report['pages'].append({'page': cur, 'bytes': 0, 'blank': blank_mode})
+                continue
+
+            # [핵심 수정] page.bound()는 회전이 자동 반영된 실제 가시 크기를 반환
+            # page.rect는 내부 저장 규격이지만, page.bound()는 화면에 보이는 크기와 동일
+            if raster:
+                # 압축 모드: 워커가 get_pixmap 렌더링(보이는 clip만) 후 인코딩한 이미지를 배치
+                new_width, new_height, place_rect, clip = layouts[i]
+                new_page = new_doc.new_page(width=new_width, height=new_height)
+                page_info = {'page': cur, 'bytes': 0}
+                if clip:
+                    page_info['clip'] = [round(v, 2) for v in clip]
+                if place_rect is None:
+                    report['pages'].append(page_info)
+                    continue
+                encoded = cached.pop(i, None)
+                if encoded is None:
+                    encoded = next(encoded_pages)
+                    cache.put(cache_keys[i], encoded)
+                if clip:
+                    # clip 렌더는 픽셀 경계로 반올림되므로 실제 렌더 영역 기준으로 배치
+                    dx, dy = place_rect.x0 - clip[0], place_rect.y0 - clip[1]
+                    rx0, ry0, rx1, ry1 = encoded['render_rect']
+                    place_rect = fitz.Rect(rx0 + dx, ry0 + dy, rx1 + dx, ry1 + dy)
+                pdf_imaging.insert_encoded(new_doc, new_page, place_rect, encoded, dedup=dedup)
+
+                page_info['bytes'] = pdf_imaging.encoded_size(encoded)
+                if mrc_mode:
+                    page_info['text_ratio'] = round(encoded['text_ratio'], 4)
+                if 'cleanup' in encoded:
+                    page_info['cleanup'] = encoded['cleanup']
+                if 'score' in encoded:
+                    # 자동 화질 모드에서는 모든 페이지의 실제 점수를 보고서에 기록
+                    page_info.update(encoded['score'])
+                report['pages'].append(page_info)
+            else:
+                angle = float(analysis['skew'][i]) if deskew else 0.0
+                if abs(angle) < MIN_DESKEW:
+                    angle = 0.0
+                # 기울어진 페이지는 잘린 픽셀을 버리면 회전 후 빈 곳이 생기므로 하드 크롭 제외
+                if hard_crop and not angle:
+                    page_info = hard_crop_page(new_doc, page, margins, dedup=dedup,
+                                               bound=page_rects[i])
+                    if page_info:
+                        hard_cropped += 1
+                        report['pages'].append(dict(page=cur, **page_info))
+                        continue
+                cp = copy_page_lossless(new_doc, doc, i, margins,
+                                        mediabox=geometry.mediabox_rect(i),
+                                        rotation=int(geometry.rotation[i]))
+                if angle:
+                    deskew_page(new_doc, cp, angle)
+                    deskewed += 1
+                    report['pages'].append({'page': cur, 'skew': angle})
+
+        if pool:
+            pool.shutdown()
+            pool = None
+
+        if preserve:
+            # 콘텐츠 스트림/글꼴/링크는 그대로 두고 이미지 XObject만 선택 인코더로 재압축
+            report['mode'] = 'preserve'
+            status("이미지 재압축 중...")
+            report['recompress'] = pdf_recompress.recompress_images(
+                new_doc, jpg_quality, encoder, max_dpi=COMPRESS_DPI, progress=progress)
+            status(None)
+
+        report['output_pages'] = len(new_doc)
+        # 저장: 압축 여부와 상관없이 항상 PDF 구조 최적화(garbage=4, deflate) 적용
+        # 같은 폴더의 임시 파일에 쓴 뒤 교체해 중단/강제 종료 시 반쯤 쓰인 PDF가 남지 않게 한다
+        new_doc.save(tmp_path, garbage=4, deflate=True, clean=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        new_doc.close()
+
+    report['saved_mb'] = round(os.path.getsize(path) / (1024 * 1024), 3)
+    if raster:
+        report['cache'] = {'reused_pages': cache_hits,
+                           'encoded_pages': len(todo), 'clipped_pages': len(clips)}
+        report['dedup'] = dedup.summary()
+        if cleanup:
+            cleaned = [p for p in report['pages'] if 'cleanup' in p]
+            report['cleanup'] = dict(cleanup, pages=len(cleaned),
+                                     bytes_before=sum(p['cleanup']['bytes_before'] for p in cleaned),
+                                     bytes_after=sum(p['bytes'] for p in cleaned))
+    if hard_crop:
+        report['hard_cropped_pages'] = hard_cropped
+    if deskew:
+        report['deskewed_pages'] = deskewed
+    if blank_mode != 'keep':
+        report['blank_pages'] = {'mode': blank_mode,
+                                 'pages': [page_base + i + 1 for i in sorted(blank)]}
+    if duplicate_mode != 'keep':
+        report['duplicate_pages'] = {'mode': duplicate_mode,
+                                     'pairs': [[i + 1, j + 1, d] for i, j, d in duplicates],
+                                     'dropped': sorted(page_base + j + 1 for j in dropped)}
+    return report
+
+
+def summarize_report(report):
+    """저장 보고서를 사람이 읽는 요약 문자열로 (GUI 메시지 / CLI 출력 공용)"""
+    msg = f"저장된 크기: {report['saved_mb']:.2f} MB"
+    cache = report.get('cache')
+    if cache and cache['reused_pages']:
+        pages = cache['reused_pages'] + cache['encoded_pages']
+        msg += f"\n인코딩 캐시 재사용: {cache['reused_pages']} / {pages} 페이지"
+    dedup = report.get('dedup')
+    if dedup and dedup['reused_images']:
+        msg += (f"\n중복 이미지 재사용: {dedup['reused_images']}개 "
+                f"({dedup['saved_bytes'] / (1024 * 1024):.2f} MB 절약)")
+    recompress = report.get('recompress')
+    if recompress:
+        msg += (f"\n이미지 재압축: {recompress['recompressed']} / {recompress['images']}개 "
+                f"({recompress['bytes_before'] / (1024 * 1024):.2f} MB → "
+                f"{recompress['bytes_after'] / (1024 * 1024):.2f} MB)")
+    cleanup = report.get('cleanup')
+    if cleanup and cleanup['bytes_before']:
+        msg += (f"\n배경 정리: {cleanup['pages']}쪽, 이미지 약 "
+                f"{cleanup['bytes_before'] / (1024 * 1024):.2f} MB → "
+                f"{cleanup['bytes_after'] / (1024 * 1024):.2f} MB "
+                f"({1 - cleanup['bytes_after'] / cleanup['bytes_before']:.0%} 감소)")
+    if 'hard_cropped_pages' in report:
+        msg += f"\n하드 크롭 적용: {report['hard_cropped_pages']} / {report['total_pages']} 페이지"
+    if 'deskewed_pages' in report:
+        msg += f"\n기울기 보정: {report['deskewed_pages']} / {report['total_pages']} 페이지"
+    blank = report.get('blank_pages')
+    if blank and blank['pages']:
+        action = {'flag': "표시만", 'minimal': "흰 페이지로 저장", 'drop': "제외"}[blank['mode']]
+        pages = ', '.join(map(str, blank['pages'][:20]))
+        if len(blank['pages']) > 20:
+            pages += f" 외 {len(blank['pages']) - 20}개"
+        msg += f"\n빈 페이지 {len(blank['pages'])}쪽 ({action}): {pages}"
+    duplicates = report.get('duplicate_pages')
+    if duplicates and duplicates['pairs']:
+        pairs = ', '.join(f"{i}={j}" for i, j, _ in duplicates['pairs'][:20])
+        if len(duplicates['pairs']) > 20:
+            pairs += f" 외 {len(duplicates['pairs']) - 20}쌍"
+        msg += f"\n중복 의심 {len(duplicates['pairs'])}쌍: {pairs}"
+        if duplicates['dropped']:
+            msg += f" ({len(duplicates['dropped'])}쪽 제외)"
+    auto = report.get('auto_quality')
+    if auto:
+        ssims = [p['ssim'] for p in report['pages'] if 'ssim' in p]
+        below = [p['page'] for p in report['pages'] if p.get('ssim', 1.0) < auto['threshold_ssim']]
+        msg += f"\n\n자동 화질: 품질 {auto['quality']}%"
+        if ssims:
+            msg += f"\n페이지 SSIM 최소 {min(ssims):.3f} / 평균 {sum(ssims) / len(ssims):.3f}"
+        if below:
+            msg += f"\n기준 미달 페이지: {', '.join(map(str, below[:20]))}"
+            if len(below) > 20:
+                msg += f" 외 {len(below) - 20}개"
+    return msg
+
+
+def write_report(path, report):
+    """저장 결과 보고서를 출력 파일 옆에 '<이름>_report.json'으로 기록"""
+    report_path = os.path.splitext(path)[0] + "_report.json"
+    try:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        return report_path
+    except Exception as e:
+        print(f"보고서 저장 실패: {e}")
+        return None
@@ -0,0 +1,195 @@
+"""페이지 기하 계산: 문서를 열 때 한 번 읽은 페이지 기하 표로 모든 쪽의 여백을 한꺼번에 계산
+
+PageGeometry는 쪽마다 가시 rect(page.bound()), MediaBox, 회전각, 크기 분류를 배열로 담은 표로,
+문서를 열 때 한 번 만들어 미리보기/저장/용량 추정/분석이 같이 쓴다 (쪽마다 페이지를 다시 읽지 않음).
+
+목표 크기 맞춤(A4, B5, 사용자 지정)은 여백 규칙을 적용한 결과 크기와 목표 크기의 차이를
+쪽마다 덧붙이거나(양수) 잘라(음수) 모든 쪽이 같은 크기가 되게 한다.
+    settings['page_size'] = {"preset": "none" | "A4" | ... | "custom",
+                             "width": mm, "height": mm, "anchor": "center" | "gutter"}
+anchor가 gutter면 제본 쪽(홀수 쪽 왼쪽, 짝수 쪽 오른쪽) 여백은 그대로 두고 바깥쪽에서 맞추며,
+세로는 항상 가운데 기준. 가로로 긴 쪽은 목표 크기도 가로로 돌려 맞춘다.
+개별 여백을 지정한 쪽은 맞추지 않고 지정한 값 그대로 쓴다.
+"""
+import fitz  # PyMuPDF
+import numpy as np
+
+import pdf_engine
+import pdf_rules
+
+# 목표 크기 (mm, 세로 방향 너비 x 높이)
+PAGE_SIZES = {
+    'A4': (210.0, 297.0),
+    'A5': (148.0, 210.0),
+    'B5': (176.0, 250.0),        # ISO B5
+    'B5-JIS': (182.0, 257.0),    # 국내 B5 (4x6배판 계열)
+    '신국판': (152.0, 225.0),
+}
+ANCHORS = ('center', 'gutter')
+# 크기 분류: 짧은 변/긴 변을 이 단위(mm)로 반올림해 같으면 같은 크기로 봄 (스캔 오차 흡수)
+SIZE_STEP_MM = 1.0
+# 이름 있는 용지 크기와 이 차이(mm) 안이면 그 이름으로 표시
+SIZE_NAME_TOLERANCE_MM = 2.0
+
+
+def default_page_size():
+    return {'preset': 'none', 'width': 210.0, 'height': 297.0, 'anchor': 'center'}
+
+
+def normalize_page_size(page_size):
+    """저장된 목표 크기 설정을 기본값으로 보충한 새 dict. 알 수 없는 값은 ValueError"""
+    merged = default_page_size()
+    merged.update(page_size or {})
+    if merged['preset'] not in ('none', 'custom') and merged['preset'] not in PAGE_SIZES:
+        raise ValueError(f"알 수 없는 목표 크기: '{merged['preset']}' "
+                         f"(사용 가능: none, custom, {', '.join(PAGE_SIZES)})")
+    if merged['anchor'] not in ANCHORS:
+        raise ValueError(f"맞춤 기준은 {', '.join(ANCHORS)} 중 하나여야 합니다: '{merged['anchor']}'")
+    merged['width'], merged['height'] = float(merged['width']), float(merged['height'])
+    if merged['preset'] == 'custom' and (merged['width'] <= 0 or merged['height'] <= 0):
+        raise ValueError("사용자 지정 크기는 0보다 커야 합니다.")
+    return merged
+
+
+def target_size_pt(page_size):
+    """목표 크기 (너비, 높이) pt. 맞추지 않으면 None"""
+    preset = page_size['preset']
+    if preset == 'none':
+        return None
+    width, height = PAGE_SIZES[preset] if preset != 'custom' else (page_size['width'],
+                                                                   page_size['height'])
+    return width * pdf_engine.MM_TO_PT, height * pdf_engine.MM_TO_PT
+
+
+def size_classes(sizes, step_mm=SIZE_STEP_MM):
+    """가시 크기 (n, 2) pt → (쪽별 크기 분류 번호 (n,), 분류별 (짧은 변, 긴 변) mm (k, 2)).
+    가로/세로 방향은 구분하지 않는다 (가로로 눕힌 A4도 A4)"""
+    sizes_mm = np.sort(np.asarray(sizes, dtype=np.float64).reshape(-1, 2), axis=1) \
+        / pdf_engine.MM_TO_PT
+    keys = np.round(sizes_mm / step_mm) * step_mm
+    classes, inverse = np.unique(keys, axis=0, return_inverse=True)
+    return inverse.reshape(-1).astype(np.int16), classes
+
+
+def size_name(short_mm, long_mm, tolerance=SIZE_NAME_TOLERANCE_MM):
+    """(짧은 변, 긴 변) mm → 'A4' 같은 용지 이름, 없으면 '182x257mm'"""
+    for name, (w, h) in PAGE_SIZES.items():
+        if abs(short_mm - w) <= tolerance and abs(long_mm - h) <= tolerance:
+            return name
+    return f"{short_mm:g}x{long_mm:g}mm"
+
+
+class PageGeometry:
+    """문서 전체의 페이지 기하 표
+
+    bounds: (n, 4) 가시 rect pt (page.bound(), 회전 반영), mediabox: (n, 4) MediaBox pt,
+    rotation: (n,) 회전각, size_class: (n,) 크기 분류 번호 (classes[k] = (짧은 변, 긴 변) mm)
+    """
+
+    def __init__(self, bounds, mediabox, rotation):
+        self.bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.mediabox = np.asarray(mediabox, dtype=np.float64).reshape(-1, 4)
+        self.rotation = np.asarray(rotation, dtype=np.int16).reshape(-1)
+        self.size_class, self.classes = size_classes(self.page_sizes)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    @property
+    def page_sizes(self):
+        """가시 크기 (n, 2) pt (너비, 높이)"""
+        return self.bounds[:, 2:] - self.bounds[:, :2]
+
+    @property
+    def distinct_sizes(self):
+        return len(self.classes)
+
+    @property
+    def rotated_pages(self):
+        return int(np.count_nonzero(self.rotation % 360))
+
+    @property
+    def landscape_pages(self):
+        sizes = self.page_sizes
+        return int(np.count_nonzero(sizes[:, 0] > sizes[:, 1]))
+
+    def rect(self, i):
+        return fitz.Rect(self.bounds[i].tolist())
+
+    def rects(self):
+        return [fitz.Rect(b) for b in self.bounds.tolist()]
+
+    def mediabox_rect(self, i):
+        return fitz.Rect(self.mediabox[i].tolist())
+
+    def slice(self, start, stop):
+        """start..stop-1 쪽만 담은 표 (분할 조각용)"""
+        return PageGeometry(self.bounds[start:stop], self.mediabox[start:stop],
+                            self.rotation[start:stop])
+
+    def size_counts(self):
+        """[(크기 이름, 쪽수), ...] 많은 순"""
+        counts = np.bincount(self.size_class, minlength=len(self.classes))
+        order = np.argsort(-counts, kind='stable')
+        return [(size_name(*self.classes[k].tolist()), int(counts[k])) for k in order]
+
+    def summary(self):
+        """'A4 18쪽, B5 2쪽 · 회전 3쪽' 같은 한 줄 요약"""
+        sizes = ", ".join(f"{name} {count}쪽" for name, count in self.size_counts())
+        text = sizes if self.distinct_sizes <= 3 else f"크기 {self.distinct_sizes}종"
+        if self.rotated_pages:
+            text += f" · 회전 {self.rotated_pages}쪽"
+        return text
+
+
+def build_geometry(doc):
+    """문서를 한 번 훑어 페이지 기하 표 생성 (PyMuPDF는 스레드 안전하지 않아 여는 쪽에서 바로 만듦)"""
+    bounds, mediabox, rotation = [], [], []
+    for page in doc:
+        bounds.append(tuple(page.bound()))
+        mediabox.append(tuple(page.mediabox))
+        rotation.append(page.rotation)
+    return PageGeometry(bounds, mediabox, rotation)
+
+
+def fit_margins(bounds, margins, target, anchor='center', first=0):
+    """여백 배열(n, 4: left, right, top, bottom pt)을 목표 크기에 맞게 고친 새 배열 (벡터 연산)
+
+    bounds: (n, 4) 가시 rect, target: (너비, 높이) pt, first: 첫 페이지 번호(0부터, 홀짝 판단용)
+    """
+    margins = np.array(margins, dtype=np.float64)
+    widths = bounds[:, 2] - bounds[:, 0]
+    heights = bounds[:, 3] - bounds[:, 1]
+    # 가로로 긴 쪽은 목표 크기도 가로 방향으로
+    landscape = widths > heights
+    target_w = np.where(landscape, target[1], target[0])
+    target_h = np.where(landscape, target[0], target[1])
+    extra_w = target_w - (widths + margins[:, 0] + margins[:, 1])
+    extra_h = target_h - (heights + margins[:, 2] + margins[:, 3])
+
+    if anchor == 'gutter':
+        # 홀수 쪽(1, 3, ...)은 왼쪽, 짝수 쪽은 오른쪽이 제본 쪽: 바깥쪽 여백으로만 맞춤
+        odd = (np.arange(first, first + len(margins)) % 2 == 0)
+        left_share = np.where(odd, 0.0, 1.0)
+    else:
+        left_share = np.full(len(margins), 0.5)
+    margins[:, 0] += extra_w * left_share
+    margins[:, 1] += extra_w * (1.0 - left_share)
+    margins[:, 2] += extra_h / 2
+    margins[:, 3] += extra_h / 2
+    return margins
+
+
+def page_margins(bounds, settings, first=0, rules=None):
+    """모든 쪽의 최종 여백 pt 배열 (n, 4): 쪽 범위 규칙/홀짝 여백 → 목표 크기 맞춤 → 개별 여백
+
+    bounds: PageGeometry.bounds (또는 같은 모양의 가시 rect 배열), first: 첫 페이지의 책 기준 번호(0부터, 병합/분할 조각의 시작 쪽)
+    rules: 이미 컴파일한 pdf_rules.MarginRules (없으면 settings로 컴파일)
+    """
+    rules = rules or pdf_rules.MarginRules(settings)
+    margins = rules.margins_array(first, len(bounds), overrides=False)
+    page_size = normalize_page_size(settings.get('page_size'))
+    target = target_size_pt(page_size)
+    if target is not None and len(bounds):
+        margins = fit_margins(bounds, margins, target, page_size['anchor'], first)
+    return rules.apply_overrides(margins, first)
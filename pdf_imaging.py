@@ -0,0 +1,438 @@
+"""PDF 렌더링 이미지 처리 유틸 (NumPy 기반, UI 비의존)"""
+import ctypes
+import hashlib
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# SSIM 안정화 상수 (8비트 밝기 기준, Wang et al. 2004)
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+SSIM_WINDOW = 7
+
+# 배경 정리(인코딩 전): 종이 밝기 분포의 정점(밝은 쪽 절반)에서 어두운 쪽으로 정점 높이의
+# PAPER_PEAK_FRACTION 미만이 되는 밝기를 흰색(255) 기준으로, 어두운 쪽 BLACK_PERCENTILE 백분위
+# (BLACK_MAX 이하)를 검정 기준으로 레벨을 늘린다. 종이/글자 대비가 LEVELS_MIN_RANGE 미만이거나
+# 흰색이 될 픽셀이 PAPER_MIN_FRACTION 미만(사진처럼 종이 바탕이 주가 아닌 쪽)이면 그대로
+PAPER_MIN_FRACTION = 0.3
+PAPER_PEAK_FRACTION = 0.25
+BLACK_PERCENTILE = 0.5
+BLACK_MAX = 80
+LEVELS_MIN_RANGE = 64
+# 히스토그램은 이 간격으로 건너뛴 픽셀로 계산
+LEVELS_SAMPLE_STEP = 4
+
+# 자동 화질 탐색 범위 (JPEG 품질)
+AUTO_QUALITY_MIN = 30
+AUTO_QUALITY_MAX = 95
+AUTO_QUALITY_STEP = 5
+# 자동 화질은 샘플 페이지 전체 대신 밝기 분산이 큰(내용이 많은) 타일 AUTO_QUALITY_TILES개만
+# 인코딩/비교하고, 품질 후보 탐색은 AUTO_QUALITY_MAX_PROBES번에서 멈춘다
+# (타일 크기는 JPEG 블록 16px의 배수라 페이지 전체를 인코딩할 때와 같은 블록으로 잘림)
+AUTO_QUALITY_TILE = 256
+AUTO_QUALITY_TILES = 6
+AUTO_QUALITY_MAX_PROBES = 4
+
+
+def pixmap_to_array(pix):
+    """Pixmap 샘플 버퍼를 복사 없이 (높이, 너비, 채널) 배열로 본다.
+
+    samples_mv는 Pixmap 수명을 붙잡지 않으므로(해제 후 접근 시 크래시) 같은 메모리를
+    ctypes 배열로 감싸 Pixmap 참조를 보관하고, 그 배열을 NumPy 배열의 base로 삼는다.
+    """
+    raw = (ctypes.c_ubyte * (pix.stride * pix.height)).from_address(pix.samples_ptr)
+    raw.pixmap = pix
+    arr = np.frombuffer(raw, dtype=np.uint8)
+    return arr.reshape(pix.height, pix.stride)[:, :pix.width * pix.n].reshape(
+        pix.height, pix.width, pix.n)
+
+
+def to_gray(arr):
+    """RGB(A)/Gray 배열을 float32 밝기(Y) 배열로 변환"""
+    if arr.ndim == 2:
+        return arr.astype(np.float32)
+    if arr.shape[2] < 3:
+        return arr[:, :, 0].astype(np.float32)
+    rgb = arr[:, :, :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def decode_image(data):
+    """인코딩된 이미지(JPEG 등) 바이트를 디코딩해 배열로 반환"""
+    pix = fitz.Pixmap(data)
+    return pixmap_to_array(pix).copy()
+
+
+def _box_mean(x, k):
+    """적분 영상으로 k×k 창 평균을 한 번에 계산 (valid 영역)"""
+    c = np.zeros((x.shape[0] + 1, x.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(x, axis=0, dtype=np.float64), axis=1, out=c[1:, 1:])
+    s = c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]
+    return s / (k * k)
+
+
+def compute_psnr(ref, test):
+    """두 이미지의 PSNR(dB) - 동일하면 inf"""
+    diff = ref.astype(np.float32) - test.astype(np.float32)
+    mse = float(np.mean(diff * diff))
+    if mse == 0:
+        return float('inf')
+    return float(10.0 * np.log10(255.0 * 255.0 / mse))
+
+
+def prepare_reference(ref, window=SSIM_WINDOW):
+    """원본 렌더의 밝기/국소 통계를 미리 계산 (여러 품질 비교 시 재사용)"""
+    x = to_gray(ref)
+    mu = _box_mean(x, window)
+    return {'gray': x, 'mu': mu, 'var': _box_mean(x * x, window) - mu * mu,
+            'window': window}
+
+
+def compare_to_reference(prepared, test):
+    """prepare_reference 결과와 비교 이미지의 SSIM/PSNR (밝기 채널 기준)"""
+    x = prepared['gray']
+    y = to_gray(test)
+    k = prepared['window']
+    psnr = compute_psnr(x, y)
+    if min(x.shape) < k:
+        return {'ssim': 1.0 if np.array_equal(x, y) else 0.0, 'psnr': psnr}
+
+    mu_x = prepared['mu']
+    mu_y = _box_mean(y, k)
+    syy = _box_mean(y * y, k) - mu_y * mu_y
+    sxy = _box_mean(x * y, k) - mu_x * mu_y
+
+    num = (2 * mu_x * mu_y + SSIM_C1) * (2 * sxy + SSIM_C2)
+    den = (mu_x * mu_x + mu_y * mu_y + SSIM_C1) * (prepared['var'] + syy + SSIM_C2)
+    return {'ssim': float(np.mean(num / den)), 'psnr': psnr}
+
+
+def compute_ssim(ref, test, window=SSIM_WINDOW):
+    """밝기 채널 기준 평균 SSIM (0~1, 1이면 동일)"""
+    return compare_to_reference(prepare_reference(ref, window), test)['ssim']
+
+
+def measure_quality(ref, data):
+    """원본 렌더(배열 또는 prepare_reference 결과)와 인코딩 바이트의 SSIM/PSNR"""
+    prepared = ref if isinstance(ref, dict) else prepare_reference(ref)
+    return compare_to_reference(prepared, decode_image(data))
+
+
+def sample_page_indices(total, count=5):
+    """문서 전체에 고르게 퍼진 샘플 페이지 번호 (0부터)"""
+    if total <= 0:
+        return []
+    idx = np.linspace(0, total - 1, num=min(count, total))
+    return sorted(set(int(round(i)) for i in idx))
+
+
+def sample_tiles(arr, size=AUTO_QUALITY_TILE, count=AUTO_QUALITY_TILES):
+    """밝기 분산이 큰 size×size 타일 count개를 가로로 이어 붙인 배열 (타일이 그보다 적으면 원본)"""
+    rows, cols = arr.shape[0] // size, arr.shape[1] // size
+    if rows * cols <= count:
+        return arr
+    step = LEVELS_SAMPLE_STEP
+    gray = to_gray(arr[:rows * size:step, :cols * size:step])
+    variance = gray.reshape(rows, size // step, cols, size // step).var(axis=(1, 3)).ravel()
+    picked = sorted(np.argsort(variance)[-count:])
+    return np.concatenate([arr[r * size:(r + 1) * size, c * size:(c + 1) * size]
+                           for r, c in (divmod(int(t), cols) for t in picked)], axis=1)
+
+
+def select_jpeg_quality(pixmaps, threshold, metric='ssim', q_min=AUTO_QUALITY_MIN,
+                        q_max=AUTO_QUALITY_MAX, q_step=AUTO_QUALITY_STEP, roundtrip=None,
+                        max_probes=AUTO_QUALITY_MAX_PROBES):
+    """샘플 Pixmap 전체가 기준 점수 이상을 유지하는 가장 낮은 품질을 찾는다.
+
+    점수는 품질에 대해 단조 증가한다고 보고 q_step 간격 후보를 이진 탐색한다 (최대 max_probes번,
+    다 쓰면 그때까지 통과한 품질). 페이지마다 sample_tiles로 고른 타일만 비교한다.
+    roundtrip(배열, 품질)은 인코딩 후 디코딩한 배열을 돌려준다 (기본: MuPDF JPEG).
+    반환값: (품질, {페이지 키: 점수 dict}) - 최고 품질로도 미달하면 q_max.
+    """
+    arrays = {key: sample_tiles(pixmap_to_array(pix)) for key, pix in pixmaps.items()}
+    refs = {key: prepare_reference(arr) for key, arr in arrays.items()}
+    if roundtrip is None:
+        def roundtrip(arr, q):
+            return decode_image(array_to_pixmap(arr).tobytes("jpg", jpg_quality=q))
+
+    def scores_at(q):
+        return {key: compare_to_reference(refs[key], roundtrip(arrays[key], q))
+                for key in pixmaps}
+
+    candidates = list(range(q_min, q_max, q_step))
+    best_q, best_scores = q_max, None
+    lo, hi = 0, len(candidates) - 1
+    probes = 0
+    while lo <= hi and probes < max_probes:
+        mid = (lo + hi) // 2
+        scores = scores_at(candidates[mid])
+        probes += 1
+        if all(s[metric] >= threshold for s in scores.values()):
+            best_q, best_scores = candidates[mid], scores
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    if best_scores is None:
+        # 통과한 후보가 없을 때만 최고 품질 점수를 따로 측정
+        best_scores = scores_at(q_max)
+    return best_q, best_scores
+
+
+# --- MRC (Mixed Raster Content) 분할 ---
+# 배경은 1/3, 전경 색상은 1/6 해상도로 줄이고 글자 형태는 원본 해상도 1비트 마스크로 보존
+MRC_BG_SCALE = 3
+MRC_FG_SCALE = 6
+MRC_WINDOW = 31        # 국소 밝기 평균 창 (px, 200 DPI 기준 약 4mm)
+MRC_CONTRAST = 24      # 주변보다 이만큼 어두워야 글자로 판단 (0~255)
+
+
+def box_mean_same(x, k):
+    """입력과 같은 크기의 k×k 창 평균 (가장자리는 복제 패딩)"""
+    pad = k // 2
+    return _box_mean(np.pad(x, ((pad, k - 1 - pad), (pad, k - 1 - pad)), mode='edge'), k)
+
+
+def otsu_threshold(gray):
+    """밝기 히스토그램의 클래스 간 분산을 최대화하는 임계값 (Otsu)"""
+    hist = np.bincount(np.clip(gray, 0, 255).astype(np.uint8).ravel(), minlength=256)
+    hist = hist.astype(np.float64)
+    levels = np.arange(256, dtype=np.float64)
+    w0 = np.cumsum(hist)
+    w1 = w0[-1] - w0
+    m0 = np.cumsum(hist * levels)
+    mu0 = m0 / np.maximum(w0, 1)
+    mu1 = (m0[-1] - m0) / np.maximum(w1, 1)
+    between = w0 * w1 * (mu0 - mu1) ** 2
+    return int(np.argmax(between))
+
+
+def _block_mean(arr, weight, scale):
+    """weight가 참인 픽셀만으로 scale×scale 블록 평균을 구하고 빈 블록은 이웃/전체 평균으로 채움"""
+    h, w = weight.shape
+    bh, bw = -(-h // scale), -(-w // scale)
+    ph, pw = bh * scale - h, bw * scale - w
+    arr = np.pad(arr, ((0, ph), (0, pw), (0, 0)), mode='edge').astype(np.float32)
+    wt = np.pad(weight, ((0, ph), (0, pw)), mode='constant').astype(np.float32)
+
+    sums = (arr * wt[:, :, None]).reshape(bh, scale, bw, scale, -1).sum(axis=(1, 3))
+    counts = wt.reshape(bh, scale, bw, scale).sum(axis=(1, 3))
+
+    # 값이 없는 블록: 3×3 이웃 블록 평균 → 그래도 없으면 전체 평균
+    empty = counts == 0
+    if empty.any():
+        n_sums = np.stack([box_mean_same(sums[:, :, c], 3) for c in range(sums.shape[2])], axis=2)
+        n_counts = box_mean_same(counts, 3)
+        fill = n_counts > 0
+        sums[empty & fill] = n_sums[empty & fill]
+        counts[empty & fill] = n_counts[empty & fill]
+        rest = counts == 0
+        if rest.any():
+            total = counts.sum()
+            glob = sums.reshape(-1, sums.shape[2]).sum(axis=0) / total if total else 255.0
+            sums[rest] = glob
+            counts[rest] = 1.0
+    out = sums / counts[:, :, None]
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8)
+
+
+def segment_mrc(arr, bg_scale=MRC_BG_SCALE, fg_scale=MRC_FG_SCALE,
+                window=MRC_WINDOW, contrast=MRC_CONTRAST):
+    """렌더 배열을 MRC 3계층으로 분할.
+
+    반환값: (글자 마스크 bool[h, w], 저해상도 배경 RGB, 저해상도 전경 색상 RGB)
+    글자는 '주변보다 충분히 어둡고, 전체적으로도 어두운 쪽' 픽셀로 본다.
+    사진처럼 넓게 어두운 영역은 국소 평균과 차이가 작아 배경에 남는다.
+    """
+    rgb = arr[:, :, :3] if arr.shape[2] >= 3 else np.repeat(arr[:, :, :1], 3, axis=2)
+    gray = to_gray(rgb)
+    local = box_mean_same(gray, window)
+    mask = (gray < local - contrast) & (gray < otsu_threshold(gray))
+
+    # 글자 가장자리(안티앨리어싱) 번짐이 배경에 남지 않도록 1px 팽창한 영역은 배경 평균에서 제외
+    halo = box_mean_same(mask.astype(np.float32), 3) > 0
+    background = _block_mean(rgb, ~halo, bg_scale)
+    foreground = _block_mean(rgb, mask, fg_scale)
+    return mask, background, foreground
+
+
+def default_cleanup():
+    return {'whiten': False, 'despeckle': False}
+
+
+def normalize_cleanup(cleanup):
+    """배경 정리 설정 (settings['cleanup'])을 기본값으로 보충한 새 dict"""
+    merged = default_cleanup()
+    for key in merged:
+        merged[key] = bool((cleanup or {}).get(key, merged[key]))
+    return merged
+
+
+def level_luts(arr):
+    """채널별 레벨 조정표 (256,) uint8 목록. 밝은 종이 배경이 없는 페이지(사진 등)는 None"""
+    sample = arr[::LEVELS_SAMPLE_STEP, ::LEVELS_SAMPLE_STEP]
+    levels = np.arange(256, dtype=np.float32)
+    luts = []
+    for c in range(min(arr.shape[2], 3)):
+        hist = np.bincount(sample[:, :, c].ravel(), minlength=256)
+        peak = 128 + int(np.argmax(hist[128:]))
+        below = np.flatnonzero(hist[:peak + 1] < hist[peak] * PAPER_PEAK_FRACTION)
+        white = int(below[-1]) if below.size else 0
+        cdf = np.cumsum(hist)
+        black = min(int(np.searchsorted(cdf, cdf[-1] * BLACK_PERCENTILE / 100)), BLACK_MAX)
+        if white - black < LEVELS_MIN_RANGE or cdf[-1] - cdf[white] < cdf[-1] * PAPER_MIN_FRACTION:
+            return None
+        luts.append(np.clip((levels - black) * (255.0 / (white - black)) + 0.5, 0, 255)
+                    .astype(np.uint8))
+    return luts
+
+
+def whiten_background(arr):
+    """누렇게 바랜 종이/배경 잡음을 흰색(255)으로: 채널별 레벨 조정을 배열에 제자리 적용.
+    적용했으면 True (arr는 Pixmap 버퍼를 그대로 보는 pixmap_to_array 결과여도 됨)"""
+    luts = level_luts(arr)
+    if luts is None:
+        return False
+    for c, lut in enumerate(luts):
+        channel = arr[:, :, c]
+        np.take(lut, channel, out=channel)
+    return True
+
+
+def despeckle(arr):
+    """흰 바탕에 홀로 떨어진 1픽셀 점(스캔 티끌)을 흰색으로 (제자리). 지운 픽셀 수 반환.
+    whiten_background 뒤에 써야 바탕이 정확히 255라 효과가 있다"""
+    # 채널 축 min()은 Pixmap 버퍼처럼 채널이 붙어 있는 배열에서 느려 채널끼리 직접 비교
+    darkest = arr[:, :, 0]
+    for c in range(1, min(arr.shape[2], 3)):
+        darkest = np.minimum(darkest, arr[:, :, c])
+    ink = darkest < 255
+    # 3×3 창의 잉크 수를 가로/세로 합으로 계산: 자기 자신만 잉크면 외딴 점
+    padded = np.pad(ink, 1).view(np.uint8)
+    rows = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    counts = rows[:-2] + rows[1:-1] + rows[2:]
+    ys, xs = np.nonzero(ink & (counts == 1))
+    arr[ys, xs] = 255
+    return int(ys.size)
+
+
+def clean_background(arr, cleanup):
+    """인코딩 전 배경 정리 (cleanup: normalize_cleanup 형식). 정리 결과 dict 또는 None(끔)"""
+    if not (cleanup['whiten'] or cleanup['despeckle']):
+        return None
+    return {'whitened': whiten_background(arr) if cleanup['whiten'] else False,
+            'speckles': despeckle(arr) if cleanup['despeckle'] else 0}
+
+
+def pack_mask(mask):
+    """bool 마스크를 PDF 1비트 이미지 행 단위(바이트 정렬)로 압축 전 패킹"""
+    return np.packbits(mask, axis=1).tobytes()
+
+
+def compose_mrc(mask, background, foreground):
+    """MRC 계층을 원본 해상도로 다시 합성 (화질 측정용, 최근접 확대)"""
+    h, w = mask.shape
+
+    def upscale(layer):
+        sy = -(-h // layer.shape[0])
+        sx = -(-w // layer.shape[1])
+        return np.repeat(np.repeat(layer, sy, axis=0), sx, axis=1)[:h, :w]
+
+    out = upscale(background).copy()
+    out[mask] = upscale(foreground)[mask]
+    return out
+
+
+def array_to_pixmap(arr):
+    """(높이, 너비, 3) uint8 배열을 RGB Pixmap으로 변환"""
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    h, w = arr.shape[:2]
+    return fitz.Pixmap(fitz.csRGB, w, h, arr.tobytes(), 0)
+
+
+# --- PDF 이미지 객체 ---
+def add_image_xobject(doc, data, width, height, filter_name=None,
+                      colorspace='/DeviceRGB', bpc=8, extra=''):
+    """이미 인코딩된 스트림을 재압축 없이 이미지 XObject로 추가하고 xref 반환.
+
+    update_stream은 /Filter를 지우므로 스트림 기록 뒤에 필터를 다시 지정한다.
+    """
+    xref = doc.get_new_xref()
+    cs = f" /ColorSpace {colorspace}" if colorspace else ""
+    doc.update_object(xref, f"<< /Type /XObject /Subtype /Image /Width {width} "
+                            f"/Height {height}{cs} /BitsPerComponent {bpc} {extra} >>")
+    doc.update_stream(xref, data, compress=0)
+    if filter_name:
+        doc.xref_set_key(xref, "Filter", filter_name)
+    return xref
+
+
+class ImageDeduplicator:
+    """저장 중 인코딩된 이미지 스트림을 내용 해시로 묶어 같은 이미지는 한 번만 기록.
+
+    빈 페이지, 반복 로고/삽지처럼 바이트가 같은 이미지는 처음 만든 xref를 모든 페이지가 참조한다.
+    """
+    def __init__(self):
+        self.xrefs = {}
+        self.unique = 0
+        self.reused = 0
+        self.saved_bytes = 0
+
+    def add(self, doc, data, width, height, filter_name=None,
+            colorspace='/DeviceRGB', bpc=8, extra=''):
+        # 스트림 바이트 + 이미지 사전 속성이 모두 같아야 같은 객체로 본다 (/Mask 참조 포함)
+        key = (hashlib.sha1(data).digest(), width, height, filter_name, colorspace, bpc, extra)
+        xref = self.xrefs.get(key)
+        if xref:
+            self.reused += 1
+            self.saved_bytes += len(data)
+            return xref
+        xref = add_image_xobject(doc, data, width, height, filter_name, colorspace, bpc, extra)
+        self.xrefs[key] = xref
+        self.unique += 1
+        return xref
+
+    def summary(self):
+        return {'unique_images': self.unique, 'reused_images': self.reused,
+                'saved_bytes': self.saved_bytes}
+
+
+def _add_xobject(doc, dedup, *args, **kwargs):
+    if dedup:
+        return dedup.add(doc, *args, **kwargs)
+    return add_image_xobject(doc, *args, **kwargs)
+
+
+def insert_image_encoded(doc, page, rect, image, extra='', dedup=None):
+    """pdf_encoders 결과 한 장을 XObject로 추가해 rect에 배치하고 xref 반환"""
+    w, h = image['size']
+    xref = _add_xobject(doc, dedup, image['data'], w, h, image['filter'],
+                        colorspace=image['colorspace'], bpc=image.get('bpc', 8), extra=extra)
+    # 렌더 영역에 정확히 맞추기 위해 비율 유지(가운데 정렬) 없이 rect 전체에 배치
+    page.insert_image(rect, xref=xref, keep_proportion=False)
+    return xref
+
+
+def encoded_size(encoded):
+    """인코딩 결과가 PDF에 차지하는 이미지 스트림 바이트 합계"""
+    if encoded['kind'] == 'mrc':
+        return len(encoded['bg']['data']) + len(encoded['fg']['data']) + len(encoded['mask'])
+    return len(encoded['image']['data'])
+
+
+def insert_encoded(doc, page, rect, encoded, dedup=None):
+    """워커가 만든 인코딩 결과(이미지 1장 또는 MRC 3계층)를 페이지 rect에 배치.
+
+    dedup(ImageDeduplicator)을 넘기면 문서 안에서 같은 이미지 스트림을 재사용한다.
+    """
+    if encoded['kind'] == 'mrc':
+        insert_image_encoded(doc, page, rect, encoded['bg'], dedup=dedup)
+
+        # 전경 색상 이미지에 원본 해상도 1비트 글자 마스크를 /Mask로 연결
+        mw, mh = encoded['mask_size']
+        mask_xref = _add_xobject(doc, dedup, encoded['mask'], mw, mh, '/FlateDecode',
+                                 colorspace=None, bpc=1,
+                                 extra='/ImageMask true /Decode [1 0]')
+        insert_image_encoded(doc, page, rect, encoded['fg'],
+                             extra=f'/Mask {mask_xref} 0 R', dedup=dedup)
+    else:
+        insert_image_encoded(doc, page, rect, encoded['image'], dedup=dedup)
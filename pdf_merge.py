@@ -0,0 +1,140 @@
+"""여러 PDF(장별 스캔 등)를 원본마다 다른 여백 설정으로 처리해 한 권으로 병합
+
+원본은 한 번에 하나씩 열어 저장 엔진으로 임시 파일에 저장한 뒤 출력 파일 끝에 붙이고
+증분 저장(incremental save)한다. 출력 문서는 매번 닫았다가 다시 여므로 메모리에는
+가장 큰 원본 하나의 처리 분량만 올라간다.
+compact=True면 다 붙인 뒤 한 번 전체 저장해 증분 저장 이력(이전 xref/객체)을 정리한다.
+이 정리는 병합본 전체 객체를 읽어야 해 메모리가 출력 전체 크기만큼 늘어나므로 기본은 끈다.
+홀/짝 여백은 원본 안의 쪽 번호가 아니라 병합된 책에서의 쪽 번호 기준으로 적용한다.
+"""
+import json
+import os
+
+import fitz  # PyMuPDF
+
+import pdf_engine
+
+
+def plan_merge(sources):
+    """[(입력 경로, 설정)] → 원본별 작업 목록 (쪽수, 병합본에서 시작 위치). 쪽수만 읽고 바로 닫음"""
+    plan = []
+    offset = 0
+    for path, settings in sources:
+        with fitz.open(path) as doc:
+            pages = len(doc)
+        plan.append({'input': path, 'settings': pdf_engine.normalize_settings(settings),
+                     'pages': pages, 'offset': offset})
+        offset += pages
+    return plan
+
+
+def _append(out_path, part_path, first):
+    """part_path의 페이지를 out_path 끝에 붙임 (처음이면 그대로 이동)"""
+    if first:
+        os.replace(part_path, out_path)
+        return
+    with fitz.open(out_path) as out, fitz.open(part_path) as part:
+        out.insert_pdf(part)
+        out.saveIncr()
+    os.remove(part_path)
+
+
+def _finalize(out_path, path):
+    """증분 저장을 거듭한 out_path를 한 번 전체 저장(미사용 객체 정리/압축)해 path로 교체.
+    병합본 전체 객체를 메모리에 올리므로 compact=True일 때만 쓴다"""
+    final_path = path + ".final.part"
+    with fitz.open(out_path) as out:
+        out.save(final_path, garbage=3, deflate=True)
+    os.replace(final_path, path)
+    os.remove(out_path)
+
+
+def merge_documents(sources, path, options=None, cache=None, progress=None, status=None,
+                    compact=False):
+    """원본 목록 [(입력 경로, 설정)]을 차례로 처리해 path 하나로 병합하고 보고서(dict) 반환.
+
+    options: pdf_engine.DEFAULT_SAVE_OPTIONS 형식 (모든 원본 공통)
+    progress(done, total): 병합 전체 기준 진행률, status(text | None): 단계 표시 콜백
+    출력은 path + ".part"에 만든 뒤 끝나면 교체한다.
+    compact: 끝에 전체 저장으로 증분 저장 이력 정리 (파일은 작아지지만 메모리가 병합본 전체 크기만큼 필요)
+    """
+    progress = progress or (lambda done, total: None)
+    status = status or (lambda text: None)
+    plan = plan_merge(sources)
+    total_pages = sum(src['pages'] for src in plan)
+    tmp_path = path + ".part"
+    report = {'output': path, 'total_pages': total_pages, 'sources': []}
+    output_pages = 0
+    try:
+        for n, src in enumerate(plan):
+            status(f"병합 중 ({n + 1}/{len(plan)}): {os.path.basename(src['input'])}")
+            part_path = f"{path}.{n}.part"
+            def on_progress(done, total, base=src['offset']):
+                progress(base + done, total_pages)
+
+            with fitz.open(src['input']) as doc:
+                src_report = pdf_engine.save_document(
+                    doc, part_path, src['settings'], options, cache=cache,
+                    progress=on_progress, page_offset=src['offset'])
+            _append(tmp_path, part_path, first=(n == 0))
+            # MuPDF 전역 캐시(store)에 남은 이전 원본의 객체를 비워 메모리가 원본 수만큼 늘지 않게 함
+            fitz.TOOLS.store_shrink(100)
+            # 빈/중복 페이지를 뺐을 수 있으므로 병합본 쪽 범위는 실제 출력 쪽수로 계산
+            pages = src_report.get('output_pages', src['pages'])
+            report['sources'].append({
+                'input': src['input'], 'pages': pages, 'source_pages': src['pages'],
+                'first_page': output_pages + 1,
+                'saved_mb': src_report['saved_mb'], 'mode': src_report.get('mode', 'lossless'),
+            })
+            output_pages += pages
+        if compact:
+            status("병합본 정리 중...")
+            _finalize(tmp_path, path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        leftovers = [tmp_path, path + ".final.part"] + [f"{path}.{n}.part" for n in range(len(plan))]
+        for leftover in leftovers:
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    finally:
+        status(None)
+    report['output_pages'] = output_pages
+    report['saved_mb'] = round(os.path.getsize(path) / (1024 * 1024), 3)
+    return report
+
+
+def summarize_merge(report):
+    pages = f"{report['output_pages']} 페이지"
+    if report['output_pages'] != report['total_pages']:
+        pages += f" (원본 {report['total_pages']} 페이지)"
+    lines = [f"병합: 원본 {len(report['sources'])}개, {pages}, {report['saved_mb']:.2f} MB"]
+    for src in report['sources']:
+        last = src['first_page'] + src['pages'] - 1
+        pages = f"{src['first_page']}-{last}쪽" if src['pages'] else "(남은 쪽 없음)"
+        lines.append(f"  {pages}  {os.path.basename(src['input'])} ({src['saved_mb']:.2f} MB)")
+    return "\n".join(lines)
+
+
+def load_manifest(path, settings_data, default_settings):
+    """병합 목록 JSON 읽기: [{"input": 경로, "preset": 이름 | "settings": {...}}, ...]
+
+    input의 상대 경로는 목록 파일 기준. preset/settings가 없으면 default_settings 사용.
+    잘못된 프리셋은 ValueError
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    sources = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'input': entry}
+        if 'settings' in entry:
+            settings = pdf_engine.normalize_settings(entry['settings'])
+        elif 'preset' in entry:
+            settings = pdf_engine.preset_settings(settings_data, entry['preset'])
+        else:
+            settings = default_settings
+        sources.append((os.path.join(base, entry['input']), settings))
+    return sources
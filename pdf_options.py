@@ -0,0 +1,22 @@
+"""저장 동작 옵션 상수 (fitz/numpy 없음): 명령줄 도구가 엔진을 불러오기 전에 인자 정의에 씀"""
+
+# 빈 페이지 처리: keep = 검사 안 함, flag = 보고서에만 표시,
+# minimal = 렌더링/인코딩 없이 같은 크기의 흰 페이지로, drop = 출력에서 제외
+BLANK_MODES = ('keep', 'flag', 'minimal', 'drop')
+# 중복 페이지 처리(재스캔/겹쳐 들어간 거의 같은 쪽): keep = 검사 안 함, flag = 보고서에만 표시,
+# drop = 처음 나온 쪽만 남기고 제외
+DUPLICATE_MODES = ('keep', 'flag', 'drop')
+
+# 저장 동작 옵션 기본값 (여백/인코더처럼 프리셋에 들어가는 값은 settings 쪽)
+DEFAULT_SAVE_OPTIONS = {
+    'compression': 0,        # 0 = 완전 무손실, 1~100 = 압축 수준(%)
+    'auto_quality': False,   # 샘플 페이지 SSIM 기준 자동 품질
+    'ssim_threshold': 0.95,
+    'mrc': False,            # 글자/배경 분리 압축
+    'preserve': False,       # 텍스트/벡터 유지 (이미지만 재압축)
+    'hard_crop': False,      # 무손실 저장에서 잘린 픽셀 제거
+    'deskew': False,         # 기울기 보정 (무손실/텍스트 유지 저장, 페이지 변환)
+    'blank_pages': 'keep',   # 빈 페이지 처리 (BLANK_MODES)
+    'duplicate_pages': 'keep',  # 중복 페이지 처리 (DUPLICATE_MODES)
+    'workers': None,         # 병렬 워커 수 (None = 자동)
+}
@@ -0,0 +1,111 @@
+"""텍스트/벡터 유지 압축: 페이지 콘텐츠는 그대로 두고 페이지 안의 이미지 XObject만 재압축"""
+import hashlib
+import math
+
+import fitz  # PyMuPDF
+
+import pdf_encoders
+import pdf_imaging
+
+# 이보다 작은 이미지 스트림은 재압축 이득보다 화질 손실이 커서 그대로 둔다
+MIN_IMAGE_BYTES = 4096
+
+
+def image_placements(doc):
+    """문서 전체에서 이미지 xref별 가장 크게 배치된 크기 (너비 pt, 높이 pt).
+
+    이미지가 없는 페이지는 아무것도 남기지 않으므로 재압축 단계에서 자연히 건너뛴다.
+    회전된 배치도 이미지 축 기준 길이로 계산한다.
+    """
+    placements = {}
+    for page in doc:
+        for info in page.get_image_info(xrefs=True):
+            xref = info['xref']
+            if not xref:
+                continue  # 인라인 이미지는 콘텐츠 스트림 안에 있어 교체 불가
+            a, b, c, d = info['transform'][:4]
+            w, h = math.hypot(a, b), math.hypot(c, d)
+            old_w, old_h = placements.get(xref, (0, 0))
+            placements[xref] = (max(old_w, w), max(old_h, h))
+    return placements
+
+
+def _skip_reason(doc, xref):
+    """재압축하면 안 되는 이미지면 이유, 아니면 None"""
+    if doc.xref_get_key(xref, "ImageMask")[1] == "true":
+        return 'mask'
+    if doc.xref_get_key(xref, "BitsPerComponent")[1] == "1":
+        return '1bit'  # 흑백 2값 이미지는 CCITT/Flate가 JPEG보다 작고 선명
+    if doc.xref_get_key(xref, "Mask")[0] == "array":
+        return 'colorkey'  # 색상 키 마스크는 원본 색 값에 의존
+    return None
+
+
+def _replace_image_stream(doc, xref, encoded):
+    """기존 이미지 XObject의 스트림과 사전 속성을 인코딩 결과로 교체 (참조 xref 유지)"""
+    w, h = encoded['size']
+    doc.update_stream(xref, encoded['data'], compress=0)
+    doc.xref_set_key(xref, "Filter", encoded['filter'])
+    doc.xref_set_key(xref, "Width", str(w))
+    doc.xref_set_key(xref, "Height", str(h))
+    doc.xref_set_key(xref, "ColorSpace", encoded['colorspace'])
+    doc.xref_set_key(xref, "BitsPerComponent", "8")
+    for key in ("DecodeParms", "Decode"):
+        doc.xref_set_key(xref, key, "null")
+
+
+def recompress_images(doc, quality, encoder=None, max_dpi=None, progress=None):
+    """doc 안의 이미지들을 선택 인코더로 재압축 (제자리 수정).
+
+    max_dpi: 배치 크기 기준 해상도가 이보다 높으면 이 해상도로 줄임
+    progress: progress(처리한 수, 전체 수) 콜백
+    재압축 결과가 원본보다 크면 원본 스트림을 유지한다.
+    """
+    placements = image_placements(doc)
+    stats = {'images': len(placements), 'recompressed': 0, 'downsampled': 0,
+             'skipped': {}, 'bytes_before': 0, 'bytes_after': 0}
+    # 페이지 단위 복사로 같은 이미지가 여러 xref로 복제될 수 있어 원본 바이트 기준으로 결과를 재사용
+    seen = {}
+
+    for done, (xref, (width_pt, height_pt)) in enumerate(placements.items(), 1):
+        if progress:
+            progress(done, len(placements))
+        raw = doc.xref_stream_raw(xref)
+        stats['bytes_before'] += len(raw)
+        reason = 'small' if len(raw) < MIN_IMAGE_BYTES else _skip_reason(doc, xref)
+        key = (hashlib.sha1(raw).digest(), round(width_pt, 1), round(height_pt, 1))
+        if reason is None and key in seen:
+            encoded = seen[key]
+        elif reason is None:
+            encoded = None
+            pix = fitz.Pixmap(doc, xref)
+            if pix.alpha:
+                pix = fitz.Pixmap(pix, 0)  # 투명도는 별도 SMask로 유지됨
+            if pix.n not in (1, 3):
+                pix = fitz.Pixmap(fitz.csRGB, pix)
+            if max_dpi and width_pt > 0 and height_pt > 0:
+                # 두 축 중 해상도가 낮은 쪽이 max_dpi 아래로 내려가지 않게 축소
+                scale = max(max_dpi * width_pt / 72 / pix.width,
+                            max_dpi * height_pt / 72 / pix.height)
+                if scale < 1:
+                    pix = fitz.Pixmap(pix, max(1, round(pix.width * scale)),
+                                      max(1, round(pix.height * scale)), None)
+                    stats['downsampled'] += 1
+            candidate = pdf_encoders.encode(pdf_imaging.pixmap_to_array(pix), quality, encoder)
+            if len(candidate['data']) < len(raw):
+                encoded = candidate
+            else:
+                reason = 'larger'
+            seen[key] = encoded
+        else:
+            encoded = None
+
+        if encoded is None:
+            reason = reason or 'larger'
+            stats['skipped'][reason] = stats['skipped'].get(reason, 0) + 1
+            stats['bytes_after'] += len(raw)
+            continue
+        _replace_image_stream(doc, xref, encoded)
+        stats['recompressed'] += 1
+        stats['bytes_after'] += len(encoded['data'])
+    return stats
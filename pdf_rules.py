@@ -0,0 +1,165 @@
+"""쪽 범위 여백 규칙: 표지/앞부분/화보/부록처럼 홀/짝만으로 나눌 수 없는 구간의 여백
+
+규칙은 settings['rules']에 목록으로 저장되어 프리셋과 함께 보관된다.
+    {"name": "표지", "pages": "1-2, 300-", "parity": "all" | "odd" | "even",
+     "priority": 0, "left": 0.0, "right": 0.0, "top": 0.0, "bottom": 0.0}
+쪽 번호는 1부터 (병합에서는 병합된 책 기준), "300-"은 끝까지. 여러 규칙이 겹치면 우선순위가
+높은 규칙, 같으면 목록에서 뒤에 있는 규칙이 이긴다. 규칙이 없는 쪽은 기존 홀/짝 여백을 쓴다.
+
+접지 화보처럼 한두 쪽만 다른 여백은 settings['overrides']에 쪽 번호별로 따로 둔다
+(지정한 쪽만 저장: {"37": {"left": 0.0, ...}}). 개별 여백은 규칙보다 우선한다.
+
+규칙은 한 번 겹치지 않는 구간 목록(시작 쪽 정렬)으로 컴파일해 두고, 쪽마다 이진 탐색으로
+홀/짝 여백을 찾는다. 개별 여백은 쪽 번호 dict로 바로 찾는다.
+"""
+import bisect
+
+import numpy as np
+
+import pdf_engine
+
+PARITIES = ('all', 'odd', 'even')
+
+
+def parse_ranges(text):
+    """"1-4, 7, 300-" → [(1, 4), (7, 7), (300, None)] (양 끝 포함, None = 끝까지). 잘못되면 ValueError"""
+    ranges = []
+    for part in str(text).replace(' ', '').split(','):
+        if not part:
+            continue
+        start, dash, stop = part.partition('-')
+        try:
+            first = int(start)
+            last = (int(stop) if stop else None) if dash else first
+        except ValueError:
+            raise ValueError(f"쪽 범위를 읽을 수 없습니다: '{part}'") from None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"잘못된 쪽 범위: '{part}'")
+        ranges.append((first, last))
+    if not ranges:
+        raise ValueError("쪽 범위가 비어 있습니다.")
+    return ranges
+
+
+def normalize_rule(rule):
+    """저장된 규칙을 기본값으로 보충한 새 dict. 잘못된 범위/홀짝 값은 ValueError"""
+    parity = rule.get('parity', 'all')
+    if parity not in PARITIES:
+        raise ValueError(f"홀/짝 구분은 {', '.join(PARITIES)} 중 하나여야 합니다: '{parity}'")
+    pages = str(rule.get('pages', '')).strip()
+    parse_ranges(pages)
+    normalized = {'name': str(rule.get('name', '')), 'pages': pages, 'parity': parity,
+                  'priority': int(rule.get('priority', 0))}
+    for side in pdf_engine.SIDES:
+        normalized[side] = float(rule.get(side, 0.0))
+    return normalized
+
+
+def normalize_overrides(overrides):
+    """쪽별 개별 여백 {"쪽 번호": {여백 mm}} 정규화 (키는 1부터의 쪽 번호 문자열). 잘못되면 ValueError"""
+    normalized = {}
+    for key, margins in (overrides or {}).items():
+        try:
+            page_no = int(key)
+        except ValueError:
+            raise ValueError(f"개별 여백의 쪽 번호를 읽을 수 없습니다: '{key}'") from None
+        if page_no < 1:
+            raise ValueError(f"잘못된 쪽 번호: {page_no}")
+        normalized[str(page_no)] = {side: float(margins.get(side, 0.0))
+                                    for side in pdf_engine.SIDES}
+    return normalized
+
+
+class MarginRules:
+    """settings(odd/even + rules)를 컴파일한 쪽별 여백 조회표
+
+    starts[k] 쪽부터 다음 구간 전까지는 segments[k] = (홀수 쪽 규칙 번호, 짝수 쪽 규칙 번호)
+    (None = 규칙 없음 → 기본 홀/짝 여백). overrides: 페이지(0부터) → 개별 여백 pt
+    """
+
+    def __init__(self, settings):
+        self.base = {p_type: tuple(settings[p_type][side] * pdf_engine.MM_TO_PT
+                                   for side in pdf_engine.SIDES)
+                     for p_type in ('odd', 'even')}
+        rules = [normalize_rule(r) for r in settings.get('rules') or []]
+        self.names = [r['name'] or f"규칙 {n + 1}" for n, r in enumerate(rules)]
+        self.margins = [tuple(r[side] * pdf_engine.MM_TO_PT for side in pdf_engine.SIDES)
+                        for r in rules]
+        self.overrides = {
+            int(key) - 1: tuple(margins[side] * pdf_engine.MM_TO_PT for side in pdf_engine.SIDES)
+            for key, margins in normalize_overrides(settings.get('overrides')).items()}
+
+        # 규칙 범위의 경계로 쪽 번호 축을 겹치지 않는 구간으로 나눔
+        spans = []  # (시작, 끝 + 1 또는 None, 규칙 번호)
+        bounds = {1}
+        for n, r in enumerate(rules):
+            for first, last in parse_ranges(r['pages']):
+                stop = last + 1 if last is not None else None
+                spans.append((first, stop, n))
+                bounds.add(first)
+                if stop is not None:
+                    bounds.add(stop)
+        # 이기는 순서: 우선순위, 같으면 목록에서 뒤에 있는 규칙
+        rank = {n: (r['priority'], n) for n, r in enumerate(rules)}
+
+        self.starts = []
+        self.segments = []
+        for start in sorted(bounds):
+            best = {'odd': None, 'even': None}
+            for first, stop, n in spans:
+                if first <= start and (stop is None or start < stop):
+                    for p_type in ('odd', 'even'):
+                        if rules[n]['parity'] in ('all', p_type) and (
+                                best[p_type] is None or rank[n] > rank[best[p_type]]):
+                            best[p_type] = n
+            segment = (best['odd'], best['even'])
+            # 이웃한 구간의 결과가 같으면 합쳐 조회표를 작게 유지
+            if self.segments and self.segments[-1] == segment:
+                continue
+            self.starts.append(start)
+            self.segments.append(segment)
+
+    def margins_array(self, first, count, overrides=True):
+        """연속한 페이지 first..first+count-1 (0부터)의 여백 pt 배열 (count, 4).
+        쪽마다 찾지 않고 구간표를 한 번에 searchsorted로 조회한다.
+        overrides=False면 개별 여백 없이 규칙/홀짝 여백만"""
+        page_no = np.arange(first + 1, first + count + 1)
+        segment = np.searchsorted(np.array(self.starts), page_no, side='right') - 1
+        even = (page_no % 2 == 0).astype(np.intp)
+        # 규칙 번호 표 (None → 규칙 수 + 홀/짝: 뒤에 붙인 기본 여백 행)
+        n_rules = len(self.margins)
+        winners = np.array([[n_rules if odd is None else odd, n_rules + 1 if ev is None else ev]
+                            for odd, ev in self.segments], dtype=np.intp)
+        table = np.array(self.margins + [self.base['odd'], self.base['even']],
+                         dtype=np.float64).reshape(-1, 4)
+        margins = table[winners[segment, even]]
+        if overrides:
+            self.apply_overrides(margins, first)
+        return margins
+
+    def apply_overrides(self, margins, first):
+        """margins 배열(first부터의 페이지)에 개별 여백을 덮어씀 (제자리 수정)"""
+        for page_index, values in self.overrides.items():
+            if 0 <= page_index - first < len(margins):
+                margins[page_index - first] = values
+        return margins
+
+    def rule_index(self, page_index):
+        """페이지(0부터, 병합 시 책 기준)에 적용되는 규칙 번호 또는 None"""
+        page_no = page_index + 1
+        k = bisect.bisect_right(self.starts, page_no) - 1
+        return self.segments[k][page_no % 2 == 0]
+
+    def margins_pt(self, page_index):
+        """페이지(0부터)의 여백 pt (left, right, top, bottom): 개별 여백 → 규칙 → 홀/짝"""
+        override = self.overrides.get(page_index)
+        if override is not None:
+            return override
+        n = self.rule_index(page_index)
+        if n is None:
+            return self.base['even' if (page_index + 1) % 2 == 0 else 'odd']
+        return self.margins[n]
+
+    def rule_name(self, page_index):
+        n = self.rule_index(page_index)
+        return None if n is None else self.names[n]
@@ -0,0 +1,439 @@
+"""로컬 HTTP 작업 서비스: 같은 PC의 다른 도구가 여백/압축 엔진을 호출할 수 있게 함
+
+127.0.0.1(루프백)에서만 열리며 외부 접속은 받지 않는다.
+작업은 pdf_batch.JobRunner(파일별 프로세스, 동시 실행 수 제한)로 처리한다.
+
+엔드포인트:
+    POST   /jobs                PDF 제출 (application/pdf 본문 + ?settings=&options= JSON,
+                                또는 application/json {"pdf_base64", "name", "settings", "options"})
+                                서버 쪽 파일 경로는 받지 않음 (업로드한 내용만 처리)
+    GET    /jobs                작업 목록
+    GET    /jobs/<id>           상태, 진행률, 대기/처리 시간
+    GET    /jobs/<id>/events    진행 상황 스트리밍 (NDJSON, 끝날 때까지)
+    GET    /jobs/<id>/result    결과 PDF 다운로드 (?wait=초 - 끝날 때까지 대기)
+    DELETE /jobs/<id>           대기/처리 중이면 취소, 끝난 작업이면 결과 삭제
+    GET    /queue               대기열 길이, 처리 중 작업 수
+"""
+import base64
+import ipaddress
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+import pdf_batch
+import pdf_engine
+
+DEFAULT_PORT = 8765
+# 업로드 최대 크기
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+# 끝난 작업 결과 보관 시간 (초)
+RESULT_TTL = 3600
+
+# 작업 상태 (끝난 상태는 pdf_batch와 같은 값)
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+FINAL_STATUSES = (pdf_batch.STATUS_OK, pdf_batch.STATUS_FAILED,
+                  pdf_batch.STATUS_TIMEOUT, pdf_batch.STATUS_CANCELLED)
+
+
+def is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def validate_submission(settings, options):
+    """제출된 설정/옵션 → (정규화한 설정, 저장 옵션). 워커 수는 서비스가 정하므로 받지 않음.
+    잘못된 값은 ValueError"""
+    if options is not None and not isinstance(options, dict):
+        raise ValueError("options는 JSON 객체여야 합니다.")
+    try:
+        settings = pdf_engine.normalize_settings(settings)
+    except (TypeError, AttributeError) as e:
+        raise ValueError(f"설정 형식이 잘못되었습니다: {e}") from None
+    save_options = {k: v for k, v in (options or {}).items()
+                    if k in pdf_engine.DEFAULT_SAVE_OPTIONS and k != 'workers'}
+    pdf_engine.normalize_save_options(save_options)
+    return settings, save_options
+
+
+class JobService:
+    """작업 표 + 스케줄러 스레드. HTTP 스레드는 잠금 아래 작업 표만 읽고 쓰며,
+    JobRunner(작업 프로세스)는 스케줄러 스레드만 다룬다."""
+    def __init__(self, concurrency=None, timeout=None, work_dir=None):
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="pdf_server_")
+        self.timeout = timeout
+        self.concurrency = concurrency or pdf_batch.default_concurrency()
+        self.jobs = {}
+        self.pending = []              # 대기 중 작업 id (제출 순서)
+        self.cancel_requests = queue.Queue()
+        self.cond = threading.Condition()
+        self.stopping = False
+        # 작업마다 설정이 다르므로 실행기는 작업 단위로 만들지 않고 동시 실행 수만 공유
+        self.runners = {}
+        self.thread = threading.Thread(target=self._schedule, name="pdf-server-scheduler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    # --- HTTP 스레드에서 호출 ---
+    def submit(self, pdf_bytes, settings, options, name=None):
+        """작업 등록 → id. 설정/옵션이 잘못되면 파일을 만들기 전에 ValueError"""
+        settings, save_options = validate_submission(settings, options)
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = os.path.join(self.work_dir, job_id)
+        os.makedirs(job_dir)
+        try:
+            input_path = os.path.join(job_dir, "input.pdf")
+            with open(input_path, 'wb') as f:
+                f.write(pdf_bytes)
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        job = {
+            'id': job_id,
+            'name': name or "input.pdf",
+            'status': STATUS_QUEUED,
+            'input': input_path,
+            'output': os.path.join(job_dir, "output.pdf"),
+            'size': len(pdf_bytes),
+            'settings': settings,
+            'options': save_options,
+            'progress': [0, 0],
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'error': '',
+            'seq': 0,                  # 상태가 바뀔 때마다 증가 (이벤트 스트리밍용)
+        }
+        with self.cond:
+            self.jobs[job_id] = job
+            self.pending.append(job_id)
+            self.cond.notify_all()
+        return job_id
+
+    def cancel(self, job_id):
+        """대기 중이면 바로 취소, 처리 중이면 스케줄러에 종료 요청. 끝난 작업이면 파일 삭제"""
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] == STATUS_QUEUED:
+                self.pending.remove(job_id)
+                self._update(job, status=pdf_batch.STATUS_CANCELLED, finished=time.time(),
+                             error="취소됨")
+                return 'cancelled'
+            if job['status'] == STATUS_RUNNING:
+                self.cancel_requests.put(job_id)
+                return 'cancelling'
+            self._remove(job_id)
+            return 'deleted'
+
+    def snapshot(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def list_jobs(self):
+        with self.cond:
+            return [self._public(job) for job in self.jobs.values()]
+
+    def queue_info(self):
+        with self.cond:
+            running = sum(1 for job in self.jobs.values() if job['status'] == STATUS_RUNNING)
+            return {'queued': len(self.pending), 'running': running,
+                    'capacity': self.concurrency, 'jobs': len(self.jobs)}
+
+    def wait_change(self, job_id, seq, timeout):
+        """작업의 seq가 바뀌거나 timeout이 지날 때까지 대기 후 스냅샷 반환"""
+        with self.cond:
+            self.cond.wait_for(lambda: job_id not in self.jobs or self.jobs[job_id]['seq'] != seq,
+                               timeout=timeout)
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def wait_final(self, job_id, timeout):
+        deadline = time.time() + timeout
+        with self.cond:
+            self.cond.wait_for(lambda: job_id not in self.jobs
+                               or self.jobs[job_id]['status'] in FINAL_STATUSES,
+                               timeout=max(0, deadline - time.time()))
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        self.thread.join(5)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    # --- 내부 ---
+    def _public(self, job):
+        """외부에 보여 줄 작업 정보 (시간은 초 단위)"""
+        now = time.time()
+        started, finished = job['started'], job['finished']
+        info = {k: job[k] for k in ('id', 'name', 'status', 'progress', 'error', 'seq')}
+        info['timing'] = {
+            'queued_sec': round((started or finished or now) - job['created'], 3),
+            'run_sec': round((finished or now) - started, 3) if started else None,
+            'total_sec': round((finished or now) - job['created'], 3),
+        }
+        info['input_mb'] = round(job['size'] / (1024 * 1024), 3)
+        if job['status'] == pdf_batch.STATUS_OK:
+            info['output_mb'] = round(os.path.getsize(job['output']) / (1024 * 1024), 3)
+            info['result'] = f"/jobs/{job['id']}/result"
+        return info
+
+    def _update(self, job, **changes):
+        """잠금을 잡은 상태에서 호출"""
+        job.update(changes)
+        job['seq'] += 1
+        self.cond.notify_all()
+
+    def _remove(self, job_id):
+        self.jobs.pop(job_id, None)
+        shutil.rmtree(os.path.join(self.work_dir, job_id), ignore_errors=True)
+        self.cond.notify_all()
+
+    def _on_event(self, kind, job, data):
+        # 스케줄러 스레드 (JobRunner.poll 안)에서 호출
+        with self.cond:
+            record = self.jobs.get(job['id'])
+            if record is None:
+                return
+            if kind == 'progress':
+                self._update(record, progress=list(data))
+            elif kind == 'finish':
+                self._update(record, status=data['status'], finished=time.time(),
+                             error=data['error'])
+
+    def _runner_for(self, job):
+        """작업의 설정/옵션 조합별 실행기 (같은 조합이면 재사용)"""
+        key = json.dumps([job['settings'], job['options']], sort_keys=True)
+        runner = self.runners.get(key)
+        if runner is None:
+            runner = pdf_batch.JobRunner(job['settings'], job['options'], 1, self.timeout,
+                                         on_event=self._on_event)
+            self.runners[key] = runner
+        return runner
+
+    def _running_count(self):
+        return sum(len(r.running) for r in self.runners.values())
+
+    def _schedule(self):
+        try:
+            while True:
+                with self.cond:
+                    if self.stopping:
+                        break
+                    # 동시 실행 수 한도 안에서 대기 작업 시작
+                    started = []
+                    while self.pending and self._running_count() + len(started) < self.concurrency:
+                        job = self.jobs[self.pending.pop(0)]
+                        self._update(job, status=STATUS_RUNNING, started=time.time())
+                        started.append(job)
+                    self._expire()
+                for job in started:
+                    self._runner_for(job).submit({k: job[k] for k in ('id', 'input', 'output', 'size')})
+
+                while not self.cancel_requests.empty():
+                    job_id = self.cancel_requests.get()
+                    for runner in self.runners.values():
+                        runner.cancel(lambda j: j['id'] == job_id)
+
+                active = [r for r in self.runners.values() if r.running]
+                if not active:
+                    with self.cond:
+                        self.cond.wait(0.5)
+                    continue
+                for runner in active:
+                    runner.poll(0.1)
+                # 쓰지 않는 실행기 정리
+                self.runners = {k: r for k, r in self.runners.items() if r.running}
+        finally:
+            for runner in self.runners.values():
+                runner.shutdown()
+
+    def _expire(self):
+        """보관 시간이 지난 끝난 작업 삭제 (잠금을 잡은 상태에서 호출)"""
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job['status'] in FINAL_STATUSES and now - job['finished'] > RESULT_TTL:
+                self._remove(job_id)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = "PDFMarginEditor/1.8"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, fmt, *args):
+        print(f"HTTP: {self.address_string()} {fmt % args}")
+
+    def _check_client(self):
+        if not is_loopback(self.client_address[0]):
+            self._send_json(403, {'error': "localhost 전용 서비스입니다."})
+            return False
+        return True
+
+    def _send_json(self, code, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        return parts, parse_qs(url.query)
+
+    # --- GET ---
+    def do_GET(self):
+        if not self._check_client():
+            return
+        parts, query = self._route()
+        if parts == ['queue']:
+            return self._send_json(200, self.service.queue_info())
+        if parts == ['health']:
+            return self._send_json(200, {'status': 'ok'})
+        if parts == ['jobs']:
+            return self._send_json(200, {'jobs': self.service.list_jobs()})
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            job = self.service.snapshot(parts[1])
+            if job is None:
+                return self._send_json(404, {'error': "작업이 없습니다."})
+            if len(parts) == 2:
+                return self._send_json(200, job)
+            if parts[2:] == ['events']:
+                return self._stream_events(job)
+            if parts[2:] == ['result']:
+                return self._send_result(job, query)
+        self._send_json(404, {'error': "알 수 없는 경로입니다."})
+
+    def _stream_events(self, job):
+        """작업이 끝날 때까지 상태가 바뀔 때마다 한 줄씩(JSON) 전송 (chunked)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while job is not None:
+                line = (json.dumps(job, ensure_ascii=False) + "\n").encode('utf-8')
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+                if job['status'] in FINAL_STATUSES:
+                    break
+                job = self.service.wait_change(job['id'], job['seq'], timeout=15)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 먼저 끊음
+
+    def _send_result(self, job, query):
+        wait = float(query.get('wait', ['0'])[0] or 0)
+        if wait > 0 and job['status'] not in FINAL_STATUSES:
+            job = self.service.wait_final(job['id'], wait) or job
+        if job['status'] != pdf_batch.STATUS_OK:
+            code = 409 if job['status'] not in FINAL_STATUSES else 410
+            return self._send_json(code, {'error': "결과가 없습니다.", 'status': job['status'],
+                                          'detail': job['error']})
+        path = os.path.join(self.service.work_dir, job['id'], "output.pdf")
+        size = os.path.getsize(path)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(size))
+        name = os.path.splitext(job['name'])[0] + "_edited.pdf"
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(name)}")
+        self.end_headers()
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    # --- POST ---
+    def do_POST(self):
+        if not self._check_client():
+            return
+        parts, query = self._route()
+        if parts != ['jobs']:
+            return self._send_json(404, {'error': "알 수 없는 경로입니다."})
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            return self._send_json(413 if length else 411, {'error': "본문 크기가 올바르지 않습니다."})
+        body = self.rfile.read(length)
+        try:
+            pdf_bytes, settings, options, name = self._parse_submission(body, query)
+        except (ValueError, KeyError, OSError) as e:
+            return self._send_json(400, {'error': str(e)})
+        if not pdf_bytes.startswith(b"%PDF"):
+            return self._send_json(400, {'error': "PDF 파일이 아닙니다."})
+        try:
+            job_id = self.service.submit(pdf_bytes, settings, options, name)
+        except ValueError as e:
+            return self._send_json(400, {'error': str(e)})
+        self._send_json(202, {'id': job_id, 'status': STATUS_QUEUED,
+                              'status_url': f"/jobs/{job_id}",
+                              'events_url': f"/jobs/{job_id}/events",
+                              'result_url': f"/jobs/{job_id}/result"})
+
+    def _parse_submission(self, body, query):
+        """(PDF 바이트, 정규화한 설정, 저장 옵션, 이름). 설정은 last_settings 형식.
+        잘못된 설정/옵션은 작업 폴더를 만들기 전에 여기서 ValueError"""
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+        if content_type == 'application/json':
+            data = json.loads(body.decode('utf-8'))
+            if 'pdf_base64' not in data:
+                raise ValueError("pdf_base64가 필요합니다.")
+            pdf_bytes = base64.b64decode(data['pdf_base64'])
+            settings, options = data.get('settings'), data.get('options')
+            name = data.get('name') or "input.pdf"
+        else:
+            pdf_bytes = body
+            settings = json.loads(query['settings'][0]) if 'settings' in query else None
+            options = json.loads(query['options'][0]) if 'options' in query else None
+            name = query.get('name', ["input.pdf"])[0]
+        settings, options = validate_submission(settings, options)
+        return pdf_bytes, settings, options, name
+
+    # --- DELETE ---
+    def do_DELETE(self):
+        if not self._check_client():
+            return
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            return self._send_json(404, {'error': "알 수 없는 경로입니다."})
+        result = self.service.cancel(parts[1])
+        if result is None:
+            return self._send_json(404, {'error': "작업이 없습니다."})
+        self._send_json(200, {'id': parts[1], 'result': result})
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, concurrency=None, timeout=None):
+    """서비스 실행 (Ctrl+C까지). 루프백 주소가 아니면 ValueError"""
+    if not is_loopback(host):
+        raise ValueError(f"localhost 전용 서비스입니다: {host}")
+    service = JobService(concurrency, timeout)
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    service.start()
+    print(f"SERVER: http://{host}:{server.server_port} (동시 {service.concurrency}개, "
+          f"작업 폴더 {service.work_dir})", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.stop()
@@ -0,0 +1,244 @@
+"""분할 저장: 결과를 쪽수 또는 목표 용량(MB) 단위의 여러 PDF로 나눠 저장
+
+분할 지점은 저장 전에 페이지별 예상 용량으로 미리 정하고, 각 조각은 독립된 작업 프로세스
+(pdf_batch.JobRunner)가 원본에서 해당 쪽만 뽑아 동시에 저장한다.
+한 파일로 저장한 뒤 나누는 것보다 빠르고, 조각마다 필요한 리소스만 들어간다.
+"""
+import os
+import statistics
+import time
+import zlib
+
+import fitz  # PyMuPDF
+
+import pdf_analysis
+import pdf_batch
+import pdf_cache
+import pdf_encoders
+import pdf_engine
+import pdf_geometry
+import pdf_imaging
+import pdf_workers
+
+# 예상 용량이 목표의 이 비율을 넘지 않게 나눔 (추정 오차/조각별 공통 리소스 여유)
+SPLIT_SAFETY = 0.9
+# 압축 모드 용량 추정에 실제로 인코딩해 보는 샘플 페이지 수
+ESTIMATE_SAMPLES = 3
+# 페이지 객체/콘텐츠 외 구조(xref, 페이지 트리 등) 페이지당 대략의 크기
+PAGE_OVERHEAD_BYTES = 400
+
+
+def _stream_length(doc, xref):
+    """저장 후 스트림 크기. 압축되지 않은 스트림은 저장 시 deflate되므로 빠른 수준으로 압축해 본다"""
+    if doc.xref_get_key(xref, "Filter")[0] == 'null':
+        return len(zlib.compress(doc.xref_stream_raw(xref) or b'', 1))
+    kind, value = doc.xref_get_key(xref, "Length")
+    if kind == 'int':
+        return int(value)
+    return len(doc.xref_stream_raw(xref) or b'')  # 간접 참조 등
+
+
+def source_page_bytes(doc):
+    """무손실/텍스트 유지 저장의 페이지별 예상 용량: 원본 콘텐츠 + 이미지 스트림 길이.
+    여러 페이지가 공유하는 이미지는 처음 쓰는 페이지에 한 번만 계산한다."""
+    seen = set()
+    sizes = []
+    for page in doc:
+        total = PAGE_OVERHEAD_BYTES
+        for xref in page.get_contents():
+            total += _stream_length(doc, xref)
+        for img in page.get_images(full=True):
+            for xref in (img[0], img[1]):  # 이미지, soft mask
+                if xref and xref not in seen:
+                    seen.add(xref)
+                    total += _stream_length(doc, xref)
+        sizes.append(total)
+    return sizes
+
+
+def raster_page_bytes(doc, settings, quality, mrc=False, geometry=None):
+    """압축(이미지) 저장의 페이지별 예상 용량: 샘플 페이지를 실제 인코딩해 구한
+    픽셀당 바이트 × 각 페이지의 보이는 영역 픽셀 수"""
+    encoder = settings['encoder']
+    zoom = pdf_engine.COMPRESS_DPI / 72.0
+    geometry = geometry if geometry is not None else pdf_geometry.build_geometry(doc)
+    margins = pdf_geometry.page_margins(geometry.bounds, settings).tolist()
+    layouts = [pdf_engine.compressed_page_layout(rect, *m)
+               for rect, m in zip(geometry.rects(), margins)]
+    per_pixel = []
+    for i in pdf_imaging.sample_page_indices(len(doc), ESTIMATE_SAMPLES):
+        place_rect, clip = layouts[i][2], layouts[i][3]
+        if place_rect is None:
+            continue
+        pix = doc[i].get_pixmap(matrix=fitz.Matrix(zoom, zoom),
+                                clip=fitz.Rect(clip) if clip else None)
+        arr = pdf_imaging.pixmap_to_array(pix)
+        pdf_imaging.clean_background(arr, settings['cleanup'])
+        if mrc:
+            encoded = pdf_workers.encode_mrc(arr, quality, encoder)
+        else:
+            encoded = {'kind': 'image', 'image': pdf_encoders.encode(arr, quality, encoder)}
+        per_pixel.append(pdf_imaging.encoded_size(encoded) / (pix.width * pix.height))
+    bpp = statistics.median(per_pixel) if per_pixel else 0
+    sizes = []
+    for layout in layouts:
+        place_rect = layout[2]
+        pixels = place_rect.width * place_rect.height * zoom * zoom if place_rect else 0
+        sizes.append(int(PAGE_OVERHEAD_BYTES + pixels * bpp))
+    return sizes
+
+
+def estimate_page_bytes(doc, settings, options=None, geometry=None):
+    """저장 옵션에 따른 페이지별 예상 출력 용량 (바이트 목록). geometry: doc의 페이지 기하 표"""
+    settings = pdf_engine.normalize_settings(settings)
+    opts = dict(pdf_engine.DEFAULT_SAVE_OPTIONS)
+    opts.update(options or {})
+    compression = int(opts['compression'])
+    if compression > 0 and not opts['preserve']:
+        # 자동 화질은 저장할 때 정해지므로 압축 수준의 기본 품질로 추정
+        return raster_page_bytes(doc, settings, pdf_engine.compression_to_quality(compression),
+                                 mrc=bool(opts['mrc']), geometry=geometry)
+    # 무손실/텍스트 유지: 원본 스트림 크기 (재압축으로 줄어드는 만큼은 여유로 둠)
+    return source_page_bytes(doc)
+
+
+def plan_chunks(page_bytes, max_pages=None, max_mb=None):
+    """분할 범위 [(시작, 끝)) 목록. 쪽수/용량 한도 중 먼저 닿는 쪽에서 나누며 조각마다 최소 1쪽"""
+    limit = max_mb * 1024 * 1024 * SPLIT_SAFETY if max_mb else None
+    chunks = []
+    start, size = 0, 0
+    for i, b in enumerate(page_bytes):
+        count = i - start
+        if count and ((max_pages and count >= max_pages) or (limit and size + b > limit)):
+            chunks.append((start, i))
+            start, size = i, 0
+        size += b
+    if start < len(page_bytes):
+        chunks.append((start, len(page_bytes)))
+    return chunks
+
+
+def chunk_paths(path, count):
+    """출력 경로 → 조각 경로 목록 (책.pdf → 책_01.pdf, 책_02.pdf, ...)"""
+    base, ext = os.path.splitext(path)
+    width = max(2, len(str(count)))
+    return [f"{base}_{n + 1:0{width}d}{ext or '.pdf'}" for n in range(count)]
+
+
+def save_chunk(job, settings, options, progress=None):
+    """작업 프로세스에서 호출: 원본의 job['pages'] 범위만 뽑아 임시 파일로 만든 뒤 저장 엔진 실행.
+    압축 저장은 원본 파일을 다시 여는 구조라 뽑은 쪽을 파일로 둔다."""
+    start, stop = job['pages']
+    src_path = job['output'] + ".src.part"
+    analysis = None
+    if pdf_engine.needs_analysis(options):
+        # 뽑은 임시 파일이 아니라 원본의 분석 색인(split_document가 미리 만듦)에서 해당 쪽만
+        table = pdf_analysis.get_analysis(job['input'], pdf_engine.cache_dir_path(),
+                                          job.get('fingerprint'))
+        analysis = {key: values[start:stop] for key, values in table.items()}
+    try:
+        with fitz.open(job['input']) as doc, fitz.open() as part:
+            part.insert_pdf(doc, from_page=start, to_page=stop - 1)
+            part.save(src_path)
+        with fitz.open(src_path) as part:
+            # 홀/짝 여백과 보고서 쪽 번호는 원본 전체에서의 쪽 번호 기준
+            return pdf_engine.save_document(part, job['output'], settings, options,
+                                            progress=progress, page_offset=start, analysis=analysis,
+                                            duplicates=job.get('duplicates'), page_base=start)
+    finally:
+        if os.path.exists(src_path):
+            os.remove(src_path)
+
+
+def split_document(input_path, path, settings, options=None, max_pages=None, max_mb=None,
+                   concurrency=None, timeout=None, progress=None, status=None, geometry=None):
+    """input_path를 분할 저장하고 보고서(dict) 반환. 조각 하나라도 실패하면 만든 조각을 지우고
+    RuntimeError. progress(done, total): 전체 쪽수 기준 진행률
+    geometry: 원본의 페이지 기하 표 (GUI에서 열 때 만든 것, 없으면 여기서 만듦)"""
+    progress = progress or (lambda done, total: None)
+    status = status or (lambda text: None)
+    if not max_pages and not max_mb:
+        raise ValueError("분할 기준(쪽수 또는 MB)이 없습니다.")
+    settings = pdf_engine.normalize_settings(settings)
+
+    status("분할 지점 계산 중...")
+    t0 = time.perf_counter()
+    with fitz.open(input_path) as doc:
+        geometry = geometry if geometry is not None else pdf_geometry.build_geometry(doc)
+        page_bytes = estimate_page_bytes(doc, settings, options, geometry=geometry)
+    duplicates = fingerprint = None
+    if pdf_engine.needs_analysis(options):
+        # 조각 프로세스마다 같은 문서를 분석하지 않도록 색인을 먼저 만들어 둠 (지문도 조각에 넘김)
+        status("페이지 분석 중...")
+        fingerprint = pdf_cache.file_fingerprint(input_path)
+        analysis = pdf_analysis.get_analysis(input_path, pdf_engine.cache_dir_path(), fingerprint,
+                                             geometry=geometry)
+        if (options or {}).get('blank_pages') in ('minimal', 'drop'):
+            # 흰 페이지로 바꾸거나 빼는 빈 페이지는 용량 추정에서 제외
+            for i in pdf_analysis.blank_pages(analysis):
+                page_bytes[i] = PAGE_OVERHEAD_BYTES
+        if (options or {}).get('duplicate_pages', 'keep') != 'keep':
+            # 조각 경계에 걸친 쌍도 찾도록 중복은 원본 전체에서 한 번 구해 조각에 나눠 줌
+            duplicates = pdf_analysis.duplicate_pages(analysis)
+        if (options or {}).get('duplicate_pages') == 'drop':
+            for i in pdf_analysis.duplicate_drops(duplicates):
+                page_bytes[i] = 0
+    status(None)
+    chunks = plan_chunks(page_bytes, max_pages, max_mb)
+    paths = chunk_paths(path, len(chunks))
+    total_pages = len(page_bytes)
+    plan_seconds = round(time.perf_counter() - t0, 3)
+
+    jobs = [{'input': input_path, 'output': out, 'size': sum(page_bytes[a:b]), 'pages': (a, b),
+             'index': n, 'fingerprint': fingerprint}
+            for n, (out, (a, b)) in enumerate(zip(paths, chunks))]
+    if duplicates is not None:
+        # 원본 번호 그대로, 뒤 쪽이 조각 끝 전인 쌍 (이전 조각의 쌍은 연쇄 중복의 처음 쪽을 찾는 데 씀)
+        for job in jobs:
+            job['duplicates'] = [pair for pair in duplicates if pair[1] < job['pages'][1]]
+    done_pages = [0] * len(jobs)
+
+    def on_event(kind, job, data):
+        if kind == 'progress':
+            done_pages[job['index']] = data[0]
+        elif kind == 'finish' and data['status'] == pdf_batch.STATUS_OK:
+            done_pages[job['index']] = job['pages'][1] - job['pages'][0]
+        else:
+            return
+        progress(sum(done_pages), total_pages)
+
+    concurrency = min(len(jobs), concurrency or pdf_batch.default_concurrency())
+    results = pdf_batch.run_batch(sorted(jobs, key=lambda j: j['size'], reverse=True), settings,
+                                  options, concurrency=concurrency, timeout=timeout,
+                                  on_event=on_event)
+    failed = [r for r in results if r['status'] != pdf_batch.STATUS_OK]
+    if failed:
+        for out in paths:
+            if os.path.exists(out):
+                os.remove(out)
+        raise RuntimeError(f"{os.path.basename(failed[0]['output'])}: {failed[0]['error']}")
+
+    by_output = {r['output']: r for r in results}
+    report = {'source': input_path, 'output': path, 'total_pages': total_pages, 'chunks': [],
+              'estimated_mb': round(sum(page_bytes) / (1024 * 1024), 3),
+              'plan_seconds': plan_seconds}
+    for job in jobs:
+        a, b = job['pages']
+        out_bytes = os.path.getsize(job['output'])
+        report['chunks'].append({
+            'path': job['output'], 'first_page': a + 1, 'last_page': b,
+            'estimated_mb': round(job['size'] / (1024 * 1024), 3),
+            'saved_mb': round(out_bytes / (1024 * 1024), 3),
+            'seconds': by_output[job['output']]['seconds'],
+        })
+    report['saved_mb'] = round(sum(c['saved_mb'] for c in report['chunks']), 3)
+    return report
+
+
+def summarize_split(report):
+    lines = [f"분할 저장: {len(report['chunks'])}개 파일, {report['total_pages']} 페이지, "
+             f"합계 {report['saved_mb']:.2f} MB"]
+    for c in report['chunks']:
+        lines.append(f"  {os.path.basename(c['path'])}: {c['first_page']}-{c['last_page']}쪽, "
+                     f"{c['saved_mb']:.2f} MB (예상 {c['estimated_mb']:.2f} MB)")
+    return "\n".join(lines)
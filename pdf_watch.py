@@ -0,0 +1,157 @@
+"""감시 폴더(hot folder): 스캐너가 넣는 PDF를 계속 감지해 프리셋으로 자동 처리
+
+- 크기/수정 시각이 일정 시간 변하지 않은 파일만 처리 (복사 중인 파일을 읽지 않음)
+- 작업 프로세스 수 제한(pdf_batch.JobRunner), 출력은 임시 파일 → 교체로 원자적 기록
+- 처리 기록(ledger)을 출력 폴더에 남겨 재시작해도 같은 파일을 다시 처리하지 않음
+- 대기열 길이/처리량 지표를 주기적으로 출력하고 JSON으로 기록
+"""
+import json
+import os
+import time
+from collections import deque
+
+import pdf_batch
+
+LEDGER_NAME = ".pdf_watch_ledger.jsonl"
+METRICS_NAME = "watch_metrics.json"
+
+# 폴더 검사 주기 (초)
+DEFAULT_INTERVAL = 2.0
+# 크기/수정 시각이 이 시간 동안 그대로여야 다 쓰인 파일로 본다 (초)
+DEFAULT_SETTLE = 5.0
+# 처리량 계산 구간 (초)
+THROUGHPUT_WINDOW = 300
+
+
+def file_key(rel_path, stat):
+    """처리 기록 키: 상대 경로 + 크기 + 수정 시각 (같은 이름으로 새 파일이 오면 다시 처리)"""
+    return f"{rel_path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class FolderWatcher:
+    """입력 폴더를 주기적으로 검사해 다 쓰인 새 PDF를 작업 실행기에 넘김"""
+    def __init__(self, input_dir, output_dir, settings, options=None, concurrency=None,
+                 timeout=None, interval=DEFAULT_INTERVAL, settle=DEFAULT_SETTLE,
+                 metrics_interval=60, retry_failed=False, log=print):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self.settle = settle
+        self.metrics_interval = metrics_interval
+        self.log = log
+        os.makedirs(output_dir, exist_ok=True)
+        self.ledger = pdf_batch.Ledger(os.path.join(output_dir, LEDGER_NAME), retry_failed)
+        self.runner = pdf_batch.JobRunner(settings, options, concurrency, timeout)
+
+        self.seen = {}         # 상대 경로 → (크기, 수정 시각, 처음 그 상태로 본 시각)
+        self.queue = deque()   # 처리 대기 (작업, 기록 키)
+        self.queued = set()    # 대기/처리 중인 기록 키
+        self.running_keys = {} # 처리 중 입력 경로 → 기록 키
+        self.done = deque()    # 처리량 계산용 (완료 시각, 쪽수)
+        self.totals = {'ok': 0, 'failed': 0, 'pages': 0}
+        self.started = time.time()
+
+    def scan(self):
+        """입력 폴더에서 크기가 안정된 미처리 PDF를 대기열에 추가"""
+        now = time.time()
+        present = set()
+        out_root = os.path.abspath(self.output_dir) + os.sep
+        for path, rel in pdf_batch.collect_pdfs([self.input_dir]):
+            if os.path.abspath(path).startswith(out_root):
+                continue  # 출력 폴더가 입력 폴더 안에 있는 경우
+            present.add(rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # 검사 도중 삭제/이동됨
+            key = file_key(rel, st)
+            if key in self.ledger or key in self.queued:
+                continue
+            state = (st.st_size, st.st_mtime_ns)
+            prev = self.seen.get(rel)
+            if prev is None or prev[:2] != state:
+                self.seen[rel] = state + (now,)
+                continue
+            if now - prev[2] < self.settle or st.st_size == 0:
+                continue
+            self.queue.append(({'input': path, 'output': os.path.join(self.output_dir, rel),
+                                'size': st.st_size}, key))
+            self.queued.add(key)
+        # 사라진 파일의 상태 정보는 정리
+        for rel in list(self.seen):
+            if rel not in present:
+                del self.seen[rel]
+
+    def dispatch(self):
+        while self.queue and self.runner.has_capacity():
+            job, key = self.queue.popleft()
+            self.running_keys[job['input']] = key
+            self.runner.submit(job)
+            self.log(f"WATCH: start {job['input']}")
+
+    def collect(self):
+        """끝난 작업을 처리 기록에 남기고 합계 갱신 (처리 중 작업이 없으면 검사 주기만큼 대기)"""
+        for result in self.runner.poll(0.5 if self.runner.running else self.interval):
+            key = self.running_keys.pop(result['file'])
+            self.queued.discard(key)
+            self.ledger.record(key, result)
+            if result['status'] == pdf_batch.STATUS_OK:
+                self.totals['ok'] += 1
+                self.totals['pages'] += result['pages']
+                self.done.append((time.time(), result['pages']))
+            else:
+                self.totals['failed'] += 1
+            self.log(f"WATCH: [{result['status']}] {result['file']} ({result['seconds']}초)"
+                     + (f" - {result['error']}" if result['error'] else ""))
+
+    def metrics(self):
+        """현재 지표: 대기열 길이, 처리 중, 최근 구간 처리량, 누적 합계"""
+        now = time.time()
+        while self.done and now - self.done[0][0] > THROUGHPUT_WINDOW:
+            self.done.popleft()
+        window = min(THROUGHPUT_WINDOW, max(1.0, now - self.started))
+        recent_files = len(self.done)
+        recent_pages = sum(pages for _, pages in self.done)
+        return {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'queue_depth': len(self.queue),
+            'running': len(self.runner.running),
+            'files_per_min': round(recent_files * 60 / window, 2),
+            'pages_per_sec': round(recent_pages / window, 2),
+            'processed': self.totals['ok'],
+            'failed': self.totals['failed'],
+            'pages': self.totals['pages'],
+            'uptime_sec': int(now - self.started),
+        }
+
+    def write_metrics(self, metrics):
+        path = os.path.join(self.output_dir, METRICS_NAME)
+        tmp = path + ".part"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def run(self, stop=None):
+        """stop()이 True를 돌려줄 때까지(또는 Ctrl+C) 감시. 중단 시 처리 중 작업은 종료되며
+        처리 기록에 남지 않으므로 다음 실행 때 다시 처리된다."""
+        self.log(f"WATCH: {self.input_dir} → {self.output_dir} "
+                 f"(동시 {self.runner.concurrency}개, 안정화 {self.settle:g}초, "
+                 f"기록 {len(self.ledger.entries)}개)")
+        last_metrics = last_scan = 0
+        try:
+            while not (stop and stop()):
+                if time.time() - last_scan >= self.interval:
+                    self.scan()
+                    last_scan = time.time()
+                self.dispatch()
+                self.collect()
+                if self.metrics_interval and time.time() - last_metrics >= self.metrics_interval:
+                    metrics = self.metrics()
+                    self.write_metrics(metrics)
+                    self.log(f"WATCH: 대기 {metrics['queue_depth']}, 처리 중 {metrics['running']}, "
+                             f"{metrics['files_per_min']} 파일/분, {metrics['pages_per_sec']} 페이지/초, "
+                             f"누적 {metrics['processed']}개 (실패 {metrics['failed']})")
+                    last_metrics = time.time()
+        finally:
+            self.runner.shutdown()
+            self.write_metrics(self.metrics())
@@ -0,0 +1,163 @@
+"""압축 저장용 병렬 워커 풀: 각 프로세스가 원본 PDF를 한 번 열어 두고 페이지를 렌더/인코딩"""
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import pdf_encoders
+import pdf_imaging
+
+# 프로세스마다 한 번 열어 재사용하는 원본 문서 (PyMuPDF 객체는 프로세스 간 전달 불가)
+_worker_doc = None
+
+# MRC 전경 색상 계층은 매끄러운 색 면이라 배경보다 낮은 품질로도 충분
+MRC_FG_QUALITY_DROP = 20
+# 배경 정리로 줄어든 용량은 정리 전/후의 가로 띠(CLEANUP_BAND px)를 CLEANUP_BAND_STEP개마다 하나씩만
+# 인코딩해 비율로 추정 (전체를 한 번 더 인코딩하지 않음. 축소본은 잡음 결이 사라져 과소평가됨)
+CLEANUP_BAND = 64
+CLEANUP_BAND_STEP = 4
+
+
+def _init_worker(path):
+    global _worker_doc
+    _worker_doc = fitz.open(path)
+
+
+def default_worker_count():
+    """UI 프로세스 몫 1코어를 남기고 최대 8개"""
+    return max(1, min((os.cpu_count() or 2) - 1, 8))
+
+
+def open_pool(path, workers=None):
+    """원본 PDF 경로를 각 워커에 미리 열어 둔 프로세스 풀 생성.
+
+    workers=1이면 풀 없이 현재 프로세스에서 인코딩하도록 None 반환
+    (일괄 처리처럼 이미 파일마다 별도 프로세스로 돌 때 프로세스를 중첩하지 않기 위해)
+    """
+    if workers == 1:
+        _init_worker(path)
+        return None
+    return ProcessPoolExecutor(max_workers=workers or default_worker_count(),
+                               initializer=_init_worker, initargs=(path,))
+
+
+def open_measure_pool(path):
+    """미리보기 화질 측정용 단일 워커 풀 (렌더/인코딩/SSIM을 UI 프로세스 밖에서 수행)"""
+    return ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(path,))
+
+
+def measure_page(index, options):
+    """한 페이지를 저장 조건대로 인코딩해 SSIM/PSNR 점수만 반환 (인코딩 결과는 돌려보내지 않음)"""
+    return encode_page(index, dict(options, measure=True))['score']
+
+
+def encode_mrc(arr, quality, encoder=None):
+    """렌더 배열을 MRC 3계층으로 분할/인코딩 (배경·전경은 선택 인코더 + 1비트 Flate 마스크)"""
+    mask, background, foreground = pdf_imaging.segment_mrc(arr)
+    fg_quality = max(20, quality - MRC_FG_QUALITY_DROP)
+    return {
+        'kind': 'mrc',
+        'bg': pdf_encoders.encode(background, quality, encoder),
+        'fg': pdf_encoders.encode(foreground, fg_quality, encoder),
+        'mask': zlib.compress(pdf_imaging.pack_mask(mask), 9),
+        'mask_size': (mask.shape[1], mask.shape[0]),
+        'text_ratio': float(mask.mean()),
+    }
+
+
+def _measure_mrc(arr, encoded):
+    """MRC 결과를 디코딩·합성해 원본 렌더와 비교"""
+    mw, mh = encoded['mask_size']
+    bits = np.frombuffer(zlib.decompress(encoded['mask']), dtype=np.uint8)
+    mask = np.unpackbits(bits.reshape(mh, -1), axis=1)[:, :mw].astype(bool)
+    composed = pdf_imaging.compose_mrc(mask, pdf_encoders.decode(encoded['bg']),
+                                       pdf_encoders.decode(encoded['fg']))
+    return pdf_imaging.compare_to_reference(pdf_imaging.prepare_reference(arr), composed)
+
+
+def _measure_bands(arr, band=CLEANUP_BAND, step=CLEANUP_BAND_STEP):
+    """용량 비교용 표본: 원본 해상도 가로 띠를 step개마다 하나씩 이어 붙인 배열 (복사본)"""
+    h = arr.shape[0] - arr.shape[0] % (step * band)
+    if h == 0:
+        return arr.copy()
+    return arr[:h].reshape(-1, step, band, *arr.shape[1:])[:, 0].reshape(-1, *arr.shape[1:])
+
+
+def encode_page(index, options, clip=None):
+    """워커에서 한 페이지를 렌더링하고 인코딩.
+
+    options: dpi, quality, mode('image' | 'mrc'), encoder(pdf_encoders 설정),
+             measure(SSIM/PSNR 측정 여부), cleanup(배경 정리 설정, pdf_imaging.normalize_cleanup)
+    clip: (x0, y0, x1, y1) 가시 좌표 - 음수 여백으로 잘려 나갈 영역은 렌더링하지 않음
+    """
+    page = _worker_doc[index]
+    zoom = options['dpi'] / 72.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom),
+                          clip=fitz.Rect(clip) if clip else None)
+    arr = pdf_imaging.pixmap_to_array(pix)
+    quality = options['quality']
+    encoder = options.get('encoder')
+    cleaned = None
+    if options.get('cleanup'):
+        # 렌더 버퍼(pix.samples)를 복사 없이 그대로 정리. 용량 비교용 띠 표본만 정리 전/후로 떠 둠
+        before = _measure_bands(arr)
+        cleaned = pdf_imaging.clean_background(arr, options['cleanup'])
+        after = _measure_bands(arr)
+
+    if options.get('mode') == 'mrc':
+        encoded = encode_mrc(arr, quality, encoder)
+        if options.get('measure'):
+            encoded['score'] = _measure_mrc(arr, encoded)
+    else:
+        encoded = {'kind': 'image', 'image': pdf_encoders.encode(arr, quality, encoder)}
+        if options.get('measure'):
+            encoded['score'] = pdf_imaging.compare_to_reference(
+                pdf_imaging.prepare_reference(arr), pdf_encoders.decode(encoded['image']))
+    if cleaned is not None:
+        # 표본도 페이지와 같은 방식(이미지 / MRC)으로 인코딩해 비교
+        if options.get('mode') == 'mrc':
+            sizes = [pdf_imaging.encoded_size(encode_mrc(a, quality, encoder)) for a in (before, after)]
+        else:
+            sizes = [len(pdf_encoders.encode(a, quality, encoder)['data']) for a in (before, after)]
+        ratio = sizes[0] / max(1, sizes[1])
+        cleaned['bytes_before'] = int(pdf_imaging.encoded_size(encoded) * ratio)
+        encoded['cleanup'] = cleaned
+    encoded['index'] = index
+    if clip:
+        # 정수 픽셀로 반올림된 실제 렌더 영역 (가시 좌표) - 배치 시 이 영역에 정확히 맞춤
+        encoded['render_rect'] = tuple(v / zoom for v in pix.irect)
+    return encoded
+
+
+def map_pages(pool, indices, options, clips=None, window=None):
+    """페이지 인코딩을 풀에 나눠 맡기고 결과를 페이지 순서대로 돌려주는 제너레이터.
+
+    pool이 None이면 현재 프로세스에서 직접 인코딩한다.
+    clips: {페이지 번호: clip} - 없는 페이지는 전체 렌더링
+    동시에 처리 중인 작업 수를 window로 제한해 결과가 메모리에 쌓이지 않게 한다.
+    """
+    clips = clips or {}
+    if pool is None:
+        # 풀 없이 현재 프로세스에서 순서대로 처리 (open_pool(workers=1))
+        for index in indices:
+            yield encode_page(index, options, clips.get(index))
+        return
+    window = window or default_worker_count() * 3
+    pending = deque()
+    it = iter(indices)
+
+    def submit(index):
+        pending.append(pool.submit(encode_page, index, options, clips.get(index)))
+
+    for index in it:
+        submit(index)
+        if len(pending) >= window:
+            break
+    while pending:
+        yield pending.popleft().result()
+        nxt = next(it, None)
+        if nxt is not None:
+            submit(nxt)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈이 패키지가 아니라 저장소 최상위 파일이므로 테스트에서 바로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
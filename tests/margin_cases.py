@@ -0,0 +1,29 @@
+"""여백 규칙/개별 여백/목표 크기 테스트가 같이 쓰는 설정 생성 도우미"""
+import pdf_engine
+
+MM = pdf_engine.MM_TO_PT
+A5 = (0.0, 0.0, 420.0, 595.0)
+
+
+def margins(left, right=None, top=None, bottom=None):
+    right = left if right is None else right
+    return {'left': left, 'right': right, 'top': left if top is None else top,
+            'bottom': left if bottom is None else bottom}
+
+
+def rule(pages, value, parity='all', priority=0, name=''):
+    return dict(margins(value), pages=pages, parity=parity, priority=priority, name=name)
+
+
+def settings(rules=(), overrides=None, page_size=None):
+    s = pdf_engine.default_settings()
+    s['odd'], s['even'] = margins(1.0), margins(2.0)
+    s['rules'] = list(rules)
+    s['overrides'] = overrides or {}
+    if page_size:
+        s['page_size'] = page_size
+    return pdf_engine.normalize_settings(s)
+
+
+def left_mm(rules, page_index):
+    return round(rules.margins_pt(page_index)[0] / MM, 6)
@@ -0,0 +1,25 @@
+import os
+
+import pdf_batch
+import pdf_cache
+
+
+def test_fingerprint_sees_same_size_edit_in_middle(tmp_path):
+    path = tmp_path / "a.pdf"
+    data = bytearray(os.urandom(3 * 1024 * 1024))
+    path.write_bytes(data)
+    before = pdf_cache.file_fingerprint(str(path))
+    assert before == pdf_batch.content_hash(str(path))
+
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(data)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert pdf_cache.file_fingerprint(str(path)) != before
+
+
+def test_fingerprint_ignores_path(tmp_path):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    a.write_bytes(b"%PDF-1.7 same")
+    b.write_bytes(b"%PDF-1.7 same")
+    assert pdf_cache.file_fingerprint(str(a)) == pdf_cache.file_fingerprint(str(b))
@@ -0,0 +1,62 @@
+import numpy as np
+
+import pdf_imaging
+
+
+def yellowed_page(seed=0, shape=(400, 300)):
+    """누런 종이(채널마다 다른 밝기 + 잡음)에 어두운 글자 줄이 있는 RGB 페이지"""
+    rng = np.random.default_rng(seed)
+    paper = np.array([225, 215, 180], np.float32)
+    img = paper + rng.normal(0, 4, shape + (3,))
+    for y in range(20, shape[0] - 20, 16):
+        img[y:y + 4, 30:shape[1] - 30] = 30
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def test_level_luts_stretch_paper_to_white():
+    page = yellowed_page()
+    luts = pdf_imaging.level_luts(page)
+    assert len(luts) == 3
+    for c, paper in enumerate((225, 215, 180)):
+        lut = luts[c]
+        assert lut.dtype == np.uint8
+        assert np.all(np.diff(lut.astype(int)) >= 0)
+        assert lut[paper] == 255
+        assert lut[30] == 0
+        assert lut[0] == 0 and lut[255] == 255
+
+
+def test_level_luts_skip_pages_without_paper():
+    # 사진처럼 밝은 종이 바탕이 없는 쪽
+    photo = np.random.default_rng(0).integers(0, 256, (200, 200, 3), dtype=np.uint8)
+    assert pdf_imaging.level_luts(photo) is None
+    # 어두운 종이라 흰색/검정 기준 간격이 LEVELS_MIN_RANGE보다 좁은 쪽
+    dark = np.full((200, 200, 3), 140, np.uint8)
+    dark[50:60] = 120
+    assert pdf_imaging.level_luts(dark) is None
+
+
+def test_whiten_background_in_place():
+    page = yellowed_page()
+    assert pdf_imaging.whiten_background(page)
+    assert np.mean(page[5:15] == 255) > 0.5
+    assert page[20:24, 30:-30].max() == 0
+
+
+def test_despeckle_removes_isolated_dots_only():
+    page = np.full((50, 50, 3), 255, np.uint8)
+    page[10, 10] = 0            # 외딴 점
+    page[30:32, 30] = 0         # 2픽셀짜리 획
+    assert pdf_imaging.despeckle(page) == 1
+    assert page[10, 10].min() == 255
+    assert page[30:32, 30].max() == 0
+
+
+def test_clean_background_respects_settings():
+    page = yellowed_page()
+    before = page.copy()
+    off = pdf_imaging.normalize_cleanup({})
+    assert pdf_imaging.clean_background(page, off) is None
+    assert np.array_equal(page, before)
+    result = pdf_imaging.clean_background(page, pdf_imaging.normalize_cleanup({'whiten': 1}))
+    assert result == {'whitened': True, 'speckles': 0}
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+import pdf_cli
+
+
+def test_parser_does_not_load_engine():
+    # --help가 빠르도록 인자 정의에서 fitz/numpy를 가져오지 않아야 함 (새 인터프리터에서 확인)
+    code = ("import sys, pdf_cli; pdf_cli.build_parser(); "
+            "print('fitz' in sys.modules or 'numpy' in sys.modules)")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=os.path.dirname(pdf_cli.__file__), check=True)
+    assert out.stdout.strip() == 'False'
+
+
+def test_unknown_encoder_fails_in_handler(capsys):
+    assert pdf_cli.main(['process', 'missing.pdf', '--encoder', 'bogus']) == pdf_cli.EXIT_FAILED
+    assert "bogus" in capsys.readouterr().err
@@ -0,0 +1,94 @@
+import os
+
+import pdf_batch
+import pdf_engine
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def finish(ledger, job):
+    """작업이 성공한 것처럼 출력 파일을 만들고 기록"""
+    write(job['output'], b"%PDF-out " + job['input'].encode())
+    result = pdf_batch._result(job, pdf_batch.STATUS_OK, 0.0, pages=3)
+    pdf_batch.record_result(ledger, job, result)
+
+
+def plan(src, out, settings=None, options=None, **kwargs):
+    jobs = pdf_batch.plan_jobs([str(src)], str(out))
+    return pdf_batch.plan_resume(jobs, str(out), settings or pdf_engine.default_settings(),
+                                 options, **kwargs)
+
+
+def setup_inputs(tmp_path):
+    src, out = tmp_path / "in", tmp_path / "out"
+    write(str(src / "a.pdf"), b"%PDF-a")
+    write(str(src / "sub" / "b.pdf"), b"%PDF-bb")
+    os.makedirs(out)
+    return src, out
+
+
+def test_resume_skips_finished_files(tmp_path):
+    src, out = setup_inputs(tmp_path)
+    ledger, todo, skipped = plan(src, out)
+    assert len(todo) == 2 and not skipped
+    finished = todo[0]['input']
+    finish(ledger, todo[0])
+
+    _, todo, skipped = plan(src, out)
+    assert [s['file'] for s in skipped] == [finished]
+    assert [j['input'] for j in todo] != [finished] and len(todo) == 1
+    assert skipped[0]['status'] == pdf_batch.STATUS_SKIPPED
+    assert skipped[0]['pages'] == 3
+
+
+def test_key_covers_content_settings_and_output(tmp_path):
+    src, out = setup_inputs(tmp_path)
+    ledger, todo, _ = plan(src, out)
+    for job in todo:
+        finish(ledger, job)
+    keys = {j['input']: j['key'] for j in todo}
+    digest, signature, version, rel = keys[str(src / "sub" / "b.pdf")].split('|')
+    assert digest == pdf_batch.content_hash(str(src / "sub" / "b.pdf"))
+    assert signature == pdf_engine.settings_signature(pdf_engine.default_settings())
+    assert version == str(pdf_engine.ENGINE_VERSION)
+    assert rel == "sub/b.pdf"
+
+    # 결과와 무관한 워커 수는 키에 들어가지 않음
+    _, todo, _ = plan(src, out, options={'workers': 3})
+    assert not todo
+    # 출력에 영향을 주는 옵션/설정이 바뀌면 다시 처리
+    _, todo, _ = plan(src, out, options={'compression': 30})
+    assert len(todo) == 2
+    changed = pdf_engine.default_settings()
+    changed['odd']['left'] = 5.0
+    _, todo, _ = plan(src, out, settings=changed)
+    assert len(todo) == 2
+
+
+def test_changed_input_or_output_is_reprocessed(tmp_path):
+    src, out = setup_inputs(tmp_path)
+    ledger, todo, _ = plan(src, out)
+    for job in todo:
+        finish(ledger, job)
+
+    write(str(src / "a.pdf"), b"%PDF-a changed")
+    os.remove(str(out / "sub" / "b.pdf"))
+    _, todo, skipped = plan(src, out)
+    assert sorted(os.path.basename(j['input']) for j in todo) == ["a.pdf", "b.pdf"]
+    assert not skipped
+
+
+def test_force_and_retry(tmp_path):
+    src, out = setup_inputs(tmp_path)
+    ledger, todo, _ = plan(src, out)
+    for job in todo:
+        finish(ledger, job)
+    _, todo, skipped = plan(src, out, force=True)
+    assert len(todo) == 2 and not skipped
+    # 기록 파일은 다시 읽어도 같은 키
+    reloaded = pdf_batch.Ledger(os.path.join(str(out), pdf_batch.BATCH_LEDGER_NAME))
+    assert all(j['key'] in reloaded for j in todo)
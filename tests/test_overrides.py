@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+import pdf_rules
+from margin_cases import MM, left_mm, margins, rule, settings
+
+
+def test_margins_array_matches_per_page_lookup():
+    rules = pdf_rules.MarginRules(settings(
+        [rule("2-5, 9", 7.0), rule("4-", 3.0, parity='odd', priority=1)],
+        overrides={"6": margins(9.0)}))
+    for first in (0, 3):
+        table = rules.margins_array(first, 12)
+        assert np.allclose(table, [rules.margins_pt(i) for i in range(first, first + 12)])
+    without = rules.margins_array(0, 12, overrides=False)
+    assert without[5, 0] / MM != pytest.approx(9.0)
+
+
+def test_override_beats_rules():
+    rules = pdf_rules.MarginRules(settings([rule("1-", 5.0)], overrides={"3": margins(0.5)}))
+    assert [left_mm(rules, i) for i in range(4)] == [5.0, 5.0, 0.5, 5.0]
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import pdf_geometry
+from margin_cases import A5, MM, margins, settings
+
+
+def test_fit_margins_center():
+    bounds = np.array([A5, A5])
+    base = np.zeros((2, 4))
+    fitted = pdf_geometry.fit_margins(bounds, base, (500.0, 700.0))
+    assert np.allclose(fitted, [[40.0, 40.0, 52.5, 52.5]] * 2)
+    # 입력 배열은 그대로
+    assert not base.any()
+
+
+def test_fit_margins_gutter_pads_outer_edge():
+    bounds = np.array([A5, A5, A5])
+    fitted = pdf_geometry.fit_margins(bounds, np.zeros((3, 4)), (500.0, 700.0), anchor='gutter')
+    # 1, 3쪽(홀수)은 오른쪽, 2쪽은 왼쪽이 바깥
+    assert np.allclose(fitted[:, :2], [[0.0, 80.0], [80.0, 0.0], [0.0, 80.0]])
+    # 조각/병합 중간에서 시작하면 책 기준 쪽 번호로 판단
+    shifted = pdf_geometry.fit_margins(bounds[:1], np.zeros((1, 4)), (500.0, 700.0),
+                                       anchor='gutter', first=1)
+    assert np.allclose(shifted[0, :2], [80.0, 0.0])
+
+
+def test_fit_margins_landscape_and_existing_margins():
+    landscape = np.array([(0.0, 0.0, 595.0, 420.0)])
+    fitted = pdf_geometry.fit_margins(landscape, [[10.0, 10.0, 0.0, 0.0]], (500.0, 700.0))
+    # 가로 쪽은 목표도 가로 (700 x 500), 기존 여백을 포함해 맞춤
+    widths = landscape[0, 2] + fitted[0, 0] + fitted[0, 1]
+    heights = landscape[0, 3] + fitted[0, 2] + fitted[0, 3]
+    assert (widths, heights) == pytest.approx((700.0, 500.0))
+
+
+def test_page_margins_applies_overrides_after_fit():
+    s = settings(overrides={"2": margins(3.0)},
+                 page_size={'preset': 'custom', 'width': 200.0, 'height': 280.0})
+    result = pdf_geometry.page_margins(np.array([A5, A5]), s)
+    assert np.allclose(result[1], [3.0 * MM] * 4)
+    assert (A5[2] + result[0, 0] + result[0, 1]) == pytest.approx(200.0 * MM)
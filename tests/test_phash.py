@@ -0,0 +1,76 @@
+import random
+
+import fitz
+import numpy as np
+
+import pdf_analysis
+
+WORDS = ("the quick brown fox jumps over lazy dog lorem ipsum dolor sit amet "
+         "consectetur adipiscing elit sed").split()
+SCAN_DPI = 96
+
+
+def text_page(seed):
+    """배치(여백/줄 간격/줄 수)는 같고 글자만 다른 본문 쪽을 SCAN_DPI 회색조로 렌더"""
+    rnd = random.Random(seed)
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for line in range(40):
+        words = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 12)))
+        page.insert_text((60, 80 + 18 * line), words, fontsize=11)
+    pix = page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY)
+    return np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.width).astype(np.float32)
+
+
+def to_analysis_dpi(gray):
+    f = SCAN_DPI // pdf_analysis.ANALYSIS_DPI
+    h, w = gray.shape[0] // f * f, gray.shape[1] // f * f
+    small = gray[:h, :w].reshape(h // f, f, w // f, f).mean(axis=(1, 3))
+    return np.clip(small, 0, 255).astype(np.uint8)
+
+
+def rescan(gray, back, seed):
+    """같은 쪽을 다시 스캔한 것처럼: 위치 이동, 뒷면 비침, 감마/대비, 조명 그림자, 잡음"""
+    a = np.roll(gray, (-3, 5), (0, 1)) / 255.0
+    a *= 1 - 0.12 * (1 - back[:, ::-1] / 255.0)
+    a = a ** 1.5 * 0.65 * 255 + 40
+    h, w = a.shape
+    a -= 60 * (np.linspace(0, 1, w)[None, :] ** 2 + np.linspace(0, 1, h)[:, None]) / 2
+    a += np.random.default_rng(seed).normal(0, 10, a.shape)
+    return to_analysis_dpi(a)
+
+
+def distance(a, b):
+    return int(pdf_analysis.hash_distance(a, b)[0])
+
+
+def test_rescanned_page_matches_original():
+    pages = [text_page(seed) for seed in range(6)]
+    for i, page in enumerate(pages):
+        original = pdf_analysis.page_hash(to_analysis_dpi(page))
+        rescanned = pdf_analysis.page_hash(rescan(page, pages[(i + 1) % len(pages)], i))
+        assert distance(original, rescanned) <= pdf_analysis.DUPLICATE_MAX_DISTANCE
+
+
+def test_same_layout_pages_stay_distinct():
+    hashes = [pdf_analysis.page_hash(to_analysis_dpi(text_page(seed))) for seed in range(6)]
+    for i in range(len(hashes)):
+        for j in range(i + 1, len(hashes)):
+            assert distance(hashes[i], hashes[j]) > pdf_analysis.DUPLICATE_MAX_DISTANCE
+
+
+def test_blank_page_hash_is_zero():
+    assert pdf_analysis.page_hash(np.full((280, 198), 235, np.uint8)) == 0
+
+
+def test_duplicate_pairs_skip_blank_pages():
+    h = pdf_analysis.page_hash(to_analysis_dpi(text_page(0)))
+    other = pdf_analysis.page_hash(to_analysis_dpi(text_page(1)))
+    content = [0.0, 0.0, 1.0, 1.0]
+    analysis = {'phash': np.array([h, other, h, 0, 0, other, other], dtype=np.uint64),
+                'bbox': np.array([content] * 3 + [[np.nan] * 4] * 2 + [content] * 2),
+                'ink': np.array([0.1, 0.1, 0.1, 0.0, 0.0, 0.1, 0.1]),
+                'gray_std': np.array([40.0, 40.0, 40.0, 1.0, 1.0, 40.0, 40.0])}
+    pairs = pdf_analysis.duplicate_pages(analysis)
+    assert [(i, j) for i, j, _ in pairs] == [(0, 2), (5, 6)]
+    assert pdf_analysis.duplicate_drops(pairs) == {2: 0, 6: 5}
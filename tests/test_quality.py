@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+import pytest
+
+import pdf_imaging
+
+
+def text_like(seed=0, shape=(200, 300)):
+    """흰 바탕에 어두운 가로 줄이 있는 회색조 이미지"""
+    rng = np.random.default_rng(seed)
+    img = np.full(shape, 240, np.uint8)
+    for y in range(10, shape[0] - 10, 12):
+        img[y:y + 5, 20:shape[1] - 20] = rng.integers(0, 80, (5, shape[1] - 40))
+    return img
+
+
+def noisy(img, sigma, seed=1):
+    noise = np.random.default_rng(seed).normal(0, sigma, img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
+
+
+def test_identical_images():
+    img = text_like()
+    score = pdf_imaging.compare_to_reference(pdf_imaging.prepare_reference(img), img)
+    assert score['ssim'] == pytest.approx(1.0)
+    assert math.isinf(score['psnr'])
+
+
+def test_psnr_of_constant_offset():
+    img = np.full((50, 50), 100, np.uint8)
+    # MSE 100 → 10 * log10(255² / 100)
+    assert pdf_imaging.compute_psnr(img, img + 10) == pytest.approx(28.13, abs=0.01)
+
+
+def test_scores_drop_with_more_noise():
+    img = text_like()
+    ref = pdf_imaging.prepare_reference(img)
+    light = pdf_imaging.compare_to_reference(ref, noisy(img, 4))
+    heavy = pdf_imaging.compare_to_reference(ref, noisy(img, 20))
+    assert 1.0 > light['ssim'] > heavy['ssim'] > 0.0
+    assert light['psnr'] > heavy['psnr']
+
+
+def test_ssim_uses_luma_of_rgb():
+    gray = text_like()
+    rgb = np.repeat(gray[:, :, None], 3, axis=2)
+    assert pdf_imaging.compute_ssim(rgb, noisy(gray, 10)) == pytest.approx(
+        pdf_imaging.compute_ssim(gray, noisy(gray, 10)), abs=1e-4)
+
+
+def test_sample_tiles_picks_content():
+    img = np.full((1024, 1024, 3), 255, np.uint8)
+    img[256:512, 512:768] = text_like(shape=(256, 256))[:, :, None]
+    tiles = pdf_imaging.sample_tiles(img, size=256, count=1)
+    assert tiles.shape == (256, 256, 3)
+    assert np.array_equal(tiles, img[256:512, 512:768])
+    # 타일이 count개 이하인 작은 이미지는 그대로
+    small = img[:300, :300]
+    assert pdf_imaging.sample_tiles(small, size=256, count=6) is small
+
+
+@pytest.fixture
+def sample_pixmaps(monkeypatch):
+    monkeypatch.setattr(pdf_imaging, 'pixmap_to_array', lambda arr: arr)
+    return {0: text_like(0), 1: text_like(1)}
+
+
+def quality_noise_roundtrip(calls):
+    """품질이 낮을수록 잡음이 커지는 가짜 인코더 (호출 품질 기록)"""
+    def roundtrip(arr, q):
+        calls.append(q)
+        return noisy(arr, (100 - q) / 3)
+    return roundtrip
+
+
+def test_select_quality_lowest_passing(sample_pixmaps):
+    calls = []
+    roundtrip = quality_noise_roundtrip(calls)
+    refs = {k: pdf_imaging.prepare_reference(v) for k, v in sample_pixmaps.items()}
+    passing = [q for q in range(30, 95, 5)
+               if all(pdf_imaging.compare_to_reference(refs[k], noisy(v, (100 - q) / 3))['ssim']
+                      >= 0.9 for k, v in sample_pixmaps.items())]
+    quality, scores = pdf_imaging.select_jpeg_quality(sample_pixmaps, 0.9, roundtrip=roundtrip,
+                                                      max_probes=10)
+    assert quality == passing[0]
+    assert all(s['ssim'] >= 0.9 for s in scores.values())
+
+
+def test_select_quality_caps_probes(sample_pixmaps):
+    calls = []
+    pdf_imaging.select_jpeg_quality(sample_pixmaps, 0.9, roundtrip=quality_noise_roundtrip(calls),
+                                    max_probes=2)
+    # 후보 2개 x 샘플 2쪽 (통과한 후보가 있으면 최고 품질은 따로 재지 않음)
+    assert len(set(calls)) <= 3
+    assert len(calls) <= 3 * len(sample_pixmaps)
+
+
+def test_select_quality_unreachable_returns_max(sample_pixmaps):
+    quality, scores = pdf_imaging.select_jpeg_quality(
+        sample_pixmaps, 0.9999, roundtrip=lambda arr, q: noisy(arr, 30))
+    assert quality == pdf_imaging.AUTO_QUALITY_MAX
+    assert set(scores) == set(sample_pixmaps)
@@ -0,0 +1,34 @@
+import pytest
+
+import pdf_rules
+from margin_cases import left_mm, rule, settings
+
+
+def test_parse_ranges():
+    assert pdf_rules.parse_ranges("1-4, 7, 300-") == [(1, 4), (7, 7), (300, None)]
+    for bad in ("", "0", "5-3", "a-b"):
+        with pytest.raises(ValueError):
+            pdf_rules.parse_ranges(bad)
+
+
+def test_lookup_falls_back_to_odd_even():
+    rules = pdf_rules.MarginRules(settings())
+    assert [left_mm(rules, i) for i in range(4)] == [1.0, 2.0, 1.0, 2.0]
+    assert rules.rule_name(0) is None
+
+
+def test_lookup_intervals_priority_and_parity():
+    rules = pdf_rules.MarginRules(settings([
+        rule("1-4", 10.0, name="앞부분"),
+        rule("3-6", 20.0),                      # 겹치는 3-4쪽은 목록에서 뒤인 이 규칙
+        rule("2-3", 30.0, priority=-1),         # 우선순위가 낮아 3쪽에서 짐
+        rule("10-", 40.0, parity='even'),       # 끝까지, 짝수 쪽만
+    ]))
+    expected = {1: 10.0, 2: 10.0, 3: 20.0, 4: 20.0, 5: 20.0, 6: 20.0, 7: 1.0, 8: 2.0,
+                9: 1.0, 10: 40.0, 11: 1.0, 12: 40.0, 500: 40.0, 501: 1.0}
+    assert {p: left_mm(rules, p - 1) for p in expected} == expected
+    assert rules.rule_name(0) == "앞부분"
+    assert rules.rule_name(2) == "규칙 2"
+    # 같은 결과의 이웃 구간은 합쳐짐
+    assert len(rules.starts) == len(set(rules.starts))
+    assert rules.starts == sorted(rules.starts)
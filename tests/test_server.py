@@ -0,0 +1,69 @@
+import base64
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import pdf_server
+
+PDF = b"%PDF-1.4\n%%EOF\n"
+
+
+@pytest.fixture
+def server(tmp_path):
+    """localhost에 임의 포트로 띄운 서비스 (스케줄러는 돌리지 않아 작업은 대기열에만 남음)"""
+    service = pdf_server.JobService(concurrency=1, work_dir=str(tmp_path))
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), pdf_server.JobRequestHandler)
+    httpd.daemon_threads = True
+    httpd.service = service
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", tmp_path
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post_json(url, data):
+    body = json.dumps(data).encode('utf-8')
+    request = urllib.request.Request(url + "/jobs", data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def submission(**kwargs):
+    return dict(pdf_base64=base64.b64encode(PDF).decode('ascii'), **kwargs)
+
+
+@pytest.mark.parametrize('data', [
+    submission(settings={'rules': [{'pages': 'abc', 'left': 5}]}),
+    submission(settings={'odd': {'left': 'wide'}}),
+    submission(settings=['not', 'a', 'dict']),
+    submission(options={'blank_pages': 'shred'}),
+    submission(options={'compression': 'max'}),
+    submission(options=[1, 2]),
+    {'input_path': '/etc/hosts'},
+])
+def test_invalid_submission_is_rejected_without_files(server, data):
+    url, work_dir = server
+    status, body = post_json(url, data)
+    assert status == 400
+    assert body['error']
+    assert os.listdir(work_dir) == []
+
+
+def test_valid_submission_is_queued(server):
+    url, work_dir = server
+    status, body = post_json(url, submission(settings={'odd': {'left': 3}},
+                                             options={'compression': 30, 'workers': 8}))
+    assert status == 202
+    assert os.listdir(work_dir) == [body['id']]
+    with urllib.request.urlopen(f"{url}/jobs/{body['id']}", timeout=10) as response:
+        assert json.loads(response.read())['status'] == pdf_server.STATUS_QUEUED
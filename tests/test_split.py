@@ -0,0 +1,25 @@
+import fitz
+
+import pdf_engine
+
+
+def chunk_file(tmp_path, pages):
+    path = str(tmp_path / "chunk.pdf")
+    with fitz.open() as doc:
+        for n in range(pages):
+            doc.new_page(width=200, height=300).insert_text((20, 40), f"page {n}")
+        doc.save(path)
+    return path
+
+
+def test_chunk_report_keeps_original_page_numbers(tmp_path):
+    # 원본 4-6쪽 조각. 2=3은 이전 조각에서 3쪽을 뺀 쌍, 3=5로 5쪽도 2쪽의 중복
+    options = dict(pdf_engine.DEFAULT_SAVE_OPTIONS, duplicate_pages='drop', workers=1)
+    with fitz.open(chunk_file(tmp_path, 3)) as doc:
+        report = pdf_engine.save_document(doc, str(tmp_path / "out.pdf"),
+                                          pdf_engine.default_settings(), options,
+                                          page_offset=3, page_base=3,
+                                          duplicates=[(1, 2, 1), (2, 4, 2)])
+    assert report['pages'] == [{'page': 5, 'bytes': 0, 'duplicate_of': 2}]
+    assert report['duplicate_pages']['pairs'] == [[3, 5, 2]]
+    assert report['duplicate_pages']['dropped'] == [5]